@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ AttributeTransferAlgorithm
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (
+    QgsDistanceArea,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterExpression,
+    QgsProcessingParameterExtent,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterMatrix,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterString,
+    QgsProcessingParameterVectorLayer,
+    QgsProcessingOutputNumber)
+from .mapping_file import mapping_from_matrix, read_mapping_file
+from .mapping_profiles import ProfileStore, schema_fingerprint
+from .quarantine import Quarantine, quarantine_fields
+from .source_filter import SourceFilter
+from .geometry_conversion import geometry_converter_for
+from .transfer_engine import (TransferEngine, TransferError, DEFAULT_BATCH_SIZE,
+                              DEFAULT_MAX_BATCH_BYTES, ERROR_POLICIES, ERROR_QUARANTINE)
+from .transfer_metrics import TransferMetrics
+from .transfer_plan import TransferPlan
+from .transfer_task import default_profile_path, expected_feature_count
+
+class AttributeTransferAlgorithm(QgsProcessingAlgorithm):
+    """Copy source features into a new layer with the schema of a template."""
+
+    INPUT = 'INPUT'
+    TEMPLATE = 'TEMPLATE'
+    MAPPING = 'MAPPING'
+    MAPPING_FILE = 'MAPPING_FILE'
+    PROFILE = 'PROFILE'
+    FILTER_EXPRESSION = 'FILTER_EXPRESSION'
+    FILTER_EXTENT = 'FILTER_EXTENT'
+    FILTER_MASK = 'FILTER_MASK'
+    BATCH_SIZE = 'BATCH_SIZE'
+    MAX_BATCH_MB = 'MAX_BATCH_MB'
+    ERROR_POLICY = 'ERROR_POLICY'
+    OUTPUT = 'OUTPUT'
+    QUARANTINE = 'QUARANTINE'
+    RUN_REPORT = 'RUN_REPORT'
+    ROWS_WRITTEN = 'ROWS_WRITTEN'
+    ROWS_REJECTED = 'ROWS_REJECTED'
+
+    def tr(self, message):
+        """Get the translation for a string using Qt translation API."""
+        return QCoreApplication.translate('AttributeTransferAlgorithm', message)
+
+    def createInstance(self):
+        return AttributeTransferAlgorithm()
+
+    def name(self):
+        return 'attributetransfertoschema'
+
+    def displayName(self):
+        return self.tr('Attribute transfer to schema')
+
+    def shortHelpString(self):
+        return self.tr(
+            'Copies the features of the source layer into a new layer that has '
+            'the fields, geometry type and CRS of the template layer.\n\n'
+            'The field mapping is given as a two-column table of template field '
+            'and source field, or as a JSON or CSV mapping file. Instead of a '
+            'source field, a QGIS expression such as upper("Name") or $area can '
+            'be given to compute the value. A mapping profile saved from the '
+            'dialog can be named instead; without any mapping, a profile saved for '
+            'the template schema is used, or else fields with the same name are mapped. Template fields without '
+            'a mapping are left empty.\n\n'
+            'Only source features matching the filter expression, within the '
+            'extent and intersecting the mask layer are transferred; the filters '
+            'are passed to the data provider.\n\n'
+            'Source geometries are converted to the geometry type of the template '
+            '(single or multi-part, with or without Z and M) and reprojected to '
+            'its CRS.\n\n'
+            'Source features whose values cannot be converted or written abort '
+            'the algorithm, are skipped, or are written with the reason to the '
+            'quarantine layer.\n\n'
+            'With a run report file, the time spent reading, mapping, building '
+            'geometries, writing and flushing is logged and saved as JSON.')
+
+    def initAlgorithm(self, config=None):
+        """Define the inputs and outputs of the algorithm."""
+        self.addParameter(QgsProcessingParameterFeatureSource(
+            self.INPUT, self.tr('Source layer'), [QgsProcessing.TypeVector]))
+        self.addParameter(QgsProcessingParameterVectorLayer(
+            self.TEMPLATE, self.tr('Template layer'), [QgsProcessing.TypeVector]))
+        self.addParameter(QgsProcessingParameterMatrix(
+            self.MAPPING, self.tr('Field mapping'),
+            headers=[self.tr('Template field'), self.tr('Source field')],
+            optional=True))
+        self.addParameter(QgsProcessingParameterFile(
+            self.MAPPING_FILE, self.tr('Mapping file (JSON or CSV)'), optional=True))
+        self.addParameter(QgsProcessingParameterString(
+            self.PROFILE, self.tr('Mapping profile'), optional=True))
+        self.addParameter(QgsProcessingParameterExpression(
+            self.FILTER_EXPRESSION, self.tr('Filter expression'), parentLayerParameterName=self.INPUT,
+            optional=True))
+        self.addParameter(QgsProcessingParameterExtent(
+            self.FILTER_EXTENT, self.tr('Filter extent'), optional=True))
+        self.addParameter(QgsProcessingParameterFeatureSource(
+            self.FILTER_MASK, self.tr('Filter mask layer'), [QgsProcessing.TypeVectorPolygon], optional=True))
+        batch_size = QgsProcessingParameterNumber(
+            self.BATCH_SIZE, self.tr('Features per write batch'),
+            QgsProcessingParameterNumber.Integer, DEFAULT_BATCH_SIZE, minValue=1)
+        batch_size.setFlags(batch_size.flags() | QgsProcessingParameterNumber.FlagAdvanced)
+        self.addParameter(batch_size)
+        max_batch_mb = QgsProcessingParameterNumber(
+            self.MAX_BATCH_MB, self.tr('Maximum memory per batch (MB)'),
+            QgsProcessingParameterNumber.Integer, DEFAULT_MAX_BATCH_BYTES // (1024 * 1024), minValue=1)
+        max_batch_mb.setFlags(max_batch_mb.flags() | QgsProcessingParameterNumber.FlagAdvanced)
+        self.addParameter(max_batch_mb)
+        self.addParameter(QgsProcessingParameterEnum(
+            self.ERROR_POLICY, self.tr('Rejected features'),
+            options=[self.tr('Abort'), self.tr('Skip'), self.tr('Write to quarantine layer')],
+            defaultValue=0))
+        self.addParameter(QgsProcessingParameterFeatureSink(
+            self.OUTPUT, self.tr('Output layer')))
+        self.addParameter(QgsProcessingParameterFeatureSink(
+            self.QUARANTINE, self.tr('Quarantine layer'), optional=True, createByDefault=False))
+        run_report = QgsProcessingParameterFileDestination(
+            self.RUN_REPORT, self.tr('Run report'), self.tr('JSON files (*.json)'), optional=True,
+            createByDefault=False)
+        run_report.setFlags(run_report.flags() | QgsProcessingParameterFileDestination.FlagAdvanced)
+        self.addParameter(run_report)
+        self.addOutput(QgsProcessingOutputNumber(
+            self.ROWS_WRITTEN, self.tr('Features written')))
+        self.addOutput(QgsProcessingOutputNumber(
+            self.ROWS_REJECTED, self.tr('Features rejected')))
+
+    def mapping_from_parameters(self, parameters, context, feedback, template_fields, source_fields):
+        """Return the field mapping given by the file, the matrix, a profile or field names.
+
+        Without a mapping or a profile name, a saved profile made for the
+        template schema is used if there is one.
+        """
+        mapping_path = self.parameterAsFile(parameters, self.MAPPING_FILE, context)
+        if mapping_path:
+            try:
+                return read_mapping_file(mapping_path)
+            except (OSError, ValueError) as e:
+                raise QgsProcessingException(self.tr('Cannot read mapping file: {}').format(e))
+        matrix = self.parameterAsMatrix(parameters, self.MAPPING, context)
+        if matrix:
+            try:
+                return mapping_from_matrix(matrix)
+            except ValueError as e:
+                raise QgsProcessingException(str(e))
+        try:
+            profiles = ProfileStore(default_profile_path())
+        except (OSError, ValueError) as e:
+            raise QgsProcessingException(self.tr('Cannot read mapping profiles: {}').format(e))
+        fingerprint = schema_fingerprint(template_fields)
+        profile = self.parameterAsString(parameters, self.PROFILE, context)
+        if profile:
+            if profiles.mapping(profile) is None:
+                raise QgsProcessingException(self.tr('Mapping profile {} does not exist.').format(profile))
+            if profiles.fingerprint(profile) != fingerprint:
+                feedback.reportError(self.tr('Mapping profile {} was saved for a different template schema.')
+                                     .format(profile))
+        else:
+            profile = profiles.find(fingerprint, source_fields.names())
+        if profile:
+            feedback.pushInfo(self.tr('Using mapping profile {}').format(profile))
+            return profiles.mapping(profile)
+        return {field.name(): field.name() for field in template_fields
+                if source_fields.lookupField(field.name()) >= 0}
+
+    def source_filter_from_parameters(self, parameters, context, source):
+        """Return the source filter given by the filter parameters."""
+        extent = None
+        if parameters.get(self.FILTER_EXTENT):
+            extent = self.parameterAsExtent(parameters, self.FILTER_EXTENT, context, source.sourceCrs())
+        polygon = None
+        mask = self.parameterAsSource(parameters, self.FILTER_MASK, context)
+        if mask is not None:
+            request = QgsFeatureRequest().setNoAttributes()
+            request.setDestinationCrs(source.sourceCrs(), context.transformContext())
+            polygon = QgsGeometry.unaryUnion([feature.geometry() for feature in mask.getFeatures(request)])
+        expression = self.parameterAsExpression(parameters, self.FILTER_EXPRESSION, context)
+        try:
+            return SourceFilter(extent, polygon, expression,
+                                expression_context=self.createExpressionContext(parameters, context, source))
+        except TransferError as e:
+            raise QgsProcessingException(str(e))
+
+    def distance_area(self, source, context):
+        """Return the ellipsoidal calculator for $area and $length in mapping expressions."""
+        distance_area = QgsDistanceArea()
+        distance_area.setSourceCrs(source.sourceCrs(), context.transformContext())
+        if context.project() is not None:
+            distance_area.setEllipsoid(context.project().ellipsoid())
+        return distance_area
+
+    def processAlgorithm(self, parameters, context, feedback):
+        """Stream the source through the mapping into the output sink."""
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, self.INPUT))
+        template_layer = self.parameterAsVectorLayer(parameters, self.TEMPLATE, context)
+        if template_layer is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, self.TEMPLATE))
+
+        geometry_converter = None
+        if template_layer.isSpatial():
+            try:
+                geometry_converter = geometry_converter_for(
+                    template_layer.wkbType(), source.wkbType(), template_layer.crs(), source.sourceCrs(),
+                    context.transformContext())
+            except TransferError as e:
+                raise QgsProcessingException(str(e))
+
+        mapping = self.mapping_from_parameters(
+            parameters, context, feedback, template_layer.fields(), source.fields())
+        feedback.pushInfo(self.tr('Field mapping: {}').format(mapping))
+        try:
+            plan = TransferPlan(mapping, template_layer.fields(), source.fields(),
+                                fetch_geometry=template_layer.isSpatial(),
+                                geometry_converter=geometry_converter,
+                                source_filter=self.source_filter_from_parameters(parameters, context, source),
+                                expression_context=self.createExpressionContext(parameters, context, source),
+                                distance_area=self.distance_area(source, context))
+        except ValueError as e:
+            raise QgsProcessingException(str(e))
+
+        sink, dest_id = self.parameterAsSink(
+            parameters, self.OUTPUT, context,
+            template_layer.fields(), template_layer.wkbType(), template_layer.crs())
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        results = {self.OUTPUT: dest_id}
+        error_policy = ERROR_POLICIES[self.parameterAsEnum(parameters, self.ERROR_POLICY, context)]
+        quarantine = None
+        if error_policy == ERROR_QUARANTINE:
+            quarantine_sink, quarantine_id = self.parameterAsSink(
+                parameters, self.QUARANTINE, context,
+                quarantine_fields(source.fields()), source.wkbType(), source.sourceCrs())
+            if quarantine_sink is None:
+                raise QgsProcessingException(self.tr('Choose a quarantine layer for rejected features.'))
+            quarantine = Quarantine(quarantine_sink, source.fields())
+            results[self.QUARANTINE] = quarantine_id
+
+        batch_size = self.parameterAsInt(parameters, self.BATCH_SIZE, context)
+        max_batch_bytes = self.parameterAsInt(parameters, self.MAX_BATCH_MB, context) * 1024 * 1024
+        run_report_path = self.parameterAsFileOutput(parameters, self.RUN_REPORT, context)
+        metrics = TransferMetrics() if run_report_path else None
+        engine = TransferEngine(plan, batch_size, error_policy, quarantine, max_batch_bytes, metrics=metrics)
+        try:
+            report = engine.run(source, sink, expected_feature_count(source, plan.source_filter), feedback)
+        except TransferError as e:
+            raise QgsProcessingException(str(e))
+        finally:
+            if quarantine is not None:
+                quarantine.close()
+        feedback.pushInfo(self.tr('{} features written ({:.0f} features/s, {:.1f} batches/s)').format(
+            report.rows_written, report.features_per_second(), report.batches_per_second()))
+        if report.peak_rss:
+            feedback.pushInfo(self.tr('Peak memory: {:.0f} MB').format(report.peak_rss / (1024 * 1024)))
+        if report.rows_rejected:
+            feedback.reportError(self.tr('{} features rejected').format(report.rows_rejected))
+        if metrics is not None:
+            feedback.pushInfo(metrics.summary(report))
+            try:
+                metrics.write_report(run_report_path, report)
+            except OSError as e:
+                raise QgsProcessingException(self.tr('Cannot write run report: {}').format(str(e)))
+            results[self.RUN_REPORT] = run_report_path
+        results[self.ROWS_WRITTEN] = report.rows_written
+        results[self.ROWS_REJECTED] = report.rows_rejected
+        return results
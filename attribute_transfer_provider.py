@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ AttributeTransferProvider
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtGui import QIcon
+from qgis.core import QgsProcessingProvider
+from .attribute_transfer_algorithm import AttributeTransferAlgorithm
+import os.path
+
+class AttributeTransferProvider(QgsProcessingProvider):
+    """Processing provider exposing the headless transfer algorithm."""
+
+    def loadAlgorithms(self):
+        """Register the algorithms of this provider."""
+        self.addAlgorithm(AttributeTransferAlgorithm())
+
+    def id(self):
+        return 'attributetransfertoschema'
+
+    def name(self):
+        return self.tr('Attribute Transfer to Schema')
+
+    def icon(self):
+        return QIcon(os.path.join(os.path.dirname(__file__), 'icon.png'))
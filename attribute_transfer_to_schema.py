@@ -23,9 +23,18 @@
 from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction, QMessageBox
-from qgis.core import QgsProject, QgsFeature, QgsFeatureSink
+from qgis.core import QgsApplication, QgsProject
 from qgis.utils import iface
-from .attribute_transfer_to_schema_dialog import AttributeTransferToSchemaDialog
+from .field_statistics import FieldStatisticsCache
+from .layer_registry import LayerRegistry
+from .transfer_plan import TransferPlan
+from .transfer_engine import TransferError, check_geometry_compatibility, DEFAULT_BATCH_SIZE, ERROR_ABORT
+from .transfer_metrics import TransferMetrics
+from .transfer_task import AttributeTransferTask, TransferPreviewTask, default_profile_path, default_run_report_path
+from .mapping_profiles import ProfileStore
+from .source_filter import SourceFilter
+from .sql_pushdown import SqlPushdown
+from .attribute_transfer_provider import AttributeTransferProvider
 import os.path
 import logging
 
@@ -54,6 +63,10 @@ class AttributeTransferToSchema:
         self.actions = []
         self.menu = self.tr(u'&Attribute Transfer to Schema')
         self.dlg = None
+        self.tasks = []
+        self.provider = None
+        self.layer_registry = None
+        self.field_statistics = None
 
     def tr(self, message):
         """Get the translation for a string using Qt translation API."""
@@ -91,8 +104,14 @@ class AttributeTransferToSchema:
         self.actions.append(action)
         return action
 
+    def initProcessing(self):
+        """Register the Processing provider, also used by qgis_process."""
+        self.provider = AttributeTransferProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def initGui(self):
         """Create the menu entries and toolbar icons inside the QGIS GUI."""
+        self.initProcessing()
         icon_path = os.path.join(self.plugin_dir, 'icon.png')
         self.add_action(
             icon_path,
@@ -105,12 +124,23 @@ class AttributeTransferToSchema:
         for action in self.actions:
             self.iface.removePluginMenu(self.tr(u'&Attribute Transfer to Schema'), action)
             self.iface.removeToolBarIcon(action)
+        for task in self.tasks:
+            task.cancel()
+        if self.provider:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
+            self.provider = None
         if self.dlg:
             self.dlg.close()
             self.dlg = None
+        if self.layer_registry:
+            self.layer_registry.close()
+            self.layer_registry = None
+        if self.field_statistics:
+            self.field_statistics.cancel()
+            self.field_statistics = None
 
-    def transfer_features_with_mapping(self, dialog):
-        """Execute the feature transfer with attribute mapping."""
+    def transfer_features_with_mapping(self, dialog, batch_size=DEFAULT_BATCH_SIZE):
+        """Validate the mapping and start the feature transfer in the background."""
         try:
             field_mapping, template_layer, source_layer = dialog.get_mapping()
             logger.debug(f"Field mapping: {field_mapping}")
@@ -121,56 +151,155 @@ class AttributeTransferToSchema:
                 QMessageBox.critical(None, "Error", "Invalid layer selection. Ensure both template and source layers are valid.")
                 return
 
+            options = dialog.get_options()
+            output_path = options['output_path']
+            if output_path == '' and not options['dry_run']:
+                QMessageBox.critical(None, "Error", "Choose an output file.")
+                return
+
             # Validate geometry compatibility
-            if template_layer.wkbType() != source_layer.wkbType():
-                QMessageBox.critical(None, "Error", "Template and Source layers have incompatible geometry types.")
+            try:
+                check_geometry_compatibility(template_layer.wkbType(), source_layer.wkbType())
+            except TransferError as e:
+                QMessageBox.critical(None, "Error", str(e))
+                return
+
+            # Filters are handed to the provider with the feature request
+            try:
+                source_filter = SourceFilter.for_layer(
+                    source_layer, extent=options['filter_extent'], expression=options['filter_expression'],
+                    selected_only=options['selected_only'])
+            except TransferError as e:
+                QMessageBox.critical(None, "Error", str(e))
                 return
 
-            # Start editing template layer
-            if not template_layer.isEditable():
-                if not template_layer.startEditing():
-                    QMessageBox.critical(None, "Error", "Cannot edit Template layer.")
-                    return
+            # Resolve the mapping to field indices once for the whole run
+            plan = TransferPlan.from_layers(field_mapping, template_layer, source_layer, source_filter=source_filter)
 
-            # Clear existing features in template layer
-            if not template_layer.dataProvider().truncate():
-                template_layer.rollBack()
-                QMessageBox.critical(None, "Error", "Failed to clear Template layer.")
+            if options['dry_run']:
+                return self.start_preview(plan, source_layer, template_layer, options['random_sample'], batch_size)
+
+            # Let the database copy the rows when both layers share one; a
+            # single statement cannot skip individual rows, so only when
+            # the transfer aborts on errors anyway
+            pushdown = None
+            if not output_path and options['pushdown'] and options['error_policy'] == ERROR_ABORT:
+                pushdown = SqlPushdown.for_layers(plan, template_layer, source_layer, options['mode'])
+                logger.debug(f"SQL push-down: {pushdown is not None}")
+            metrics = TransferMetrics() if options['instrument'] else None
+            try:
+                # Starts a transaction on the template layer when its
+                # provider has them; the task clears it in replace mode
+                task = AttributeTransferTask(plan, source_layer, template_layer, batch_size, output_path,
+                                             options['mode'], options['key_field'], pushdown=pushdown,
+                                             error_policy=options['error_policy'],
+                                             quarantine_path=options['quarantine_path'],
+                                             threaded=options['threaded'], metrics=metrics,
+                                             run_report_path=default_run_report_path() if metrics else None)
+            except TransferError as e:
+                QMessageBox.critical(None, "Error", str(e))
                 return
 
-            # Copy features with mapped attributes
-            template_fields = [field.name() for field in template_layer.fields()]
-            for feature in source_layer.getFeatures():
-                new_feature = QgsFeature(template_layer.fields())
-                new_feature.setGeometry(feature.geometry())
-                for template_field in template_fields:
-                    if template_field in field_mapping:
-                        source_field = field_mapping[template_field]
-                        source_value = feature[source_field]
-                        new_feature.setAttribute(template_field, source_value)
-                    else:
-                        new_feature.setAttribute(template_field, None)
-                if not template_layer.dataProvider().addFeature(new_feature):
-                    template_layer.rollBack()
-                    QMessageBox.critical(None, "Error", "Failed to add feature to Template layer.")
-                    return
-
-            # Commit changes
-            if template_layer.commitChanges():
-                self.iface.messageBar().pushMessage("Success", "Features transferred successfully.", level=3, duration=5)
-            else:
-                template_layer.rollBack()
-                QMessageBox.critical(None, "Error", "Failed to commit changes to Template layer.")
+            # Copy features in a background task; it commits when done
+            task.taskCompleted.connect(lambda: self.transfer_finished(task))
+            task.taskTerminated.connect(lambda: self.transfer_finished(task))
+            self.tasks.append(task)
+            QgsApplication.taskManager().addTask(task)
+            self.iface.messageBar().pushMessage("Info", "Feature transfer started in the background.", level=0, duration=5)
+            return task
 
         except Exception as e:
             logger.error(f"Error in transfer_features_with_mapping: {str(e)}")
             QMessageBox.critical(None, "Error", f"An error occurred: {str(e)}")
 
+    def start_preview(self, plan, source_layer, template_layer, random_sample, batch_size=DEFAULT_BATCH_SIZE):
+        """Dry run the transfer on a sample without touching the template layer."""
+        task = TransferPreviewTask(plan, source_layer, template_layer, random_sample=random_sample,
+                                   batch_size=batch_size)
+        task.taskCompleted.connect(lambda: self.preview_finished(task))
+        task.taskTerminated.connect(lambda: self.preview_finished(task))
+        self.tasks.append(task)
+        QgsApplication.taskManager().addTask(task)
+        self.iface.messageBar().pushMessage("Info", "Transfer preview started in the background.", level=0, duration=5)
+        return task
+
+    def preview_finished(self, task):
+        """Show the converted sample and the predictions of a dry run."""
+        if task in self.tasks:
+            self.tasks.remove(task)
+        report = task.report
+        if task.error:
+            QMessageBox.critical(None, "Error", task.error)
+            return
+        if report is None or task.isCanceled():
+            self.iface.messageBar().pushMessage("Info", "Transfer preview cancelled.", level=1, duration=5)
+            return
+        logger.debug(f"Preview report: {report.as_dict()}")
+        QgsProject.instance().addMapLayer(task.layer)
+        lines = [f"{report.rows_written} of {report.rows_read} sampled features converted."]
+        if report.feature_count < 0:
+            # A filtered first-rows sample does not know how many features the run reads
+            lines.append(f"Rejected in the sample: {report.reject_ratio():.1%}. "
+                         f"Use a random sample to extrapolate to the filtered features.")
+        else:
+            lines += [f"Expected rejects: {report.predicted_rejects()} of {report.feature_count} features "
+                      f"({report.reject_ratio():.1%}).",
+                      f"Estimated run time: {report.estimated_seconds():.0f} s, not counting the writes "
+                      f"to the template layer."]
+        if report.reject_fields:
+            lines.append("Rejected by field: " + ", ".join(
+                f"{field} ({count})" for field, count in report.reject_fields.most_common()))
+        for feature_id, reason in report.reject_examples[:5]:
+            lines.append(f"Feature {feature_id}: {reason}")
+        QMessageBox.information(None, "Transfer Preview", "\n".join(lines))
+
+    def transfer_finished(self, task):
+        """Report the outcome of a background transfer task."""
+        if task in self.tasks:
+            self.tasks.remove(task)
+        report = task.report
+        if task.error:
+            QMessageBox.critical(None, "Error", task.error)
+        elif report is None or report.canceled or task.isCanceled():
+            self.iface.messageBar().pushMessage("Info", "Feature transfer cancelled.", level=1, duration=5)
+        else:
+            logger.debug(f"Transfer report: {report.as_dict()}")
+            if task.output_path:
+                name = os.path.splitext(os.path.basename(task.output_path))[0]
+                self.iface.addVectorLayer(task.output_path, name, 'ogr')
+            details = [f"{report.features_per_second():.0f} features/s"]
+            if report.rows_rejected:
+                details.append(f"{report.rows_rejected} rejected")
+            if report.peak_rss:
+                details.append(f"peak memory {report.peak_rss / (1024 * 1024):.0f} MB")
+            if task.run_report_path:
+                details.append("stage timings in the log")
+            self.iface.messageBar().pushMessage(
+                "Success",
+                f"{report.rows_written} features transferred successfully ({', '.join(details)}).",
+                level=3, duration=5)
+
     def run(self):
         """Run method that performs all the real work."""
+        # Imported here so that loading the plugin and its Processing
+        # provider does not pull in qgis.gui and the dialog's widgets
+        from .attribute_transfer_to_schema_dialog import AttributeTransferToSchemaDialog
         try:
             # Always create a new dialog to avoid deleted object errors
-            self.dlg = AttributeTransferToSchemaDialog(self.iface.mainWindow())
+            try:
+                profile_store = ProfileStore(default_profile_path())
+            except (OSError, ValueError) as e:
+                logger.error(f"Cannot read mapping profiles: {str(e)}")
+                profile_store = None
+            # The layer cache follows the project between dialog runs
+            if self.layer_registry is None:
+                self.layer_registry = LayerRegistry()
+                self.field_statistics = FieldStatisticsCache()
+                self.layer_registry.layerRemoved.connect(self.field_statistics.invalidate)
+            self.dlg = AttributeTransferToSchemaDialog(self.iface.mainWindow(), profile_store, self.layer_registry,
+                                                       self.field_statistics)
+            if hasattr(self.dlg, 'extent_group'):
+                self.dlg.extent_group.setMapCanvas(self.iface.mapCanvas())
             logger.debug("Dialog initialized")
 
             self.dlg.show()
@@ -20,24 +20,53 @@
  *                                                                         *
  ***************************************************************************/
 """
-from qgis.PyQt.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QMessageBox, QGroupBox
-from qgis.PyQt.QtCore import Qt
-from qgis.core import QgsProject
+from qgis.PyQt.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QMessageBox, QGroupBox, QCheckBox, QInputDialog, QTableView, QHeaderView, QAbstractItemView
+from qgis.PyQt.QtCore import Qt, QStringListModel, QTimer
+from qgis.gui import QgsExtentGroupBox, QgsFieldExpressionWidget, QgsFileWidget
+from .field_statistics import FieldStatisticsCache
+from .layer_registry import LayerRegistry
+from .mapping_model import FieldMappingModel, SourceFieldDelegate, SOURCE_COLUMN
+from .mapping_profiles import schema_fingerprint
+from .schema_matcher import SchemaMatcher
+from .type_coercion import field_kind
 import logging
 
 # Set up logging for debugging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Milliseconds to wait for further layer changes before rebuilding the mapping
+MAPPING_UPDATE_DELAY = 50
+
 class AttributeTransferToSchemaDialog(QDialog):
-    def __init__(self, parent=None):
-        """Constructor."""
+    def __init__(self, parent=None, profile_store=None, layer_registry=None, field_statistics=None):
+        """Constructor.
+
+        :param profile_store: Saved mapping profiles; a profile made for the
+            selected template schema is applied automatically.
+        :type profile_store: ProfileStore
+
+        :param layer_registry: Cached vector layers of the project; the
+            dialog builds its own when None.
+        :type layer_registry: LayerRegistry
+
+        :param field_statistics: Cached samples of the source fields,
+            computed in the background when a source layer is selected.
+        :type field_statistics: FieldStatisticsCache
+        """
         super().__init__(parent)
+        self.profile_store = profile_store
+        self.layer_registry = layer_registry if layer_registry is not None else LayerRegistry(parent=self)
+        self.field_statistics = field_statistics if field_statistics is not None else FieldStatisticsCache(self)
+        # Coalesce the layer changes of one user action into one rebuild
+        self.mapping_timer = QTimer(self)
+        self.mapping_timer.setSingleShot(True)
+        self.mapping_timer.setInterval(MAPPING_UPDATE_DELAY)
+        self.mapping_timer.timeout.connect(self.update_attribute_mapping)
         self.template_layer = None
         self.source_layer = None
         self.mapping = {}
-        self.combos = {}
-        self.attribute_layout = None
+        self.matches = {}
         self.init_ui()
 
     def init_ui(self):
@@ -49,13 +78,8 @@ class AttributeTransferToSchemaDialog(QDialog):
 
             main_layout = QVBoxLayout()
 
-            # Initialize layers and layer names
-            self.layers = [layer for layer in QgsProject.instance().mapLayers().values() if layer.type() == 0]  # Vector layers only
-            self.layer_names = [layer.name() for layer in self.layers]
-            logger.debug(f"Initial layer list: {self.layer_names}")
-
             # Check if layers are available
-            if not self.layer_names:
+            if not self.layer_registry.layer_ids():
                 QMessageBox.critical(None, "Error", "No vector layers found in the project.")
                 self.reject()
                 return
@@ -67,9 +91,6 @@ class AttributeTransferToSchemaDialog(QDialog):
             template_layout = QHBoxLayout()
             template_label = QLabel("Template Layer:")
             self.template_combo = QComboBox()
-            self.template_combo.addItems(self.layer_names)
-            if "Template" in self.layer_names:
-                self.template_combo.setCurrentText("Template")
             template_layout.addWidget(template_label)
             template_layout.addWidget(self.template_combo)
             input_layers_layout.addLayout(template_layout)
@@ -77,27 +98,129 @@ class AttributeTransferToSchemaDialog(QDialog):
             source_layout = QHBoxLayout()
             source_label = QLabel("Source Layer:")
             self.source_combo = QComboBox()
-            self.source_combo.addItems(self.layer_names)
-            if "Source" in self.layer_names:
-                self.source_combo.setCurrentText("Source")
+            for layer_id in self.layer_registry.layer_ids():
+                self.add_layer_item(layer_id)
+            self.select_layer(self.template_combo, self.layer_registry.find("Template"))
+            self.select_layer(self.source_combo, self.layer_registry.find("Source"))
             source_layout.addWidget(source_label)
             source_layout.addWidget(self.source_combo)
             input_layers_layout.addLayout(source_layout)
 
+            self.selected_only_check = QCheckBox("Selected features only")
+            input_layers_layout.addWidget(self.selected_only_check)
+            filter_layout = QHBoxLayout()
+            filter_label = QLabel("Filter expression:")
+            self.filter_expression_widget = QgsFieldExpressionWidget()
+            self.filter_expression_widget.setExpressionDialogTitle("Source Filter")
+            filter_layout.addWidget(filter_label)
+            filter_layout.addWidget(self.filter_expression_widget)
+            input_layers_layout.addLayout(filter_layout)
+            self.extent_group = QgsExtentGroupBox()
+            self.extent_group.setTitle("Only features within extent")
+            self.extent_group.setCheckable(True)
+            self.extent_group.setChecked(False)
+            input_layers_layout.addWidget(self.extent_group)
+
             input_layers_group.setLayout(input_layers_layout)
             main_layout.addWidget(input_layers_group)
 
             # Group Box 2: Field Selection
             field_selection_group = QGroupBox("Field Selection")
-            self.attribute_layout = QVBoxLayout()
-            self.combos = {}
+            field_selection_layout = QVBoxLayout()
+            profile_layout = QHBoxLayout()
+            profile_label = QLabel("Mapping profile:")
+            self.profile_combo = QComboBox()
+            save_profile_button = QPushButton("Save Profile...")
+            save_profile_button.setEnabled(self.profile_store is not None)
+            save_profile_button.clicked.connect(self.save_profile)
+            profile_layout.addWidget(profile_label)
+            profile_layout.addWidget(self.profile_combo)
+            profile_layout.addWidget(save_profile_button)
+            field_selection_layout.addLayout(profile_layout)
+            # One row per template field; editors are created on demand
+            self.source_fields_model = QStringListModel(self)
+            self.mapping_model = FieldMappingModel(self)
+            self.mapping_view = QTableView()
+            self.mapping_view.setModel(self.mapping_model)
+            self.mapping_view.setItemDelegateForColumn(
+                SOURCE_COLUMN, SourceFieldDelegate(self.source_fields_model, self.mapping_view))
+            self.mapping_view.setEditTriggers(QAbstractItemView.AllEditTriggers)
+            self.mapping_view.setSelectionMode(QAbstractItemView.SingleSelection)
+            self.mapping_view.verticalHeader().hide()
+            self.mapping_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+            self.mapping_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            self.mapping_view.setMinimumWidth(600)
+            self.mapping_view.setMinimumHeight(200)
+            field_selection_layout.addWidget(self.mapping_view)
             self.update_attribute_mapping()
-            field_selection_group.setLayout(self.attribute_layout)
+            self.profile_combo.currentTextChanged.connect(self.apply_profile)
+            field_selection_group.setLayout(field_selection_layout)
             main_layout.addWidget(field_selection_group)
 
+            # Group Box 3: Output
+            output_group = QGroupBox("Output")
+            output_layout = QVBoxLayout()
+            mode_layout = QHBoxLayout()
+            mode_label = QLabel("Write to:")
+            self.output_mode_combo = QComboBox()
+            self.output_mode_combo.addItem("Template layer (replace features)", "replace")
+            self.output_mode_combo.addItem("Template layer (append features)", "append")
+            self.output_mode_combo.addItem("Template layer (update or insert by key field)", "upsert")
+            self.output_mode_combo.addItem("Template layer (write changed rows only, by key field)", "delta")
+            self.output_mode_combo.addItem("New file with the template schema", "new_file")
+            mode_layout.addWidget(mode_label)
+            mode_layout.addWidget(self.output_mode_combo)
+            output_layout.addLayout(mode_layout)
+            key_layout = QHBoxLayout()
+            key_label = QLabel("Key field:")
+            self.key_field_combo = QComboBox()
+            self.update_key_fields()
+            key_layout.addWidget(key_label)
+            key_layout.addWidget(self.key_field_combo)
+            output_layout.addLayout(key_layout)
+            self.output_file_widget = QgsFileWidget()
+            self.output_file_widget.setStorageMode(QgsFileWidget.SaveFile)
+            self.output_file_widget.setFilter("GeoPackage (*.gpkg);;FlatGeobuf (*.fgb);;ESRI Shapefile (*.shp)")
+            output_layout.addWidget(self.output_file_widget)
+            self.pushdown_check = QCheckBox("Run the transfer inside the database when both layers share one")
+            self.pushdown_check.setChecked(True)
+            output_layout.addWidget(self.pushdown_check)
+            self.threaded_check = QCheckBox("Read the source while writing (faster for database and web layers)")
+            output_layout.addWidget(self.threaded_check)
+            self.metrics_check = QCheckBox("Log the time spent per stage and write a JSON run report")
+            output_layout.addWidget(self.metrics_check)
+            self.dry_run_check = QCheckBox("Dry run: convert a sample into a memory layer without writing")
+            self.dry_run_check.setToolTip("Predicts rejected rows and the run time from the first features")
+            output_layout.addWidget(self.dry_run_check)
+            self.random_sample_check = QCheckBox("Sample random features instead of the first ones")
+            output_layout.addWidget(self.random_sample_check)
+            error_layout = QHBoxLayout()
+            error_label = QLabel("Rejected rows:")
+            self.error_policy_combo = QComboBox()
+            self.error_policy_combo.addItem("Abort the transfer", "abort")
+            self.error_policy_combo.addItem("Skip the row", "skip")
+            self.error_policy_combo.addItem("Write the row to a quarantine file", "quarantine")
+            error_layout.addWidget(error_label)
+            error_layout.addWidget(self.error_policy_combo)
+            output_layout.addLayout(error_layout)
+            self.quarantine_file_widget = QgsFileWidget()
+            self.quarantine_file_widget.setStorageMode(QgsFileWidget.SaveFile)
+            self.quarantine_file_widget.setFilter("GeoPackage (*.gpkg);;CSV (*.csv)")
+            output_layout.addWidget(self.quarantine_file_widget)
+            output_group.setLayout(output_layout)
+            main_layout.addWidget(output_group)
+            self.output_mode_combo.currentIndexChanged.connect(self.update_output_widgets)
+            self.error_policy_combo.currentIndexChanged.connect(self.update_output_widgets)
+            self.dry_run_check.toggled.connect(self.update_output_widgets)
+            self.update_output_widgets()
+
             # Connect layer changes to update attribute mapping
-            self.template_combo.currentIndexChanged.connect(self.update_attribute_mapping)
-            self.source_combo.currentIndexChanged.connect(self.update_attribute_mapping)
+            self.template_combo.currentIndexChanged.connect(self.schedule_mapping_update)
+            self.source_combo.currentIndexChanged.connect(self.schedule_mapping_update)
+            self.layer_registry.layerAdded.connect(self.add_layer_item)
+            self.layer_registry.layerRemoved.connect(self.remove_layer_item)
+            self.layer_registry.layerRenamed.connect(self.rename_layer_item)
+            self.field_statistics.statisticsReady.connect(self.show_source_statistics)
 
             # Buttons
             button_layout = QHBoxLayout()
@@ -117,97 +240,40 @@ class AttributeTransferToSchemaDialog(QDialog):
             self.reject()
 
     def update_attribute_mapping(self):
-        """Update the attribute mapping dropdowns based on selected layers."""
+        """Update the attribute mapping table based on selected layers."""
         try:
             logger.debug("Updating attribute mapping")
-            # Disconnect signals to prevent multiple calls
-            try:
-                self.template_combo.currentIndexChanged.disconnect()
-                self.source_combo.currentIndexChanged.disconnect()
-            except TypeError:
-                pass  # Signals may not be connected yet
-
-            # Refresh layer list
-            self.layers = [layer for layer in QgsProject.instance().mapLayers().values() if layer.type() == 0]
-            self.layer_names = [layer.name() for layer in self.layers]
-            logger.debug(f"Updated layer list: {self.layer_names}")
-
-            # Update dropdowns
-            current_template = self.template_combo.currentText()
-            current_source = self.source_combo.currentText()
-            self.template_combo.clear()
-            self.source_combo.clear()
-            self.template_combo.addItems(self.layer_names)
-            self.source_combo.addItems(self.layer_names)
-            if current_template in self.layer_names:
-                self.template_combo.setCurrentText(current_template)
-            if current_source in self.layer_names:
-                self.source_combo.setCurrentText(current_source)
-
-            # Reconnect signals
-            self.template_combo.currentIndexChanged.connect(self.update_attribute_mapping)
-            self.source_combo.currentIndexChanged.connect(self.update_attribute_mapping)
-
-            # Clear existing attribute mapping widgets safely
-            if self.attribute_layout:
-                while self.attribute_layout.count():
-                    item = self.attribute_layout.takeAt(0)
-                    if item.widget():
-                        item.widget().deleteLater()
-                    elif item.layout():
-                        layout = item.layout()
-                        while layout.count():
-                            sub_item = layout.takeAt(0)
-                            if sub_item.widget():
-                                sub_item.widget().deleteLater()
-                        layout.deleteLater()
-            self.combos = {}
-
-            # Get selected layer names
-            template_name = self.template_combo.currentText()
-            source_name = self.source_combo.currentText()
-            logger.debug(f"Selected template: {template_name}")
-            logger.debug(f"Selected source: {source_name}")
-
-            # Fetch layers
-            self.template_layer = None
-            self.source_layer = None
-            for layer in self.layers:
-                if layer.name() == template_name:
-                    self.template_layer = layer
-                if layer.name() == source_name:
-                    self.source_layer = layer
+            self.mapping_timer.stop()
+            self.template_layer, self.source_layer = self.selected_layers()
 
             # Validate layers before accessing fields
             if not self.template_layer or not self.source_layer:
                 logger.debug("No valid layers selected")
+                self.mapping_model.set_template_fields([])
                 return
 
             # Ensure layers are valid QGIS layers
             if not self.template_layer.isValid() or not self.source_layer.isValid():
                 logger.error(f"Invalid layers: Template valid={self.template_layer.isValid() if self.template_layer else False}, Source valid={self.source_layer.isValid() if self.source_layer else False}")
+                self.mapping_model.set_template_fields([])
                 return
 
-            template_fields = [field.name() for field in self.template_layer.fields()]
-            source_fields = [field.name() for field in self.source_layer.fields()]
-            source_fields.insert(0, "<None>")
-
-            for template_field in template_fields:
-                h_layout = QHBoxLayout()
-                label = QLabel(f"Template: {template_field}")
-                combo = QComboBox()
-                combo.addItems(source_fields)
-                combo.setMinimumWidth(200)
-                for src_field in source_fields[1:]:
-                    if template_field.lower() == src_field.lower() or \
-                       template_field.lower() in src_field.lower() or \
-                       src_field.lower() in template_field.lower():
-                        combo.setCurrentText(src_field)
-                        break
-                h_layout.addWidget(label)
-                h_layout.addWidget(combo)
-                self.attribute_layout.addLayout(h_layout)
-                self.combos[template_field] = combo
+            if hasattr(self, 'key_field_combo'):
+                self.update_key_fields()
+            self.update_source_filter()
+
+            self.mapping_model.set_template_fields(self.template_layer.fields().names())
+            self.source_fields_model.setStringList(["<None>"] + self.source_layer.fields().names())
+            self.show_source_statistics(self.source_layer.id())
+            self.field_statistics.request(self.source_layer)
+
+            # Suggest one source field per template field
+            matcher = SchemaMatcher([(field.name(), field_kind(field)) for field in self.source_layer.fields()])
+            self.matches = {match.template: match for match in matcher.match(
+                [(field.name(), field_kind(field)) for field in self.template_layer.fields()])}
+            self.mapping_model.set_mapping({name: match.source for name, match in self.matches.items()},
+                                           {name: match.score for name, match in self.matches.items()})
+            self.update_profiles()
             logger.debug("Attribute mapping updated")
         except Exception as e:
             logger.error(f"Error in update_attribute_mapping: {str(e)}")
@@ -216,28 +282,14 @@ class AttributeTransferToSchemaDialog(QDialog):
     def get_mapping(self):
         """Return the field mapping and selected layers."""
         try:
-            # Refresh layer list
-            self.layers = [layer for layer in QgsProject.instance().mapLayers().values() if layer.type() == 0]
-            self.layer_names = [layer.name() for layer in self.layers]
-            logger.debug(f"Layer list in get_mapping: {self.layer_names}")
-
-            # Get selected layer names
-            template_name = self.template_combo.currentText()
-            source_name = self.source_combo.currentText()
-            logger.debug(f"Template name in get_mapping: {template_name}")
-            logger.debug(f"Source name in get_mapping: {source_name}")
-
-            # Fetch layers
-            self.template_layer = None
-            self.source_layer = None
-            for layer in self.layers:
-                if layer.name() == template_name:
-                    self.template_layer = layer
-                if layer.name() == source_name:
-                    self.source_layer = layer
+            # Apply a layer change that has not been rebuilt yet
+            if self.mapping_timer.isActive():
+                self.update_attribute_mapping()
+            self.template_layer, self.source_layer = self.selected_layers()
 
             if not self.template_layer or not self.source_layer:
-                logger.error(f"Invalid layers: Template={template_name}, Source={source_name}")
+                logger.error(f"Invalid layers: Template={self.template_combo.currentText()}, "
+                             f"Source={self.source_combo.currentText()}")
                 return {}, None, None
 
             # Validate layer integrity
@@ -245,12 +297,170 @@ class AttributeTransferToSchemaDialog(QDialog):
                 logger.error(f"Invalid layers: Template valid={self.template_layer.isValid()}, Source valid={self.source_layer.isValid()}")
                 return {}, None, None
 
-            for template_field, combo in self.combos.items():
-                source_field = combo.currentText()
-                if source_field != "<None>":
-                    self.mapping[template_field] = source_field
+            self.mapping = self.combo_mapping()
             logger.debug(f"Mapping retrieved: {self.mapping}")
             return self.mapping, self.template_layer, self.source_layer
         except Exception as e:
             logger.error(f"Error in get_mapping: {str(e)}")
-            return {}, None, None
\ No newline at end of file
+            return {}, None, None
+
+    def selected_layers(self):
+        """Return the template and source layers picked in the layer dropdowns."""
+        return (self.layer_registry.layer(self.template_combo.currentData()),
+                self.layer_registry.layer(self.source_combo.currentData()))
+
+    def schedule_mapping_update(self):
+        """Rebuild the mapping once the layer dropdowns stop changing."""
+        self.mapping_timer.start()
+
+    def add_layer_item(self, layer_id):
+        """Offer a layer added to the project in both layer dropdowns."""
+        name = self.layer_registry.name(layer_id)
+        self.template_combo.addItem(name, layer_id)
+        self.source_combo.addItem(name, layer_id)
+
+    def remove_layer_item(self, layer_id):
+        """Remove a layer leaving the project from both layer dropdowns."""
+        for combo in (self.template_combo, self.source_combo):
+            index = combo.findData(layer_id)
+            if index >= 0:
+                combo.removeItem(index)
+
+    def rename_layer_item(self, layer_id):
+        """Show the new name of a renamed layer in both layer dropdowns."""
+        name = self.layer_registry.name(layer_id)
+        for combo in (self.template_combo, self.source_combo):
+            index = combo.findData(layer_id)
+            if index >= 0:
+                combo.setItemText(index, name)
+
+    @staticmethod
+    def select_layer(combo, layer_id):
+        """Make a layer the current item of a layer dropdown, if it is listed."""
+        index = combo.findData(layer_id) if layer_id else -1
+        if index >= 0:
+            combo.setCurrentIndex(index)
+
+    def done(self, result):
+        """Stop following the project layers when the dialog closes."""
+        self.mapping_timer.stop()
+        try:
+            self.layer_registry.layerAdded.disconnect(self.add_layer_item)
+            self.layer_registry.layerRemoved.disconnect(self.remove_layer_item)
+            self.layer_registry.layerRenamed.disconnect(self.rename_layer_item)
+            self.field_statistics.statisticsReady.disconnect(self.show_source_statistics)
+        except TypeError:
+            pass  # Not connected when the UI failed to initialize
+        super().done(result)
+
+    def show_source_statistics(self, layer_id):
+        """Show the sampled source field values once a layer has been sampled."""
+        if not self.source_layer or self.source_layer.id() != layer_id:
+            return
+        statistics = {}
+        for name in self.source_layer.fields().names():
+            field_statistics = self.field_statistics.get(layer_id, name)
+            if field_statistics is not None:
+                statistics[name] = field_statistics
+        self.mapping_model.set_source_statistics(statistics)
+
+    def combo_mapping(self):
+        """Return the mapping currently chosen in the mapping table."""
+        return self.mapping_model.mapping()
+
+    def update_profiles(self):
+        """List the saved profiles and apply the one made for the template schema."""
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItem("<None>")
+        name = None
+        if self.profile_store is not None:
+            self.profile_combo.addItems(self.profile_store.names())
+            name = self.profile_store.find(schema_fingerprint(self.template_layer.fields()),
+                                           self.source_layer.fields().names())
+        self.profile_combo.setCurrentText(name or "<None>")
+        self.profile_combo.blockSignals(False)
+        if name:
+            logger.debug(f"Applying mapping profile {name}")
+            self.apply_profile(name)
+
+    def apply_profile(self, name):
+        """Set the mapping table from a saved profile."""
+        if self.profile_store is None or name == "<None>":
+            return
+        mapping = self.profile_store.mapping(name)
+        if mapping is None:
+            return
+        self.mapping_model.set_mapping(mapping)
+
+    def save_profile(self):
+        """Save the current mapping as a named profile for the template schema."""
+        if self.profile_store is None or not self.template_layer:
+            return
+        current = self.profile_combo.currentText()
+        name, ok = QInputDialog.getText(self, "Save Mapping Profile", "Profile name:",
+                                        text="" if current == "<None>" else current)
+        name = name.strip()
+        if not ok or not name:
+            return
+        try:
+            self.profile_store.save(name, schema_fingerprint(self.template_layer.fields()), self.combo_mapping())
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save mapping profile: {str(e)}")
+            return
+        self.profile_combo.blockSignals(True)
+        if self.profile_combo.findText(name) < 0:
+            self.profile_combo.addItem(name)
+        self.profile_combo.setCurrentText(name)
+        self.profile_combo.blockSignals(False)
+
+    def update_key_fields(self):
+        """Offer the fields of the selected template layer as upsert keys."""
+        current_key = self.key_field_combo.currentText()
+        self.key_field_combo.clear()
+        if self.template_layer:
+            self.key_field_combo.addItems([field.name() for field in self.template_layer.fields()])
+        if current_key:
+            self.key_field_combo.setCurrentText(current_key)
+
+    def update_source_filter(self):
+        """Point the source filter widgets at the selected source layer."""
+        self.filter_expression_widget.setLayer(self.source_layer)
+        self.selected_only_check.setEnabled(self.source_layer.selectedFeatureCount() > 0)
+        if not self.selected_only_check.isEnabled():
+            self.selected_only_check.setChecked(False)
+        crs = self.source_layer.crs()
+        self.extent_group.setOutputCrs(crs)
+        self.extent_group.setOriginalExtent(self.source_layer.extent(), crs)
+        self.extent_group.setOutputExtentFromOriginal()
+
+    def update_output_widgets(self):
+        """Enable the widgets that apply to the selected output mode."""
+        mode = self.output_mode_combo.currentData()
+        self.output_file_widget.setEnabled(mode == "new_file")
+        self.key_field_combo.setEnabled(mode in ("upsert", "delta"))
+        self.quarantine_file_widget.setEnabled(self.error_policy_combo.currentData() == "quarantine")
+        self.random_sample_check.setEnabled(self.dry_run_check.isChecked())
+
+    def get_options(self):
+        """Return the transfer options chosen in the dialog."""
+        mode = self.output_mode_combo.currentData()
+        error_policy = self.error_policy_combo.currentData()
+        options = {'mode': mode, 'key_field': None, 'output_path': None,
+                   'pushdown': self.pushdown_check.isChecked(),
+                   'threaded': self.threaded_check.isChecked(),
+                   'instrument': self.metrics_check.isChecked(),
+                   'dry_run': self.dry_run_check.isChecked(),
+                   'random_sample': self.random_sample_check.isChecked(),
+                   'error_policy': error_policy, 'quarantine_path': None,
+                   'selected_only': self.selected_only_check.isChecked(),
+                   'filter_expression': self.filter_expression_widget.expression().strip() or None,
+                   'filter_extent': self.extent_group.outputExtent() if self.extent_group.isChecked() else None}
+        if error_policy == "quarantine":
+            options['quarantine_path'] = self.quarantine_file_widget.filePath()
+        if mode == "new_file":
+            options['mode'] = "replace"
+            options['output_path'] = self.output_file_widget.filePath()
+        elif mode in ("upsert", "delta"):
+            options['key_field'] = self.key_field_combo.currentText()
+        return options
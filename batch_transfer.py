@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ BatchTransferRunner
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QObject, QThread, QCoreApplication, pyqtSignal
+from qgis.core import QgsApplication, QgsProviderRegistry
+from .mapping_file import read_mapping_file
+from .mapping_profiles import schema_fingerprint
+from .schema_matcher import SchemaMatcher
+from .transfer_engine import (TransferError, check_geometry_compatibility, DEFAULT_BATCH_SIZE, MODE_REPLACE,
+                              MODE_APPEND, ERROR_ABORT)
+from .sql_pushdown import SqlPushdown, layer_location
+from .transfer_plan import TransferPlan
+from .transfer_task import AttributeTransferTask
+from .type_coercion import field_kind
+import csv
+import json
+import logging
+import os.path
+import time
+
+logger = logging.getLogger(__name__)
+
+# Columns of the batch summary report
+REPORT_FIELDS = ['job', 'source', 'template', 'status', 'rows_written', 'rows_rejected', 'elapsed', 'error']
+
+
+def dataset_key(layer):
+    """Return a key shared by the layers written through the same dataset.
+
+    SQLite allows one writer per file, so GeoPackage and SpatiaLite layers
+    are keyed on the file; PostGIS layers on their table; other file
+    formats on their path; anything else on the layer ID.
+    """
+    location = layer_location(layer)
+    if location is not None:
+        provider, connection_uri, schema, table = location
+        if provider == 'postgres':
+            return (connection_uri, schema, table)
+        return connection_uri
+    if layer.providerType() == 'ogr':
+        path = QgsProviderRegistry.instance().decodeUri('ogr', layer.source()).get('path')
+        if path:
+            return os.path.normcase(os.path.abspath(path))
+    return layer.id()
+
+class BatchTransferJob:
+    """One source layer to transfer into one template layer."""
+
+    def __init__(self, source_layer, template_layer, mapping=None, name=None, output_path=None,
+                 mode=MODE_REPLACE, key_field=None, quarantine_path=None, source_filter=None):
+        """Constructor.
+
+        :param mapping: Field mapping dict or path to a mapping file. When
+            None, the runner's shared mapping is used.
+
+        :param output_path: New file to write instead of replacing the
+            template features. The template then only provides the schema.
+
+        :param mode: MODE_REPLACE, MODE_APPEND, MODE_UPSERT or MODE_DELTA,
+            for jobs writing into the template layer.
+
+        :param key_field: Template field matched on in MODE_UPSERT and
+            MODE_DELTA.
+
+        :param quarantine_path: GeoPackage or CSV file receiving the rejected
+            rows when the runner uses ERROR_QUARANTINE.
+
+        :param source_filter: Restricts the source features transferred.
+        :type source_filter: SourceFilter
+        """
+        self.source_layer = source_layer
+        self.template_layer = template_layer
+        self.mapping = mapping
+        self.output_path = output_path
+        self.mode = mode
+        self.key_field = key_field
+        self.quarantine_path = quarantine_path
+        self.source_filter = source_filter
+        self.name = name or source_layer.name()
+        self.status = 'queued'
+        self.error = None
+        self.report = None
+        self.started = None
+        self.elapsed = 0.0
+
+    def summary(self):
+        """Return the outcome of the job as a report row."""
+        report = self.report
+        return {
+            'job': self.name,
+            'source': self.source_layer.name(),
+            'template': self.output_path or self.template_layer.name(),
+            'status': self.status,
+            'rows_written': report.rows_written if report else 0,
+            'rows_rejected': report.rows_rejected if report else 0,
+            'elapsed': round(self.elapsed, 3),
+            'error': self.error or '',
+        }
+
+
+class BatchTransferRunner(QObject):
+    """Run many transfer jobs as a pool of background tasks.
+
+    At most max_concurrent jobs run at once, and jobs writing to the same
+    database file, table or output file never run at the same time. When
+    several jobs replace the features of the same template, only the first
+    one clears it and the later ones append to it.
+    """
+
+    jobFinished = pyqtSignal(object)
+    finished = pyqtSignal(list)
+
+    def __init__(self, jobs, mapping=None, max_concurrent=None,
+                 batch_size=DEFAULT_BATCH_SIZE, allow_pushdown=True, error_policy=ERROR_ABORT,
+                 threaded=False, match_score=None, profile_store=None, parent=None):
+        """Constructor.
+
+        :param jobs: Jobs to run, in order.
+        :type jobs: list of BatchTransferJob
+
+        :param mapping: Mapping shared by jobs that do not have their own.
+            Jobs with neither map fields with identical names.
+        :type mapping: dict or str
+
+        :param max_concurrent: Maximum number of jobs running at once.
+            Defaults to the number of CPU cores.
+        :type max_concurrent: int
+
+        :param allow_pushdown: Run jobs whose layers share a database as SQL
+            inside that database. Only used with ERROR_ABORT.
+        :type allow_pushdown: bool
+
+        :param error_policy: ERROR_ABORT, ERROR_SKIP or ERROR_QUARANTINE,
+            applied to rows that cannot be converted or written.
+        :type error_policy: str
+
+        :param threaded: Read each source on its own thread while the job's
+            task writes.
+        :type threaded: bool
+
+        :param match_score: For jobs without a mapping, accept the schema
+            matcher's suggestions scoring at least this much, e.g.
+            AUTO_ACCEPT_SCORE, instead of mapping identical names only.
+        :type match_score: float
+
+        :param profile_store: Saved mapping profiles. Jobs without a mapping
+            use the profile made for their template schema, if there is one.
+        :type profile_store: ProfileStore
+        """
+        super().__init__(parent)
+        self.jobs = list(jobs)
+        self.mapping = mapping
+        self.max_concurrent = max(1, max_concurrent or QThread.idealThreadCount())
+        self.batch_size = batch_size
+        self.allow_pushdown = allow_pushdown
+        self.error_policy = error_policy
+        self.threaded = threaded
+        self.match_score = match_score
+        self.profile_store = profile_store
+        self.pending = list(self.jobs)
+        self.running = {}
+        # Dataset key -> the job that replaces the features of that template
+        self.replacing_jobs = {}
+        self.done = False
+
+    def job_mapping(self, job):
+        """Return the field mapping dict to use for a job."""
+        mapping = job.mapping if job.mapping is not None else self.mapping
+        if mapping is None and self.profile_store is not None:
+            profile = self.profile_store.find(schema_fingerprint(job.template_layer.fields()),
+                                              job.source_layer.fields().names())
+            if profile:
+                logger.debug(f"Job {job.name} uses mapping profile {profile}")
+                return self.profile_store.mapping(profile)
+        if mapping is None and self.match_score is not None:
+            matcher = SchemaMatcher([(field.name(), field_kind(field)) for field in job.source_layer.fields()])
+            return matcher.suggest([(field.name(), field_kind(field)) for field in job.template_layer.fields()],
+                                   self.match_score)
+        if mapping is None:
+            source_fields = job.source_layer.fields()
+            return {field.name(): field.name() for field in job.template_layer.fields()
+                    if source_fields.lookupField(field.name()) >= 0}
+        if isinstance(mapping, str):
+            return read_mapping_file(mapping)
+        return mapping
+
+    def job_target(self, job):
+        """Return the key of the dataset a job writes to."""
+        if job.output_path:
+            return os.path.normcase(os.path.abspath(job.output_path))
+        return dataset_key(job.template_layer)
+
+    def job_mode(self, job):
+        """Return the mode a job writes to its template with.
+
+        Replacing jobs after the first one on a template append instead, so
+        the template ends up with the rows of all of them.
+        """
+        if job.output_path or job.mode != MODE_REPLACE:
+            return job.mode
+        location = layer_location(job.template_layer)
+        key = location[1:] if location is not None else self.job_target(job)
+        first = self.replacing_jobs.setdefault(key, job)
+        if first is job:
+            return MODE_REPLACE
+        if first.status != 'done':
+            raise TransferError(f"Job {first.name} did not replace the features of {job.template_layer.name()}.")
+        return MODE_APPEND
+
+    def start(self):
+        """Start as many jobs as the concurrency limit allows."""
+        busy_targets = {self.job_target(job) for job in self.running.values()}
+        for job in list(self.pending):
+            if len(self.running) >= self.max_concurrent:
+                break
+            if self.job_target(job) in busy_targets:
+                continue
+            self.pending.remove(job)
+            if self.start_job(job):
+                busy_targets.add(self.job_target(job))
+        if not self.running and not self.pending and not self.done:
+            self.done = True
+            self.finished.emit(self.summary())
+
+    def start_job(self, job):
+        """Prepare the template of a job and queue its task."""
+        job.started = time.perf_counter()
+        try:
+            mode = self.job_mode(job)
+            check_geometry_compatibility(job.template_layer.wkbType(), job.source_layer.wkbType())
+            plan = TransferPlan.from_layers(self.job_mapping(job), job.template_layer, job.source_layer,
+                                            source_filter=job.source_filter)
+            pushdown = None
+            if not job.output_path and self.allow_pushdown and self.error_policy == ERROR_ABORT:
+                pushdown = SqlPushdown.for_layers(plan, job.template_layer, job.source_layer, mode)
+            task = AttributeTransferTask(plan, job.source_layer, job.template_layer, self.batch_size,
+                                         job.output_path, mode, job.key_field, pushdown=pushdown,
+                                         error_policy=self.error_policy, quarantine_path=job.quarantine_path,
+                                         threaded=self.threaded)
+        except (TransferError, ValueError, OSError) as e:
+            self.job_done(job, None, str(e))
+            return False
+        task.taskCompleted.connect(lambda: self.task_finished(task))
+        task.taskTerminated.connect(lambda: self.task_finished(task))
+        job.status = 'running'
+        self.running[task] = job
+        QgsApplication.taskManager().addTask(task)
+        return True
+
+    def task_finished(self, task):
+        """Record the outcome of a task and start the next jobs."""
+        job = self.running.pop(task, None)
+        if job is None:
+            return
+        error = task.error
+        if not error and (task.report is None or task.report.canceled):
+            error = 'Canceled'
+        self.job_done(job, task.report, error)
+        self.start()
+
+    def job_done(self, job, report, error):
+        """Store the result of a finished job."""
+        job.report = report
+        job.error = error
+        job.status = 'failed' if error else 'done'
+        job.elapsed = time.perf_counter() - job.started
+        logger.debug(f"Batch job finished: {job.summary()}")
+        self.jobFinished.emit(job)
+
+    def cancel(self):
+        """Drop queued jobs and cancel running ones."""
+        for job in self.pending:
+            job.status = 'canceled'
+        self.pending = []
+        for task in list(self.running):
+            task.cancel()
+        if not self.running:
+            self.start()
+
+    def wait(self):
+        """Block until every job is finished, processing events meanwhile.
+
+        Used by scripts that have no running event loop of their own.
+        """
+        while not self.done:
+            QCoreApplication.processEvents()
+            time.sleep(0.05)
+        return self.summary()
+
+    def summary(self):
+        """Return one report row per job."""
+        return [job.summary() for job in self.jobs]
+
+    def write_report(self, path):
+        """Write the summary report to a JSON or CSV file."""
+        rows = self.summary()
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(rows, f, indent=2)
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
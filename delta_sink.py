@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ DeltaSink
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsFeatureRequest, QgsFeatureSink
+from .upsert_sink import UpsertSink, is_null_key
+from contextlib import closing
+import hashlib
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+def row_hash(attributes, geometry=None):
+    """Return a compact hash of an attribute list and an optional geometry."""
+    digest = hashlib.blake2b(digest_size=8)
+    for value in attributes:
+        digest.update(b'\x00' if value is None or isinstance(value, QVariant) else str(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    if geometry is not None and not geometry.isNull():
+        digest.update(bytes(geometry.asWkb()))
+    return digest.digest()
+
+
+class HashCache:
+    """Sidecar SQLite store of row hashes, keyed by layer and key value."""
+
+    def __init__(self, path):
+        """Constructor."""
+        self.path = path
+        with closing(sqlite3.connect(self.path)) as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS row_hashes '
+                '(layer_key TEXT, row_key TEXT, hash BLOB, PRIMARY KEY (layer_key, row_key))')
+            connection.commit()
+
+    def load(self, layer_key):
+        """Return the stored hashes of a layer as a dict of row key -> hash."""
+        with closing(sqlite3.connect(self.path)) as connection:
+            rows = connection.execute(
+                'SELECT row_key, hash FROM row_hashes WHERE layer_key = ?', (layer_key,))
+            return {row_key: bytes(value) for row_key, value in rows}
+
+    def save(self, layer_key, hashes):
+        """Replace the stored hashes of a layer."""
+        with closing(sqlite3.connect(self.path)) as connection:
+            connection.execute('DELETE FROM row_hashes WHERE layer_key = ?', (layer_key,))
+            connection.executemany(
+                'INSERT INTO row_hashes (layer_key, row_key, hash) VALUES (?, ?, ?)',
+                ((layer_key, row_key, value) for row_key, value in hashes.items()))
+            connection.commit()
+
+    def clear(self, layer_key):
+        """Forget the stored hashes of a layer, forcing a full comparison."""
+        self.save(layer_key, {})
+
+
+class DeltaSink(UpsertSink):
+    """Feature sink that only writes rows that changed since the last run.
+
+    Incoming rows are hashed and compared with the hashes of the previous
+    run; unchanged rows are dropped, changed rows are updated and new keys
+    inserted. flushBuffer() deletes template features whose key was not
+    seen. Without cached hashes, the template features are hashed once.
+    Only the field_indices columns are hashed, on both sides, since the
+    incoming rows leave the other columns empty. Source rows rejected
+    before they reach the sink are passed to keep_rejected(), so that
+    their template features are not deleted.
+    """
+
+    def __init__(self, provider, key_index, cache, layer_key, with_geometry=True, field_indices=None,
+                 source_key=None):
+        """Constructor.
+
+        :param cache: Sidecar store of row hashes.
+        :type cache: HashCache
+
+        :param layer_key: Key of the template layer in the cache, built from
+            its source and the key field.
+        :type layer_key: str
+
+        :param source_key: Returns the template key value of a source
+            feature, raising ValueError if it cannot be converted. Without
+            it, no feature is deleted once a row has been rejected.
+        :type source_key: callable
+        """
+        super().__init__(provider, key_index, field_indices=field_indices)
+        self.cache = cache
+        self.layer_key = layer_key
+        self.with_geometry = with_geometry
+        self.source_key = source_key
+        self.hashes = None
+        self.seen = set()
+        self.keep_missing = False
+        self.rows_unchanged = 0
+        self.rows_deleted = 0
+
+    def build_index(self):
+        """Index the template keys and load or compute their row hashes."""
+        super().build_index()
+        self.hashes = self.cache.load(self.layer_key)
+        if not self.hashes and self.index:
+            request = QgsFeatureRequest()
+            if not self.with_geometry:
+                request.setFlags(QgsFeatureRequest.NoGeometry)
+            if self.field_indices is not None:
+                request.setSubsetOfAttributes(sorted(set(self.field_indices) | {self.key_index}))
+            for feature in self.provider.getFeatures(request):
+                key = feature.attribute(self.key_index)
+                if not is_null_key(key):
+                    self.hashes[str(key)] = self.feature_hash(feature)
+            logger.debug(f"Hashed {len(self.hashes)} existing template rows")
+
+    def feature_hash(self, feature):
+        """Return the hash of the compared columns and geometry of a feature."""
+        attributes = feature.attributes()
+        if self.field_indices is not None:
+            attributes = [attributes[index] for index in self.field_indices]
+        return row_hash(attributes, feature.geometry() if self.with_geometry else None)
+
+    def addFeatures(self, features, flags=QgsFeatureSink.Flags()):
+        """Write the inserted and changed rows of a batch."""
+        if self.index is None:
+            self.build_index()
+        changed = []
+        pending = {}
+        for feature in features:
+            key = feature.attribute(self.key_index)
+            row_key = str(key)
+            self.seen.add(row_key)
+            value = self.feature_hash(feature)
+            if not is_null_key(key) and key in self.index and self.hashes.get(row_key) == value:
+                self.rows_unchanged += 1
+                continue
+            pending[row_key] = value
+            changed.append(feature)
+        if not changed:
+            return True
+        if not super().addFeatures(changed, flags):
+            # Rows that were not written keep their old hash and are retried next run
+            return False
+        self.hashes.update(pending)
+        return True
+
+    def keep_rejected(self, source_features):
+        """Mark the keys of source rows that were rejected as seen."""
+        for feature in source_features:
+            try:
+                if self.source_key is None:
+                    raise ValueError("No source key")
+                key = self.source_key(feature)
+            except ValueError:
+                # Any template feature could belong to this row
+                self.keep_missing = True
+                continue
+            if not is_null_key(key):
+                self.seen.add(str(key))
+
+    def flushBuffer(self):
+        """Delete template features whose key no longer exists in the source."""
+        if self.index is None:
+            self.build_index()
+        if self.keep_missing:
+            logger.warning("Rows with an unknown key were rejected; no template features are deleted")
+            self.seen.update(str(key) for key in self.index)
+        deleted = [fid for key, fid in self.index.items() if str(key) not in self.seen]
+        if deleted and not self.provider.deleteFeatures(deleted):
+            self.error = f"Failed to delete {len(deleted)} features"
+            return False
+        self.rows_deleted = len(deleted)
+        for key in [key for key in self.hashes if key not in self.seen]:
+            del self.hashes[key]
+        logger.debug(f"Delta: {self.rows_inserted} inserted, {self.rows_updated} updated, "
+                     f"{self.rows_deleted} deleted, {self.rows_unchanged} unchanged")
+        return True
+
+    def save_hashes(self):
+        """Store the row hashes once the changes have been committed."""
+        self.cache.save(self.layer_key, self.hashes)
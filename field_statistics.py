@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ FieldStatistics
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ Statistics are computed from a bounded random sample of the first
+ SCAN_LIMIT rows, so sampling a field never scans the whole layer.
+"""
+from qgis.PyQt.QtCore import QDate, QDateTime, QObject, QTime, pyqtSignal
+from qgis.core import QgsApplication, QgsFeatureRequest, QgsTask, QgsVectorLayerFeatureSource
+from .type_coercion import is_null, to_bool, to_date, to_double, to_integer, to_string
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+# Rows read at most, and rows kept in the sample
+SCAN_LIMIT = 20000
+SAMPLE_SIZE = 2000
+# Distinct values shown as a preview
+PREVIEW_VALUES = 5
+
+# Kinds tried for text values, narrowest first
+TEXT_KINDS = (
+    ('integer', to_integer),
+    ('double', to_double),
+    ('date', to_date),
+    ('bool', to_bool),
+)
+
+def reservoir_sample(items, size, rng=None):
+    """Return a uniform random sample of at most size items, reading items once."""
+    rng = rng or random.Random()
+    sample = []
+    for seen, item in enumerate(items):
+        if seen < size:
+            sample.append(item)
+            continue
+        slot = rng.randint(0, seen)
+        if slot < size:
+            sample[slot] = item
+    return sample
+
+
+def value_kind(value):
+    """Return the kind of a value, parsing text as the narrowest kind it converts to."""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'double'
+    if isinstance(value, QDateTime):
+        return 'datetime'
+    if isinstance(value, QDate):
+        return 'date'
+    if isinstance(value, QTime):
+        return 'time'
+    if isinstance(value, str):
+        for kind, convert in TEXT_KINDS:
+            try:
+                convert(value)
+                return kind
+            except (TypeError, ValueError):
+                continue
+    return 'string'
+
+
+def infer_kind(values):
+    """Return the kind shared by all values, or None when there are none."""
+    kinds = {value_kind(value) for value in values}
+    if not kinds:
+        return None
+    if len(kinds) == 1:
+        return kinds.pop()
+    if kinds == {'integer', 'double'}:
+        return 'double'
+    return 'string'
+
+
+class FieldStatistics:
+    """Null ratio, inferred kind and example values of one field in a sample."""
+
+    def __init__(self, name, values):
+        """Constructor.
+
+        :param name: Field name.
+        :type name: str
+
+        :param values: Values of the field in the sampled rows.
+        :type values: list
+        """
+        self.name = name
+        self.rows = len(values)
+        present = [value for value in values if not is_null(value)]
+        self.nulls = self.rows - len(present)
+        self.kind = infer_kind(present)
+        self.examples = []
+        for value in present:
+            text = to_string(value)
+            if text not in self.examples:
+                self.examples.append(text)
+                if len(self.examples) == PREVIEW_VALUES:
+                    break
+
+    def null_ratio(self):
+        """Return the share of sampled rows where the field is NULL."""
+        return self.nulls / self.rows if self.rows else 0.0
+
+    def summary(self):
+        """Return a one-line description for the mapping table."""
+        if not self.rows:
+            return "no rows"
+        return f"{self.kind or 'empty'}, {self.null_ratio():.0%} null: {', '.join(self.examples)}"
+
+
+def sample_statistics(rows, field_names):
+    """Return a dict of field name -> FieldStatistics for sampled attribute rows."""
+    return {name: FieldStatistics(name, [row[column] for row in rows])
+            for column, name in enumerate(field_names)}
+
+
+class FieldStatisticsTask(QgsTask):
+    """Sample the fields of a layer in the background."""
+
+    def __init__(self, layer, field_names, sample_size=SAMPLE_SIZE, scan_limit=SCAN_LIMIT):
+        """Constructor. Must be called on the main thread."""
+        super().__init__(f"Sampling fields of {layer.name()}", QgsTask.CanCancel)
+        self.layer_id = layer.id()
+        self.field_names = field_names
+        self.sample_size = sample_size
+        self.source = QgsVectorLayerFeatureSource(layer)
+        self.indices = [layer.fields().lookupField(name) for name in field_names]
+        self.request = QgsFeatureRequest()
+        self.request.setFlags(QgsFeatureRequest.NoGeometry)
+        self.request.setSubsetOfAttributes(self.indices)
+        self.request.setLimit(scan_limit)
+        self.expected = min(scan_limit, max(layer.featureCount(), 1))
+        self.statistics = {}
+
+    def rows(self):
+        """Yield the sampled attributes of each feature read, stopping when canceled."""
+        for count, feature in enumerate(self.source.getFeatures(self.request)):
+            if count % 1000 == 0:
+                if self.isCanceled():
+                    return
+                self.setProgress(100.0 * count / self.expected)
+            attributes = feature.attributes()
+            yield [attributes[index] for index in self.indices]
+
+    def run(self):
+        """Read the sample. Runs on a worker thread."""
+        try:
+            sample = reservoir_sample(self.rows(), self.sample_size)
+            if self.isCanceled():
+                return False
+            self.statistics = sample_statistics(sample, self.field_names)
+            logger.debug(f"Sampled {len(sample)} rows of {len(self.field_names)} fields of {self.layer_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error sampling fields: {str(e)}")
+            return False
+
+
+class FieldStatisticsCache(QObject):
+    """Field statistics computed on demand and kept per layer and field.
+
+    A layer is sampled at most once at a time, and its statistics are
+    dropped when its features change.
+    """
+
+    statisticsReady = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        """Constructor."""
+        super().__init__(parent)
+        self.statistics = {}
+        self.tasks = {}
+        self.watched = set()
+
+    def get(self, layer_id, field_name):
+        """Return the cached statistics of a field, or None if it has not been sampled."""
+        return self.statistics.get((layer_id, field_name))
+
+    def request(self, layer):
+        """Start sampling the fields of a layer that are not cached yet.
+
+        :returns: True if a sampling task was started.
+        :rtype: bool
+        """
+        layer_id = layer.id()
+        if layer_id in self.tasks:
+            return False
+        missing = [name for name in layer.fields().names() if (layer_id, name) not in self.statistics]
+        if not missing:
+            return False
+        if layer_id not in self.watched:
+            self.watched.add(layer_id)
+            layer.dataChanged.connect(lambda: self.invalidate(layer_id))
+        task = FieldStatisticsTask(layer, missing)
+        task.taskCompleted.connect(lambda: self.task_finished(task))
+        task.taskTerminated.connect(lambda: self.task_finished(task))
+        self.tasks[layer_id] = task
+        QgsApplication.taskManager().addTask(task)
+        return True
+
+    def task_finished(self, task):
+        """Store the statistics of a finished task."""
+        if self.tasks.get(task.layer_id) is not task:
+            return
+        del self.tasks[task.layer_id]
+        for name, statistics in task.statistics.items():
+            self.statistics[(task.layer_id, name)] = statistics
+        if task.statistics:
+            self.statisticsReady.emit(task.layer_id)
+
+    def invalidate(self, layer_id):
+        """Forget the statistics of a layer and cancel its sampling."""
+        task = self.tasks.pop(layer_id, None)
+        if task is not None:
+            task.cancel()
+        for key in [key for key in self.statistics if key[0] == layer_id]:
+            del self.statistics[key]
+
+    def cancel(self):
+        """Cancel every running sampling task."""
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks = {}
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Geometry conversion
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.core import (QgsCoordinateTransform, QgsCoordinateTransformContext, QgsCsException, QgsGeometry,
+                       QgsWkbTypes)
+from .transfer_engine import check_geometry_compatibility
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GeometryConverter:
+    """Convert source geometries to the geometry type and CRS of the template.
+
+    The steps needed are worked out once from the two WKB types; each
+    geometry then only goes through those steps.
+    """
+
+    def __init__(self, template_wkb_type, source_wkb_type, transform=None):
+        """Constructor.
+
+        :param template_wkb_type: Geometry type of the template layer.
+        :type template_wkb_type: QgsWkbTypes.Type
+
+        :param source_wkb_type: Geometry type of the source layer.
+        :type source_wkb_type: QgsWkbTypes.Type
+
+        :param transform: Transform from the source to the template CRS,
+            created once for the whole run.
+        :type transform: QgsCoordinateTransform
+        """
+        self.transform = transform
+        self.segmentize = QgsWkbTypes.isCurvedType(source_wkb_type) and not QgsWkbTypes.isCurvedType(template_wkb_type)
+        self.drop_z = QgsWkbTypes.hasZ(source_wkb_type) and not QgsWkbTypes.hasZ(template_wkb_type)
+        self.add_z = QgsWkbTypes.hasZ(template_wkb_type) and not QgsWkbTypes.hasZ(source_wkb_type)
+        self.drop_m = QgsWkbTypes.hasM(source_wkb_type) and not QgsWkbTypes.hasM(template_wkb_type)
+        self.add_m = QgsWkbTypes.hasM(template_wkb_type) and not QgsWkbTypes.hasM(source_wkb_type)
+        self.to_multi = QgsWkbTypes.isMultiType(template_wkb_type) and not QgsWkbTypes.isMultiType(source_wkb_type)
+        self.to_single = QgsWkbTypes.isMultiType(source_wkb_type) and not QgsWkbTypes.isMultiType(template_wkb_type)
+
+    def is_identity(self):
+        """Return True when geometries can be copied unchanged."""
+        return self.transform is None and not any((
+            self.segmentize, self.drop_z, self.add_z, self.drop_m, self.add_m, self.to_multi, self.to_single))
+
+    def convert(self, geometry):
+        """Return a converted copy of a geometry.
+
+        Raises ValueError for geometries that cannot be converted, such as
+        multi-part geometries for a single-part template.
+        """
+        if geometry.isNull():
+            return geometry
+        if self.segmentize:
+            geometry = QgsGeometry(geometry.constGet().segmentize())
+        else:
+            geometry = QgsGeometry(geometry)
+        if self.transform is not None:
+            try:
+                geometry.transform(self.transform)
+            except QgsCsException as e:
+                raise ValueError(f"cannot reproject geometry: {str(e)}")
+        if self.drop_z:
+            geometry.get().dropZValue()
+        elif self.add_z:
+            geometry.get().addZValue(0)
+        if self.drop_m:
+            geometry.get().dropMValue()
+        elif self.add_m:
+            geometry.get().addMValue(0)
+        if self.to_multi:
+            geometry.convertToMultiType()
+        elif self.to_single:
+            if geometry.constGet().partCount() > 1:
+                raise ValueError("multi-part geometry does not fit a single-part template")
+            geometry.convertToSingleType()
+        return geometry
+
+
+def geometry_converter_for(template_wkb_type, source_wkb_type, template_crs=None, source_crs=None,
+                           transform_context=None):
+    """Return the converter for a layer pair, or None if geometries are copied unchanged.
+
+    Raises TransferError when the geometry families differ.
+    """
+    check_geometry_compatibility(template_wkb_type, source_wkb_type)
+    transform = None
+    if (template_crs is not None and source_crs is not None and template_crs.isValid()
+            and source_crs.isValid() and template_crs != source_crs):
+        transform = QgsCoordinateTransform(
+            source_crs, template_crs, transform_context or QgsCoordinateTransformContext())
+        logger.debug(f"Reprojecting from {source_crs.authid()} to {template_crs.authid()}")
+    converter = GeometryConverter(template_wkb_type, source_wkb_type, transform)
+    if converter.is_identity():
+        return None
+    return converter
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ LayerRegistry
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+from qgis.core import QgsProject, QgsVectorLayer
+from functools import partial
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LayerRegistry(QObject):
+    """Cache of the vector layers of a project, keyed by layer ID.
+
+    The cache follows the project signals, so the layer list is never
+    rescanned and lookups do not depend on the number of layers.
+    """
+
+    layerAdded = pyqtSignal(str)
+    layerRemoved = pyqtSignal(str)
+    layerRenamed = pyqtSignal(str)
+
+    def __init__(self, project=None, parent=None):
+        """Constructor.
+
+        :param project: Project whose layers are cached; the current project
+            by default.
+        :type project: QgsProject
+        """
+        super().__init__(parent)
+        self.project = project or QgsProject.instance()
+        self.layers = {}
+        self.rename_slots = {}
+        self.project.layersAdded.connect(self.add_layers)
+        self.project.layersWillBeRemoved.connect(self.remove_layers)
+        self.add_layers(self.project.mapLayers().values())
+
+    def add_layers(self, layers):
+        """Cache the vector layers among layers added to the project."""
+        for layer in layers:
+            if not isinstance(layer, QgsVectorLayer) or layer.id() in self.layers:
+                continue
+            layer_id = layer.id()
+            self.layers[layer_id] = layer
+            # Bind the ID now; a closure would see the last layer of the loop
+            self.rename_slots[layer_id] = partial(self.layerRenamed.emit, layer_id)
+            layer.nameChanged.connect(self.rename_slots[layer_id])
+            self.layerAdded.emit(layer_id)
+        logger.debug(f"Layer registry holds {len(self.layers)} vector layers")
+
+    def remove_layers(self, layer_ids):
+        """Forget layers that are about to be removed from the project."""
+        for layer_id in layer_ids:
+            if layer_id in self.layers:
+                self.forget(layer_id)
+                self.layerRemoved.emit(layer_id)
+
+    def forget(self, layer_id):
+        """Drop a cached layer and disconnect its rename slot."""
+        layer = self.layers.pop(layer_id)
+        slot = self.rename_slots.pop(layer_id, None)
+        if slot is not None:
+            try:
+                layer.nameChanged.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass  # Already disconnected or deleted
+
+    def layer_ids(self):
+        """Return the IDs of the cached layers in the order they were added."""
+        return list(self.layers)
+
+    def layer(self, layer_id):
+        """Return the layer with an ID, or None if it is not a cached vector layer."""
+        return self.layers.get(layer_id)
+
+    def name(self, layer_id):
+        """Return the display name of a cached layer."""
+        return self.layers[layer_id].name()
+
+    def find(self, name):
+        """Return the ID of the first layer with a display name, or None."""
+        for layer_id, layer in self.layers.items():
+            if layer.name() == name:
+                return layer_id
+        return None
+
+    def close(self):
+        """Stop following the project."""
+        try:
+            self.project.layersAdded.disconnect(self.add_layers)
+            self.project.layersWillBeRemoved.disconnect(self.remove_layers)
+        except TypeError:
+            pass  # Already disconnected
+        for layer_id in list(self.layers):
+            self.forget(layer_id)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Mapping file helpers
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ A mapping is a dict of template field name -> source field name, the same
+ shape returned by AttributeTransferToSchemaDialog.get_mapping().
+"""
+import csv
+import json
+import os.path
+
+def mapping_from_matrix(values):
+    """Build a mapping from a flat [template, source, template, source, ...] list."""
+    if len(values) % 2:
+        raise ValueError("Field mapping matrix must have two columns.")
+    mapping = {}
+    for template_field, source_field in zip(values[0::2], values[1::2]):
+        template_field = str(template_field).strip()
+        source_field = str(source_field or '').strip()
+        if template_field and source_field and source_field != "<None>":
+            mapping[template_field] = source_field
+    return mapping
+
+
+def read_mapping_file(path):
+    """Read a mapping from a JSON object or a two-column CSV file.
+
+    The JSON file may hold the mapping itself or an object with a
+    "mapping" key. A CSV header row of "template,source" is skipped.
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get('mapping'), dict):
+            data = data['mapping']
+        if not isinstance(data, dict):
+            raise ValueError(f"Mapping file {path} does not contain a JSON object.")
+        values = []
+        for template_field, source_field in data.items():
+            values.extend([template_field, source_field])
+        return mapping_from_matrix(values)
+
+    values = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row_number, row in enumerate(csv.reader(f)):
+            if not row:
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Line {row_number + 1} of {path} needs a template and a source field.")
+            if row_number == 0 and [c.strip().lower() for c in row[:2]] == ['template', 'source']:
+                continue
+            values.extend(row[:2])
+    return mapping_from_matrix(values)
+
+
+def write_mapping_file(path, mapping):
+    """Write a mapping to a JSON or CSV file, chosen by extension."""
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(mapping, f, indent=2)
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['template', 'source'])
+        for template_field, source_field in mapping.items():
+            writer.writerow([template_field, source_field])
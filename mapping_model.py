@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ FieldMappingModel
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ The mapping is shown in a table view with one row per template field.
+ Editors are only created for the cell being edited, and all of them share
+ one list model of source fields, so wide schemas open instantly. A third
+ column previews the sampled values of the chosen source field.
+"""
+from qgis.PyQt.QtCore import Qt, QAbstractTableModel, QModelIndex
+from qgis.PyQt.QtWidgets import QComboBox, QStyledItemDelegate
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Text shown for a template field that is left empty
+NONE_TEXT = "<None>"
+
+TEMPLATE_COLUMN = 0
+SOURCE_COLUMN = 1
+SAMPLE_COLUMN = 2
+
+
+class FieldMappingModel(QAbstractTableModel):
+    """Table of template fields and the source field or expression filling each one."""
+
+    HEADERS = ("Template Field", "Source Field or Expression", "Source Sample")
+
+    def __init__(self, parent=None):
+        """Constructor."""
+        super().__init__(parent)
+        self.template_fields = []
+        self.sources = []
+        self.scores = []
+        self.source_statistics = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.template_fields)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == SOURCE_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if index.column() == TEMPLATE_COLUMN:
+            if role == Qt.DisplayRole:
+                return self.template_fields[row]
+            if role == Qt.ToolTipRole and self.scores[row] is not None:
+                return f"Suggested with {self.scores[row]:.0%} confidence"
+            return None
+        if index.column() == SAMPLE_COLUMN:
+            statistics = self.source_statistics.get(self.sources[row])
+            if statistics is None:
+                return None
+            if role == Qt.DisplayRole:
+                return statistics.summary()
+            if role == Qt.ToolTipRole:
+                return f"{statistics.name}: {statistics.nulls} of {statistics.rows} sampled rows are NULL"
+            return None
+        if role == Qt.DisplayRole:
+            return self.sources[row] or NONE_TEXT
+        if role == Qt.EditRole:
+            return self.sources[row]
+        if role == Qt.ToolTipRole:
+            return 'Pick a source field or type an expression, such as upper("Nme") or $area'
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != SOURCE_COLUMN or role != Qt.EditRole:
+            return False
+        source = (value or "").strip()
+        if source == NONE_TEXT:
+            source = ""
+        row = index.row()
+        if source == self.sources[row]:
+            return False
+        self.sources[row] = source
+        self.scores[row] = None
+        self.dataChanged.emit(self.index(row, TEMPLATE_COLUMN), self.index(row, SAMPLE_COLUMN))
+        return True
+
+    def set_template_fields(self, names):
+        """Show the fields of a template layer, clearing the mapping.
+
+        The rows are only rebuilt when the field names change.
+        """
+        names = list(names)
+        if names == self.template_fields:
+            self.set_mapping({})
+            return
+        self.beginResetModel()
+        self.template_fields = names
+        self.sources = [""] * len(names)
+        self.scores = [None] * len(names)
+        self.endResetModel()
+        logger.debug(f"Mapping model holds {len(names)} template fields")
+
+    def set_mapping(self, mapping, scores=None):
+        """Replace the mapping of every row.
+
+        :param mapping: Template field name -> source field name or
+            expression; fields that are missing are left empty.
+        :type mapping: dict
+
+        :param scores: Template field name -> confidence of a suggested
+            source field, shown as a tooltip.
+        :type scores: dict
+        """
+        scores = scores or {}
+        self.sources = [mapping.get(name, "") for name in self.template_fields]
+        self.scores = [scores.get(name) for name in self.template_fields]
+        if self.template_fields:
+            self.dataChanged.emit(self.index(0, TEMPLATE_COLUMN),
+                                  self.index(len(self.template_fields) - 1, SAMPLE_COLUMN))
+
+    def set_source_statistics(self, statistics):
+        """Show the sampled values of the source fields.
+
+        :param statistics: Source field name -> FieldStatistics; fields
+            that are missing have not been sampled yet.
+        :type statistics: dict
+        """
+        self.source_statistics = statistics
+        if self.template_fields:
+            self.dataChanged.emit(self.index(0, SAMPLE_COLUMN),
+                                  self.index(len(self.template_fields) - 1, SAMPLE_COLUMN))
+
+    def mapping(self):
+        """Return the template fields that are filled, as template name -> source field or expression."""
+        return {name: source for name, source in zip(self.template_fields, self.sources) if source}
+
+
+class SourceFieldDelegate(QStyledItemDelegate):
+    """Delegate editing a mapping with an editable source field dropdown.
+
+    All editors use the same list model of source fields.
+    """
+
+    def __init__(self, source_model, parent=None):
+        """Constructor.
+
+        :param source_model: Source field names, starting with NONE_TEXT.
+        :type source_model: QStringListModel
+        """
+        super().__init__(parent)
+        self.source_model = source_model
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.setModel(self.source_model)
+        # Typing an expression computes the field instead
+        combo.setEditable(True)
+        combo.setInsertPolicy(QComboBox.NoInsert)
+        combo.activated.connect(lambda: self.commitData.emit(combo))
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole) or NONE_TEXT)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
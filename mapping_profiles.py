@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Mapping profiles
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ A profile is a named mapping saved together with the fingerprint of the
+ template schema it was made for, so it can be found again for any layer
+ with the same fields.
+"""
+import hashlib
+import json
+import os.path
+import time
+
+def schema_fingerprint(fields):
+    """Return a short hash of the names and types of a set of fields.
+
+    Works with a QgsFields or any iterable of objects with name() and
+    typeName(). Field order does not matter.
+    """
+    specs = sorted(f"{field.name()}:{field.typeName().lower()}" for field in fields)
+    return hashlib.sha1('|'.join(specs).encode('utf-8')).hexdigest()[:16]
+
+
+class ProfileStore:
+    """Named mapping profiles kept in a JSON file."""
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param path: JSON file holding the profiles; created on first save.
+        :type path: str
+        """
+        self.path = path
+        self.profiles = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get('profiles', {}), dict):
+                raise ValueError(f"Profile file {path} does not contain mapping profiles.")
+            self.profiles = data.get('profiles', {})
+
+    def write(self):
+        """Write all profiles to the file."""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump({'profiles': self.profiles}, f, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
+
+    def names(self):
+        """Return the profile names, sorted."""
+        return sorted(self.profiles)
+
+    def mapping(self, name):
+        """Return the mapping of a profile, or None if there is no such profile."""
+        profile = self.profiles.get(name)
+        return dict(profile['mapping']) if profile else None
+
+    def fingerprint(self, name):
+        """Return the template fingerprint a profile was saved for."""
+        profile = self.profiles.get(name)
+        return profile['fingerprint'] if profile else None
+
+    def save(self, name, fingerprint, mapping):
+        """Add or replace a profile and write the file."""
+        self.profiles[name] = {
+            'fingerprint': fingerprint,
+            'mapping': dict(mapping),
+            'saved': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self.write()
+
+    def delete(self, name):
+        """Remove a profile and write the file."""
+        if self.profiles.pop(name, None) is not None:
+            self.write()
+
+    def find(self, fingerprint, source_names=None):
+        """Return the name of the best profile for a template schema, or None.
+
+        With source_names, profiles naming a source field that is missing
+        are skipped and the profile using most of the source fields wins;
+        otherwise the most recently saved profile wins. Mapping values that
+        are not plain names are treated as expressions and not checked.
+        """
+        best = None
+        best_key = None
+        for name, profile in self.profiles.items():
+            if profile.get('fingerprint') != fingerprint:
+                continue
+            values = profile['mapping'].values()
+            if source_names is not None:
+                names = set(source_names)
+                if any(value.isidentifier() and value not in names for value in values):
+                    continue
+                key = (sum(value in names for value in values), profile.get('saved', ''))
+            else:
+                key = (0, profile.get('saved', ''))
+            if best_key is None or key > best_key:
+                best, best_key = name, key
+        return best
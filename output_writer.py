@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Output writer helpers
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.core import QgsMemoryProviderUtils, QgsVectorFileWriter
+from .transfer_engine import TransferError
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# OGR drivers for the output and quarantine formats offered in the dialog
+OUTPUT_DRIVERS = {
+    '.gpkg': 'GPKG',
+    '.fgb': 'FlatGeobuf',
+    '.shp': 'ESRI Shapefile',
+    '.csv': 'CSV',
+}
+
+def driver_for_path(path):
+    """Return the OGR driver name for an output file path."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in OUTPUT_DRIVERS:
+        return OUTPUT_DRIVERS[extension]
+    driver = QgsVectorFileWriter.driverForExtension(extension)
+    if not driver:
+        raise TransferError(f"No vector format is known for output file {path}.")
+    return driver
+
+
+def create_output_writer(path, fields, wkb_type, crs, transform_context, layer_name=None):
+    """Create a new dataset at path with the given schema and return its writer.
+
+    The file writer groups its inserts in a single transaction on drivers
+    that support it (GeoPackage), committed when the writer is deleted.
+    CSV files store the geometry as a WKT column.
+    """
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = driver_for_path(path)
+    options.fileEncoding = 'UTF-8'
+    if layer_name:
+        options.layerName = layer_name
+    if options.driverName == 'CSV':
+        options.layerOptions = ['GEOMETRY=AS_WKT']
+    writer = QgsVectorFileWriter.create(path, fields, wkb_type, crs, transform_context, options)
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise TransferError(f"Cannot create output file {path}: {writer.errorMessage()}")
+    logger.debug(f"Created {options.driverName} output {path}")
+    return writer
+
+
+def create_preview_layer(template_layer, name=None):
+    """Create an empty memory layer with the schema, geometry type and CRS of the template."""
+    return QgsMemoryProviderUtils.createMemoryLayer(
+        name or f"{template_layer.name()} (preview)", template_layer.fields(),
+        template_layer.wkbType(), template_layer.crs())
+
+
+def delete_output(path):
+    """Remove an output file left behind by a failed or canceled transfer."""
+    if path.lower().endswith('.shp'):
+        QgsVectorFileWriter.deleteShapeFile(path)
+    elif os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Quarantine
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsFeature, QgsFeatureSink, QgsField, QgsFields
+from .output_writer import create_output_writer
+from .transfer_engine import TransferError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Name of the field holding the reason a row was rejected
+REASON_FIELD = 'reject_reason'
+
+# Number of rejected rows buffered before they are written
+QUARANTINE_BUFFER_SIZE = 500
+
+def quarantine_fields(source_fields):
+    """Return the source fields followed by the reject reason field."""
+    fields = QgsFields(source_fields)
+    fields.append(QgsField(REASON_FIELD, QVariant.String))
+    return fields
+
+
+class Quarantine:
+    """Collect rejected source rows and the reason they were rejected."""
+
+    def __init__(self, sink, source_fields):
+        """Constructor.
+
+        :param sink: File writer or Processing sink receiving the rows.
+        :type sink: QgsFeatureSink
+
+        :param source_fields: Fields of the source layer.
+        :type source_fields: QgsFields
+        """
+        self.sink = sink
+        self.fields = quarantine_fields(source_fields)
+        self.buffer = []
+        self.count = 0
+
+    def add(self, source_feature, reason):
+        """Queue a rejected source feature."""
+        feature = QgsFeature(self.fields)
+        feature.setGeometry(source_feature.geometry())
+        feature.setAttributes(source_feature.attributes() + [reason])
+        self.buffer.append(feature)
+        self.count += 1
+        if len(self.buffer) >= QUARANTINE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write the queued rows."""
+        if self.buffer and not self.sink.addFeatures(self.buffer, QgsFeatureSink.FastInsert):
+            raise TransferError("Failed to write rejected features to the quarantine output.")
+        self.buffer = []
+
+    def close(self):
+        """Write the queued rows and release the sink."""
+        self.flush()
+        logger.debug(f"Quarantined {self.count} features")
+        self.sink = None
+
+
+def create_quarantine_file(path, source_fields, wkb_type, crs, transform_context):
+    """Return a Quarantine writing to a new GeoPackage or CSV file."""
+    writer = create_output_writer(path, quarantine_fields(source_fields), wkb_type, crs, transform_context)
+    return Quarantine(writer, source_fields)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SchemaMatcher
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ Fields are given as (name, kind) pairs, where kind is one of the strings
+ of type_coercion.field_kind() or None when unknown, so matching has no
+ QGIS dependency.
+"""
+from collections import namedtuple
+import re
+
+# Common abbreviations in field names, expanded before comparing
+ABBREVIATIONS = {
+    'addr': 'address',
+    'adr': 'address',
+    'nme': 'name',
+    'nm': 'name',
+    'no': 'number',
+    'nr': 'number',
+    'num': 'number',
+    'desc': 'description',
+    'descr': 'description',
+    'dt': 'date',
+    'len': 'length',
+    'lng': 'length',
+    'qty': 'quantity',
+    'cnt': 'count',
+    'pop': 'population',
+    'elev': 'elevation',
+    'st': 'street',
+    'rd': 'road',
+    'typ': 'type',
+    'cat': 'category',
+    'cd': 'code',
+    'val': 'value',
+    'yr': 'year',
+}
+
+# Score factor for a source field kind written to a template field kind
+TYPE_FACTORS = {
+    ('integer', 'double'): 0.95,
+    ('bool', 'integer'): 0.9,
+    ('integer', 'bool'): 0.8,
+    ('date', 'datetime'): 0.95,
+    ('datetime', 'date'): 0.85,
+    ('string', 'integer'): 0.75,
+    ('string', 'double'): 0.75,
+    ('string', 'date'): 0.75,
+    ('string', 'datetime'): 0.75,
+    ('double', 'integer'): 0.75,
+}
+TO_STRING_FACTOR = 0.9
+INCOMPATIBLE_FACTOR = 0.5
+
+# Score from which a suggestion may be accepted without review
+AUTO_ACCEPT_SCORE = 0.85
+
+# Score below which no suggestion is made
+DEFAULT_MIN_SCORE = 0.5
+
+Match = namedtuple('Match', ['template', 'source', 'score'])
+
+def tokenize(name):
+    """Split a field name into lower-case words, expanding abbreviations."""
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', name)
+    tokens = [token.lower() for token in re.split(r'[^A-Za-z0-9]+', name) if token]
+    return tuple(ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def trigrams(text):
+    """Return the set of character trigrams of a padded string."""
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def is_abbreviation(short, long):
+    """Return True if short keeps the first letter and the order of letters of long."""
+    if not short or len(short) >= len(long) or short[0] != long[0]:
+        return False
+    position = 0
+    for char in short:
+        position = long.find(char, position) + 1
+        if position == 0:
+            return False
+    return True
+
+
+def type_factor(source_kind, template_kind):
+    """Return how well a source field kind fits a template field kind, from 0 to 1."""
+    if source_kind is None or template_kind is None or source_kind == template_kind:
+        return 1.0
+    if template_kind == 'string':
+        return TO_STRING_FACTOR
+    return TYPE_FACTORS.get((source_kind, template_kind), INCOMPATIBLE_FACTOR)
+
+
+class NormalizedField:
+    """A field name normalized once for repeated comparisons."""
+
+    def __init__(self, name, kind=None):
+        """Constructor."""
+        self.name = name
+        self.kind = kind
+        self.tokens = tokenize(name)
+        self.token_set = frozenset(self.tokens)
+        self.key = ''.join(self.tokens)
+        self.trigrams = trigrams(self.key)
+
+
+def name_score(template, source):
+    """Return the similarity of two normalized field names, from 0 to 1."""
+    if template.key == source.key:
+        return 1.0
+    score = 0.0
+    if template.token_set and source.token_set:
+        common = len(template.token_set & source.token_set)
+        score = 2.0 * common / (len(template.token_set) + len(source.token_set))
+    if template.trigrams and source.trigrams:
+        common = len(template.trigrams & source.trigrams)
+        score = max(score, 2.0 * common / (len(template.trigrams) + len(source.trigrams)))
+    short, long = sorted((template.key, source.key), key=len)
+    if is_abbreviation(short, long):
+        score = max(score, 0.6 + 0.3 * len(short) / len(long))
+    return score
+
+
+class SchemaMatcher:
+    """Suggest a source field for each template field.
+
+    Source names are normalized once when the matcher is created. Only
+    pairs sharing a word or a trigram are scored, and fields are assigned
+    globally: the best scoring pairs are taken first, so each source field
+    is used at most once.
+    """
+
+    def __init__(self, source_fields):
+        """Constructor.
+
+        :param source_fields: (name, kind) pairs of the source layer.
+        :type source_fields: list
+        """
+        self.sources = [NormalizedField(name, kind) for name, kind in source_fields]
+        self.index = {}
+        for position, source in enumerate(self.sources):
+            for gram in source.trigrams | source.token_set:
+                self.index.setdefault(gram, set()).add(position)
+
+    def candidates(self, template):
+        """Return the positions of the source fields worth scoring for a template field."""
+        positions = set()
+        for gram in template.trigrams | template.token_set:
+            positions.update(self.index.get(gram, ()))
+        return positions
+
+    def scores(self, template_fields, min_score=DEFAULT_MIN_SCORE):
+        """Return (score, template position, source position) for every plausible pair."""
+        pairs = []
+        for template_position, (name, kind) in enumerate(template_fields):
+            template = NormalizedField(name, kind)
+            for source_position in self.candidates(template):
+                source = self.sources[source_position]
+                score = name_score(template, source) * type_factor(source.kind, template.kind)
+                if score >= min_score:
+                    pairs.append((score, template_position, source_position))
+        return pairs
+
+    def match(self, template_fields, min_score=DEFAULT_MIN_SCORE):
+        """Assign source fields to template fields.
+
+        :param template_fields: (name, kind) pairs of the template layer.
+        :type template_fields: list
+
+        :returns: One Match per matched template field, in template order.
+        :rtype: list of Match
+        """
+        pairs = self.scores(template_fields, min_score)
+        # Highest score first; ties go to the earlier fields
+        pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+        assigned = {}
+        used_sources = set()
+        for score, template_position, source_position in pairs:
+            if template_position in assigned or source_position in used_sources:
+                continue
+            assigned[template_position] = Match(
+                template_fields[template_position][0], self.sources[source_position].name, round(score, 3))
+            used_sources.add(source_position)
+        return [assigned[position] for position in sorted(assigned)]
+
+    def suggest(self, template_fields, min_score=DEFAULT_MIN_SCORE):
+        """Return the matches as a mapping dict of template field -> source field."""
+        return {match.template: match.source for match in self.match(template_fields, min_score)}
+
+
+def match_fields(template_fields, source_fields, min_score=DEFAULT_MIN_SCORE):
+    """Match two lists of (name, kind) pairs; see SchemaMatcher.match()."""
+    return SchemaMatcher(source_fields).match(template_fields, min_score)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SourceFilter
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.core import (QgsExpression, QgsExpressionContext, QgsExpressionContextUtils, QgsFeatureRequest,
+                       QgsGeometry)
+from .transfer_engine import TransferError
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SourceFilter:
+    """Restrict the source features read by a transfer.
+
+    The extent (or the bounding box of the polygon), the expression and the
+    selected feature ids are set on the QgsFeatureRequest, so providers can
+    use their spatial index and compile the expression to SQL. Only the
+    exact polygon test, and the expression when combined with selected
+    features, run in Python on the features the provider returns.
+    """
+
+    def __init__(self, extent=None, polygon=None, expression=None, feature_ids=None, expression_context=None):
+        """Constructor.
+
+        :param extent: Rectangle in the source CRS.
+        :type extent: QgsRectangle
+
+        :param polygon: Geometry in the source CRS that features must
+            intersect.
+        :type polygon: QgsGeometry
+
+        :param expression: QGIS expression features must match.
+        :type expression: str
+
+        :param feature_ids: Ids of the only features to read, such as the
+            selected features.
+        :type feature_ids: list of int
+
+        :param expression_context: Context with the global, project and
+            layer scopes for evaluating the expression.
+        :type expression_context: QgsExpressionContext
+        """
+        if expression:
+            parsed = QgsExpression(expression)
+            if parsed.hasParserError():
+                raise TransferError(f"Invalid filter expression: {parsed.parserErrorString()}")
+        self.extent = extent if extent is not None and not extent.isNull() else None
+        self.polygon = polygon if polygon is not None and not polygon.isNull() else None
+        self.expression = expression or None
+        self.feature_ids = sorted(feature_ids) if feature_ids is not None else None
+        self.expression_context = expression_context or QgsExpressionContext()
+        self.geometry_engine = None
+        self.prepared_expression = None
+
+    @classmethod
+    def for_layer(cls, layer, extent=None, polygon=None, expression=None, selected_only=False):
+        """Build a filter for a source layer. Must be called on the main thread."""
+        context = QgsExpressionContext(QgsExpressionContextUtils.globalProjectLayerScopes(layer))
+        feature_ids = layer.selectedFeatureIds() if selected_only else None
+        return cls(extent, polygon, expression, feature_ids, context)
+
+    def is_empty(self):
+        """Return True when the filter lets every feature through."""
+        return (self.extent is None and self.polygon is None and not self.expression
+                and self.feature_ids is None)
+
+    def has_post_filter(self):
+        """Return True if some features must be tested in Python after reading."""
+        return self.polygon is not None or bool(self.expression and self.feature_ids is not None)
+
+    def post_expression(self):
+        """Return the expression evaluated in Python, or None."""
+        if self.expression and self.feature_ids is not None:
+            return QgsExpression(self.expression)
+        return None
+
+    def needs_geometry(self):
+        """Return True if the Python-side tests need the feature geometry."""
+        expression = self.post_expression()
+        return self.polygon is not None or (expression is not None and expression.needsGeometry())
+
+    def referenced_fields(self, fields):
+        """Return the indices of the fields the Python-side tests read."""
+        expression = self.post_expression()
+        if expression is None:
+            return []
+        columns = expression.referencedColumns()
+        if QgsFeatureRequest.ALL_ATTRIBUTES in columns:
+            return list(range(fields.count()))
+        return [fields.lookupField(name) for name in columns if fields.lookupField(name) >= 0]
+
+    def apply(self, request):
+        """Set the provider-side parts of the filter on a feature request."""
+        if self.extent is not None:
+            request.setFilterRect(self.extent)
+        elif self.polygon is not None:
+            request.setFilterRect(self.polygon.boundingBox())
+        if self.feature_ids is not None:
+            # A request holds either feature ids or an expression; the
+            # expression is then tested in accept()
+            request.setFilterFids(self.feature_ids)
+        elif self.expression:
+            request.setFilterExpression(self.expression)
+            request.setExpressionContext(self.expression_context)
+        return request
+
+    def prepare(self, fields):
+        """Prepare the Python-side tests. Call on the thread that reads."""
+        if self.polygon is not None:
+            self.geometry_engine = QgsGeometry.createGeometryEngine(self.polygon.constGet())
+            self.geometry_engine.prepareGeometry()
+        self.prepared_expression = self.post_expression()
+        if self.prepared_expression is not None:
+            self.expression_context.setFields(fields)
+            self.prepared_expression.prepare(self.expression_context)
+
+    def accept(self, feature):
+        """Return True if a feature read from the provider passes the filter."""
+        if self.geometry_engine is not None:
+            if not feature.hasGeometry() or not self.geometry_engine.intersects(feature.geometry().constGet()):
+                return False
+        if self.prepared_expression is not None:
+            self.expression_context.setFeature(feature)
+            return bool(self.prepared_expression.evaluate(self.expression_context))
+        return True
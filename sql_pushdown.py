@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SqlPushdown
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ When the source and the template live in the same PostGIS database or the
+ same GeoPackage/SpatiaLite file, the transfer is a single
+ INSERT INTO ... SELECT executed by the database.
+"""
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsDataSourceUri, QgsProviderConnectionException, QgsProviderRegistry
+from .transfer_engine import TransferError, TransferReport, MODE_REPLACE, MODE_APPEND
+import logging
+import os.path
+import time
+
+logger = logging.getLogger(__name__)
+
+# SQLite column types used to cast mapped columns to the template types
+SQLITE_CASTS = {
+    QVariant.Int: 'INTEGER',
+    QVariant.LongLong: 'INTEGER',
+    QVariant.Bool: 'INTEGER',
+    QVariant.Double: 'REAL',
+    QVariant.String: 'TEXT',
+}
+
+def quoted_identifier(name):
+    """Quote a table or column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def layer_location(layer):
+    """Return (provider, connection uri, schema, table) of a database layer.
+
+    Returns None for layers that are not stored in PostGIS, GeoPackage or
+    SpatiaLite.
+    """
+    provider = layer.providerType()
+    if provider == 'postgres':
+        uri = QgsDataSourceUri(layer.source())
+        return provider, uri.connectionInfo(False), uri.schema() or 'public', uri.table()
+    if provider == 'spatialite':
+        uri = QgsDataSourceUri(layer.source())
+        path = os.path.normcase(os.path.abspath(uri.database()))
+        return provider, path, '', uri.table()
+    if provider == 'ogr':
+        parts = QgsProviderRegistry.instance().decodeUri('ogr', layer.source())
+        path = parts.get('path', '')
+        if not path.lower().endswith('.gpkg') or not parts.get('layerName'):
+            return None
+        return provider, os.path.normcase(os.path.abspath(path)), '', parts['layerName']
+    return None
+
+
+class SqlPushdown:
+    """A transfer executed as one INSERT INTO ... SELECT on the database."""
+
+    def __init__(self, provider, connection_uri, statements, count_sql):
+        """Constructor."""
+        self.provider = provider
+        self.connection_uri = connection_uri
+        self.statements = statements
+        self.count_sql = count_sql
+
+    @classmethod
+    def for_layers(cls, plan, template_layer, source_layer, mode=MODE_REPLACE):
+        """Return a push-down for the layer pair, or None if it is not possible.
+
+        Only same-connection pairs with the same geometry type and CRS, in
+        replace or append mode, without a source filter and without mapping
+        expressions, are pushed down. Replace mode is only pushed down to
+        PostGIS: the GeoPackage/SpatiaLite connections run each executeSql
+        call on its own, so the DELETE and the INSERT cannot share a
+        transaction there.
+        """
+        if mode not in (MODE_REPLACE, MODE_APPEND) or plan.source_filter is not None or plan.expressions:
+            return None
+        template_location = layer_location(template_layer)
+        source_location = layer_location(source_layer)
+        if template_location is None or source_location is None:
+            return None
+        provider, connection_uri, template_schema, template_table = template_location
+        if source_location[:2] != (provider, connection_uri):
+            return None
+        if mode == MODE_REPLACE and provider != 'postgres':
+            return None
+        source_schema, source_table = source_location[2:]
+        if (source_schema, source_table) == (template_schema, template_table):
+            return None
+        if template_layer.wkbType() != source_layer.wkbType() or template_layer.crs() != source_layer.crs():
+            return None
+
+        try:
+            connection = cls.connection(provider, connection_uri)
+            template_geometry = connection.table(template_schema, template_table).geometryColumn()
+            source_geometry = connection.table(source_schema, source_table).geometryColumn()
+        except QgsProviderConnectionException as e:
+            logger.debug(f"No SQL push-down: {str(e)}")
+            return None
+
+        columns = []
+        values = []
+        for template_index, source_index in plan.index_pairs:
+            template_field = plan.template_fields.at(template_index)
+            source_field = plan.source_fields.at(source_index)
+            columns.append(quoted_identifier(template_field.name()))
+            values.append(cls.cast(provider, quoted_identifier(source_field.name()), template_field))
+        if plan.fetch_geometry and template_geometry and source_geometry:
+            columns.append(quoted_identifier(template_geometry))
+            values.append(quoted_identifier(source_geometry))
+        if not columns:
+            return None
+
+        template_name = cls.table_name(template_schema, template_table)
+        source_name = cls.table_name(source_schema, source_table)
+        where = f" WHERE {source_layer.subsetString()}" if source_layer.subsetString() else ''
+        statements = []
+        if mode == MODE_REPLACE:
+            statements.append(f"DELETE FROM {template_name}")
+        statements.append(f"INSERT INTO {template_name} ({', '.join(columns)}) "
+                          f"SELECT {', '.join(values)} FROM {source_name}{where}")
+        count_sql = f"SELECT count(*) FROM {source_name}{where}"
+        logger.debug(f"SQL push-down: {statements}")
+        return cls(provider, connection_uri, statements, count_sql)
+
+    @staticmethod
+    def connection(provider, connection_uri):
+        """Open a provider connection to the database."""
+        metadata = QgsProviderRegistry.instance().providerMetadata(provider)
+        if provider == 'spatialite':
+            connection_uri = f"dbname='{connection_uri}'"
+        return metadata.createConnection(connection_uri, {})
+
+    @staticmethod
+    def table_name(schema, table):
+        """Return the quoted, schema-qualified name of a table."""
+        if schema:
+            return f"{quoted_identifier(schema)}.{quoted_identifier(table)}"
+        return quoted_identifier(table)
+
+    @staticmethod
+    def cast(provider, column, template_field):
+        """Return a column expression cast to the type of the template field."""
+        if provider == 'postgres':
+            type_name = template_field.typeName()
+            if type_name.lower() in ('varchar', 'character varying', 'bpchar', 'char') and template_field.length() > 0:
+                type_name = f"{type_name}({template_field.length()})"
+            return f"CAST({column} AS {type_name})"
+        sqlite_type = SQLITE_CASTS.get(template_field.type())
+        if sqlite_type:
+            return f"CAST({column} AS {sqlite_type})"
+        return column
+
+    def run(self, feedback=None):
+        """Execute the statements in one transaction and return the report.
+
+        On GeoPackage/SpatiaLite there is a single INSERT statement, which
+        the database applies atomically.
+        """
+        report = TransferReport()
+        started = time.perf_counter()
+        try:
+            connection = self.connection(self.provider, self.connection_uri)
+            count = connection.executeSql(self.count_sql)
+            report.rows_read = int(count[0][0]) if count else 0
+            if self.provider == 'postgres':
+                # A multi-statement query runs as one implicit transaction,
+                # which PostgreSQL rolls back by itself when a statement fails
+                connection.executeSql('; '.join(self.statements))
+            else:
+                connection.executeSql(self.statements[0])
+        except QgsProviderConnectionException as e:
+            raise TransferError(f"SQL push-down failed: {str(e)}")
+        report.rows_written = report.rows_read
+        report.batches = 1
+        report.elapsed = time.perf_counter() - started
+        if feedback:
+            feedback.setProgress(100.0)
+        logger.debug(f"SQL push-down finished: {report.as_dict()}")
+        return report
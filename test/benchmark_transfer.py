@@ -0,0 +1,262 @@
+# coding=utf-8
+"""Transfer benchmark.
+
+Generates synthetic source layers and times the transfer engine on them.
+Not collected by the test runner; run it with ``make benchmark``, or from
+the directory above a plugin directory named attribute_transfer_to_schema,
+e.g.::
+
+    python3 -m attribute_transfer_to_schema.test.benchmark_transfer \
+        --rows 1000,100000 --columns 5,50 --formats memory,gpkg,shp \
+        --output benchmark_results.json
+
+Each scenario combines a format, a row count, a column count, a number of
+vertices per geometry and whether the source stores every value as text,
+so that the values have to be converted to the template field types.
+The results file lists rows/s, peak RSS and the time the engine's
+TransferMetrics recorded per stage, including the commit, for comparison
+across versions. The peak RSS is the high-water mark of the process, so
+scenarios run from small to large.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import argparse
+import datetime
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+from qgis.PyQt.QtCore import QDate, QVariant
+from qgis.core import Qgis, QgsCoordinateReferenceSystem, QgsFeature, QgsField, QgsFields, QgsGeometry, \
+    QgsMemoryProviderUtils, QgsPointXY, QgsProject, QgsVectorLayer, QgsWkbTypes
+
+from ..output_writer import create_output_writer
+from ..transfer_engine import TransferEngine, ERROR_SKIP, DEFAULT_BATCH_SIZE, peak_rss
+from ..transfer_metrics import STAGE_COMMIT, TransferMetrics
+from ..transfer_plan import TransferPlan
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+FORMATS = ('memory', 'gpkg', 'shp')
+EXTENSIONS = {'gpkg': '.gpkg', 'shp': '.shp'}
+
+# Field types of the template columns, repeated across the schema
+COLUMN_TYPES = (QVariant.Int, QVariant.Double, QVariant.String, QVariant.Date)
+
+# dBASE files hold at most 255 fields
+SHAPEFILE_MAX_COLUMNS = 255
+
+# Features generated and added per call
+GENERATE_CHUNK = 10000
+
+CRS = QgsCoordinateReferenceSystem('EPSG:4326')
+
+
+def make_fields(columns, as_text=False):
+    """Return the benchmark schema, with every field a string when as_text."""
+    fields = QgsFields()
+    for column in range(columns):
+        field_type = COLUMN_TYPES[column % len(COLUMN_TYPES)]
+        fields.append(QgsField(f'f{column:03d}', QVariant.String if as_text else field_type))
+    return fields
+
+
+def make_value(field_type, row, as_text):
+    """Return the value of a column of one generated row."""
+    if field_type == QVariant.Int:
+        value = row
+    elif field_type == QVariant.Double:
+        value = row / 7.0
+    elif field_type == QVariant.Date:
+        value = QDate(2000, 1, 1).addDays(row % 10000)
+        if as_text:
+            return value.toString('yyyy-MM-dd')
+        return value
+    else:
+        value = f'value {row}'
+    return str(value) if as_text else value
+
+
+def make_geometry(row, vertices):
+    """Return a point, or a polygon ring with the given number of vertices."""
+    x = row % 1000
+    y = row // 1000 % 1000
+    if vertices <= 1:
+        return QgsGeometry.fromPointXY(QgsPointXY(x, y))
+    ring = [QgsPointXY(x + 0.4 * math.cos(2 * math.pi * i / vertices),
+                       y + 0.4 * math.sin(2 * math.pi * i / vertices)) for i in range(vertices)]
+    ring.append(ring[0])
+    return QgsGeometry.fromPolygonXY([ring])
+
+
+def wkb_type(vertices):
+    """Return the geometry type of the generated features."""
+    return QgsWkbTypes.Point if vertices <= 1 else QgsWkbTypes.Polygon
+
+
+def generate_features(fields, rows, vertices, as_text):
+    """Yield lists of at most GENERATE_CHUNK generated features."""
+    types = [COLUMN_TYPES[column % len(COLUMN_TYPES)] for column in range(fields.count())]
+    chunk = []
+    for row in range(rows):
+        feature = QgsFeature(fields)
+        feature.setAttributes([make_value(field_type, row, as_text) for field_type in types])
+        feature.setGeometry(make_geometry(row, vertices))
+        chunk.append(feature)
+        if len(chunk) == GENERATE_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def make_source_layer(layer_format, rows, columns, vertices, as_text, directory):
+    """Create and fill a source layer in memory or as a file in directory."""
+    fields = make_fields(columns, as_text)
+    if layer_format == 'memory':
+        layer = QgsMemoryProviderUtils.createMemoryLayer('Source', fields, wkb_type(vertices), CRS)
+        for chunk in generate_features(fields, rows, vertices, as_text):
+            layer.dataProvider().addFeatures(chunk)
+        return layer
+    path = os.path.join(directory, f'source{EXTENSIONS[layer_format]}')
+    writer = create_output_writer(path, fields, wkb_type(vertices), CRS, QgsProject.instance().transformContext())
+    for chunk in generate_features(fields, rows, vertices, as_text):
+        writer.addFeatures(chunk)
+    del writer
+    layer = QgsVectorLayer(path, 'Source', 'ogr')
+    if not layer.isValid():
+        raise RuntimeError(f"Cannot open generated layer {path}")
+    return layer
+
+
+def open_sink(layer_format, template, directory):
+    """Return the sink a scenario writes to: the template or a new file of the same format."""
+    if layer_format == 'memory':
+        return template.dataProvider()
+    path = os.path.join(directory, f'output{EXTENSIONS[layer_format]}')
+    return create_output_writer(path, template.fields(), template.wkbType(), CRS,
+                                QgsProject.instance().transformContext())
+
+
+def run_scenario(layer_format, rows, columns, vertices, as_text, batch_size=DEFAULT_BATCH_SIZE):
+    """Generate the layers of one scenario, transfer them and return the measurements."""
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        source = make_source_layer(layer_format, rows, columns, vertices, as_text, directory)
+        template = QgsMemoryProviderUtils.createMemoryLayer(
+            'Template', make_fields(columns), wkb_type(vertices), CRS)
+        setup_seconds = time.perf_counter() - started
+        mapping = {name: name for name in template.fields().names()}
+        plan = TransferPlan.from_layers(mapping, template, source)
+        metrics = TransferMetrics()
+        engine = TransferEngine(plan, batch_size, ERROR_SKIP, metrics=metrics)
+        sink = open_sink(layer_format, template, directory)
+        report = engine.run(source, sink)
+        before_commit = time.perf_counter()
+        # Deleting a file writer commits its transaction and closes the file
+        del sink
+        metrics.record(STAGE_COMMIT, time.perf_counter() - before_commit)
+        elapsed = report.elapsed + metrics.seconds[STAGE_COMMIT]
+        # Close the generated files before the directory is removed
+        del engine, plan, source
+    return {
+        'format': layer_format,
+        'rows': rows,
+        'columns': columns,
+        'vertices': vertices,
+        'type_mismatch': as_text,
+        'batch_size': batch_size,
+        'setup_seconds': round(setup_seconds, 3),
+        'elapsed': round(elapsed, 3),
+        'rows_per_second': round(report.rows_written / elapsed, 1) if elapsed > 0 else 0.0,
+        'rows_written': report.rows_written,
+        'rows_rejected': report.rows_rejected,
+        'batches': report.batches,
+        'peak_rss_mb': round(peak_rss() / (1024 * 1024), 1),
+        'stages': metrics.as_dict()['stages'],
+        'batch_sizes': metrics.as_dict()['batches'],
+    }
+
+
+def scenarios(formats, rows, columns, vertices, mismatch):
+    """Yield the scenario arguments from smallest to largest."""
+    for row_count in sorted(rows):
+        for column_count in sorted(columns):
+            for vertex_count in sorted(vertices):
+                for as_text in mismatch:
+                    for layer_format in formats:
+                        if layer_format == 'shp' and column_count > SHAPEFILE_MAX_COLUMNS:
+                            continue
+                        yield layer_format, row_count, column_count, vertex_count, as_text
+
+
+def plugin_version():
+    """Return the version in metadata.txt."""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'metadata.txt')
+    with open(path, encoding='utf-8') as metadata:
+        for line in metadata:
+            if line.startswith('version='):
+                return line.split('=', 1)[1].strip()
+    return None
+
+
+def integers(text):
+    """Parse a comma separated list of integers."""
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def main(argv=None):
+    """Run the benchmark scenarios and write the results file."""
+    parser = argparse.ArgumentParser(description='Benchmark the attribute transfer engine.')
+    parser.add_argument('--rows', type=integers, default=[1000, 10000, 100000],
+                        help='comma separated row counts, e.g. 1000,1000000')
+    parser.add_argument('--columns', type=integers, default=[5, 50], help='comma separated column counts')
+    parser.add_argument('--vertices', type=integers, default=[1, 100],
+                        help='vertices per geometry; 1 generates points, more generates polygons')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='comma separated memory, gpkg, shp')
+    parser.add_argument('--type-mismatch', choices=('no', 'yes', 'both'), default='both',
+                        help='store source values as text that must be converted')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--output', default='benchmark_results.json', help='results file')
+    args = parser.parse_args(argv)
+    formats = [value.strip() for value in args.formats.split(',') if value.strip()]
+    for layer_format in formats:
+        if layer_format not in FORMATS:
+            parser.error(f"Unknown format '{layer_format}'")
+    mismatch = {'no': [False], 'yes': [True], 'both': [False, True]}[args.type_mismatch]
+
+    results = []
+    for scenario in scenarios(formats, args.rows, args.columns, args.vertices, mismatch):
+        result = run_scenario(*scenario, batch_size=args.batch_size)
+        print(f"{result['format']:>6} {result['rows']:>8} rows {result['columns']:>4} columns "
+              f"{result['vertices']:>4} vertices mismatch={result['type_mismatch']!s:<5} "
+              f"{result['rows_per_second']:>10.0f} rows/s {result['peak_rss_mb']:>7.0f} MB")
+        results.append(result)
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump({
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'plugin_version': plugin_version(),
+            'qgis_version': Qgis.QGIS_VERSION,
+            'python_version': sys.version.split()[0],
+            'results': results,
+        }, output, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
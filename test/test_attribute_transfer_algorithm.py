@@ -0,0 +1,92 @@
+# coding=utf-8
+"""Attribute transfer algorithm test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import tempfile
+import unittest
+
+from qgis.core import QgsFeature, QgsProcessingContext, QgsProcessingFeedback, QgsProcessingUtils, QgsVectorLayer
+
+from ..attribute_transfer_algorithm import AttributeTransferAlgorithm
+from ..mapping_file import write_mapping_file
+from ..quarantine import REASON_FIELD
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_layer(uri, name, rows):
+    """Create a memory layer without geometry holding rows."""
+    layer = QgsVectorLayer(uri, name, 'memory')
+    features = []
+    for row in rows:
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes(list(row))
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class AttributeTransferAlgorithmTest(unittest.TestCase):
+    """Test the Processing algorithm end to end."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.source = make_layer('None?field=Code:string&field=Label:string', 'Source',
+                                 [('1', 'a'), ('x', 'b'), ('3', 'c')])
+        self.template = make_layer('None?field=UID:integer&field=Name:string', 'Template', [])
+        self.context = QgsProcessingContext()
+        self.feedback = QgsProcessingFeedback()
+
+    def run_algorithm(self, **parameters):
+        """Run the algorithm into a memory layer and return its results."""
+        parameters.update({'INPUT': self.source, 'TEMPLATE': self.template, 'OUTPUT': 'memory:'})
+        algorithm = AttributeTransferAlgorithm().create()
+        results, ok = algorithm.run(parameters, self.context, self.feedback)
+        self.assertTrue(ok)
+        return results
+
+    def layer(self, results, output):
+        """Return the output layer of a run."""
+        return QgsProcessingUtils.mapLayerFromString(results[output], self.context)
+
+    def test_matrix_mapping_with_quarantine(self):
+        """Test the matrix mapping is applied and rejected rows go to the quarantine layer."""
+        results = self.run_algorithm(MAPPING=['UID', 'Code', 'Name', 'Label'], ERROR_POLICY=2,
+                                     QUARANTINE='memory:')
+        self.assertEqual(results['ROWS_WRITTEN'], 2)
+        self.assertEqual(results['ROWS_REJECTED'], 1)
+        output = self.layer(results, 'OUTPUT')
+        self.assertEqual(sorted((f['UID'], f['Name']) for f in output.getFeatures()), [(1, 'a'), (3, 'c')])
+        quarantine = [f for f in self.layer(results, 'QUARANTINE').getFeatures()]
+        self.assertEqual(len(quarantine), 1)
+        self.assertEqual(quarantine[0]['Code'], 'x')
+        self.assertIn('UID', quarantine[0][REASON_FIELD])
+
+    def test_mapping_file(self):
+        """Test a JSON mapping file replaces the matrix and unmapped fields stay empty."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'mapping.json')
+            write_mapping_file(path, {'UID': 'Code'})
+            results = self.run_algorithm(MAPPING_FILE=path, MAPPING=['Name', 'Label'], ERROR_POLICY=1)
+        self.assertEqual(results['ROWS_WRITTEN'], 2)
+        self.assertEqual(results['ROWS_REJECTED'], 1)
+        output = self.layer(results, 'OUTPUT')
+        self.assertEqual(sorted(f['UID'] for f in output.getFeatures()), [1, 3])
+        self.assertFalse(any(f['Name'] for f in output.getFeatures()))
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(AttributeTransferAlgorithmTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -16,9 +16,9 @@ import unittest
 
 from qgis.PyQt.QtGui import QDialogButtonBox, QDialog
 
-from attribute_transfer_to_schema_dialog import AttributeTransferToSchemaDialog
+from ..attribute_transfer_to_schema_dialog import AttributeTransferToSchemaDialog
 
-from utilities import get_qgis_app
+from .utilities import get_qgis_app
 QGIS_APP = get_qgis_app()
 
 
@@ -0,0 +1,91 @@
+# coding=utf-8
+"""Batch transfer test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import tempfile
+import unittest
+
+from qgis.core import QgsCoordinateReferenceSystem, QgsFeature, QgsFields, QgsProject, QgsVectorFileWriter, \
+    QgsVectorLayer, QgsWkbTypes
+
+from ..batch_transfer import BatchTransferJob, BatchTransferRunner, dataset_key
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_layer(name, ids):
+    """Create a memory layer without geometry holding one feature per ID."""
+    layer = QgsVectorLayer('None?field=ID:integer', name, 'memory')
+    features = []
+    for uid in ids:
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([uid])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class BatchTransferRunnerTest(unittest.TestCase):
+    """Test jobs are serialized per dataset and share a replaced template."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.template = make_layer('Template', [99])
+        self.sources = [make_layer('County A', [1, 2]), make_layer('County B', [3]), make_layer('County C', [4, 5])]
+
+    def test_dataset_key(self):
+        """Test two layers of one GeoPackage share a key and memory layers do not."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.gpkg')
+            for name in ('a', 'b'):
+                options = QgsVectorFileWriter.SaveVectorOptions()
+                options.driverName = 'GPKG'
+                options.layerName = name
+                if name == 'b':
+                    options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+                writer = QgsVectorFileWriter.create(path, QgsFields(), QgsWkbTypes.NoGeometry,
+                                                    QgsCoordinateReferenceSystem(),
+                                                    QgsProject.instance().transformContext(), options)
+                del writer
+            first = QgsVectorLayer(f'{path}|layername=a', 'a', 'ogr')
+            second = QgsVectorLayer(f'{path}|layername=b', 'b', 'ogr')
+            self.assertEqual(dataset_key(first), dataset_key(second))
+            del first, second
+        self.assertNotEqual(dataset_key(self.template), dataset_key(self.sources[0]))
+
+    def test_sources_into_one_template(self):
+        """Test every county ends up in the template, which is cleared once."""
+        jobs = [BatchTransferJob(source, self.template) for source in self.sources]
+        runner = BatchTransferRunner(jobs, max_concurrent=3)
+        runner.start()
+        summary = runner.wait()
+        self.assertEqual([row['status'] for row in summary], ['done', 'done', 'done'])
+        self.assertEqual(sorted(f['ID'] for f in self.template.getFeatures()), [1, 2, 3, 4, 5])
+
+    def test_failed_replace_stops_appends(self):
+        """Test later jobs are not appended when the job clearing the template failed."""
+        jobs = [BatchTransferJob(self.sources[0], self.template, mapping={'ID': 'Missing'}),
+                BatchTransferJob(self.sources[1], self.template)]
+        runner = BatchTransferRunner(jobs)
+        runner.start()
+        summary = runner.wait()
+        self.assertEqual([row['status'] for row in summary], ['failed', 'failed'])
+        self.assertIn('County A', summary[1]['error'])
+        self.assertEqual([f['ID'] for f in self.template.getFeatures()], [99])
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(BatchTransferRunnerTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,147 @@
+# coding=utf-8
+"""Delta sink test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import tempfile
+import unittest
+from functools import partial
+
+from qgis.core import QgsFeature, QgsVectorLayer
+
+from ..delta_sink import DeltaSink, HashCache
+from ..transfer_engine import TransferEngine, ERROR_SKIP
+from ..transfer_plan import TransferPlan
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+LAYER_KEY = 'template|UID'
+
+
+def make_layer(uri, name, rows):
+    """Create a memory layer without geometry holding rows."""
+    layer = QgsVectorLayer(uri, name, 'memory')
+    layer.dataProvider().addFeatures([make_feature(layer, *row) for row in rows])
+    return layer
+
+
+def make_feature(layer, *attributes):
+    """Create a feature with the schema of layer."""
+    feature = QgsFeature(layer.fields())
+    feature.setAttributes(list(attributes))
+    return feature
+
+
+class FailingProvider:
+    """Provider stub that reads from a real provider and refuses every write."""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def getFeatures(self, request):
+        return self.provider.getFeatures(request)
+
+    def addFeatures(self, features, flags=None):
+        return False, []
+
+    def changeAttributeValues(self, changes):
+        return False
+
+    def lastError(self):
+        return 'read-only'
+
+
+class DeltaSinkTest(unittest.TestCase):
+    """Test only changed rows are written and missing keys deleted."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = HashCache(os.path.join(self.directory.name, 'hashes.sqlite'))
+        self.template = make_layer('None?field=UID:integer&field=Value:integer', 'Template',
+                                   [(1, 10), (2, 20)])
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.directory.cleanup()
+
+    def make_sink(self, provider=None, source_key=None):
+        """Create a delta sink on the template."""
+        return DeltaSink(provider or self.template.dataProvider(), 0, self.cache, LAYER_KEY,
+                         with_geometry=False, field_indices=[0, 1], source_key=source_key)
+
+    def values(self):
+        """Return the template rows as UID -> Value."""
+        return {f['UID']: f['Value'] for f in self.template.getFeatures()}
+
+    def test_hash_cache(self):
+        """Test hashes are stored per layer and can be cleared."""
+        self.cache.save(LAYER_KEY, {'1': b'a', '2': b'b'})
+        self.cache.save('other|UID', {'1': b'c'})
+        self.assertEqual(self.cache.load(LAYER_KEY), {'1': b'a', '2': b'b'})
+        self.cache.clear(LAYER_KEY)
+        self.assertEqual(self.cache.load(LAYER_KEY), {})
+        self.assertEqual(self.cache.load('other|UID'), {'1': b'c'})
+
+    def test_unchanged_rows_skipped(self):
+        """Test a row with the same mapped values is not rewritten."""
+        sink = self.make_sink()
+        self.assertTrue(sink.addFeatures([make_feature(self.template, 1, 10), make_feature(self.template, 2, 21),
+                                          make_feature(self.template, 3, 30)]))
+        self.assertEqual(sink.rows_unchanged, 1)
+        self.assertEqual(sink.rows_updated, 1)
+        self.assertEqual(sink.rows_inserted, 1)
+        self.assertEqual(self.values(), {1: 10, 2: 21, 3: 30})
+
+    def test_missing_keys_deleted(self):
+        """Test template rows whose key was not seen are deleted with their hash."""
+        sink = self.make_sink()
+        sink.addFeatures([make_feature(self.template, 1, 10)])
+        self.assertTrue(sink.flushBuffer())
+        self.assertEqual(sink.rows_deleted, 1)
+        self.assertEqual(self.values(), {1: 10})
+        sink.save_hashes()
+        self.assertEqual(list(self.cache.load(LAYER_KEY)), ['1'])
+
+    def test_hashes_saved_after_success(self):
+        """Test rows of a failed write keep their old hash, so they are retried."""
+        sink = self.make_sink(FailingProvider(self.template.dataProvider()))
+        sink.build_index()
+        old_hash = sink.hashes['2']
+        self.assertFalse(sink.addFeatures([make_feature(self.template, 2, 21), make_feature(self.template, 3, 30)]))
+        self.assertEqual(sink.hashes['2'], old_hash)
+        self.assertNotIn('3', sink.hashes)
+
+    def test_rejected_row_not_deleted(self):
+        """Test a source row rejected before the sink keeps its template row."""
+        source = make_layer('None?field=UID:integer&field=Value:string', 'Source', [(1, '11'), (2, 'bad')])
+        plan = TransferPlan.from_layers({'UID': 'UID', 'Value': 'Value'}, self.template, source)
+        sink = self.make_sink(source_key=partial(plan.template_value, template_index=0))
+        report = TransferEngine(plan, error_policy=ERROR_SKIP).run(source, sink)
+        self.assertEqual(report.rows_rejected, 1)
+        self.assertEqual(sink.rows_deleted, 0)
+        self.assertEqual(self.values(), {1: 11, 2: 20})
+
+    def test_rejected_row_without_key_keeps_all(self):
+        """Test nothing is deleted when a rejected row's key is unknown."""
+        sink = self.make_sink()
+        sink.keep_rejected([make_feature(self.template, 2, 20)])
+        self.assertTrue(sink.flushBuffer())
+        self.assertEqual(sink.rows_deleted, 0)
+        self.assertEqual(self.values(), {1: 10, 2: 20})
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(DeltaSinkTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,71 @@
+# coding=utf-8
+"""Field statistics test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import random
+import unittest
+
+from qgis.core import NULL, QgsFeature, QgsVectorLayer
+
+from ..field_statistics import FieldStatistics, FieldStatisticsTask, infer_kind, reservoir_sample
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+class FieldStatisticsTest(unittest.TestCase):
+    """Test field sampling and type inference."""
+
+    def test_reservoir_is_bounded(self):
+        """Test the sample never holds more than size items and keeps short inputs whole."""
+        sample = reservoir_sample(range(10000), 100, random.Random(1))
+        self.assertEqual(len(sample), 100)
+        self.assertEqual(len(set(sample)), 100)
+        self.assertEqual(reservoir_sample(range(5), 100), [0, 1, 2, 3, 4])
+
+    def test_infer_kind(self):
+        """Test text values are inferred as the narrowest kind they all convert to."""
+        self.assertEqual(infer_kind(['1', '22', ' 7']), 'integer')
+        self.assertEqual(infer_kind(['1', '2.5']), 'double')
+        self.assertEqual(infer_kind(['2025-06-22']), 'date')
+        self.assertEqual(infer_kind(['yes', 'no']), 'bool')
+        self.assertEqual(infer_kind(['1', 'High St']), 'string')
+        self.assertIsNone(infer_kind([]))
+
+    def test_statistics(self):
+        """Test the null ratio and the distinct example values."""
+        statistics = FieldStatistics('Code', ['a', NULL, 'b', 'a', None])
+        self.assertEqual(statistics.nulls, 2)
+        self.assertAlmostEqual(statistics.null_ratio(), 0.4)
+        self.assertEqual(statistics.examples, ['a', 'b'])
+        self.assertEqual(statistics.summary(), 'string, 40% null: a, b')
+
+    def test_task_reads_limited_sample(self):
+        """Test the task samples at most scan_limit rows of the requested fields."""
+        layer = QgsVectorLayer('None?field=ID:integer&field=Code:string', 'Source', 'memory')
+        features = []
+        for i in range(50):
+            feature = QgsFeature(layer.fields())
+            feature.setAttributes([i, str(i)])
+            features.append(feature)
+        layer.dataProvider().addFeatures(features)
+        task = FieldStatisticsTask(layer, ['Code'], sample_size=10, scan_limit=20)
+        self.assertTrue(task.run())
+        statistics = task.statistics['Code']
+        self.assertEqual(statistics.rows, 10)
+        self.assertEqual(statistics.kind, 'integer')
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(FieldStatisticsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,69 @@
+# coding=utf-8
+"""Geometry conversion test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from qgis.core import QgsCoordinateReferenceSystem, QgsGeometry, QgsWkbTypes
+
+from ..geometry_conversion import geometry_converter_for
+from ..transfer_engine import TransferError
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+class GeometryConversionTest(unittest.TestCase):
+    """Test source geometries are converted to the template type."""
+
+    def test_same_type_is_copied(self):
+        """Test no converter is needed for identical types and CRSs."""
+        self.assertIsNone(geometry_converter_for(QgsWkbTypes.Polygon, QgsWkbTypes.Polygon))
+
+    def test_incompatible_families(self):
+        """Test points cannot be written to a polygon template."""
+        with self.assertRaises(TransferError):
+            geometry_converter_for(QgsWkbTypes.Polygon, QgsWkbTypes.Point)
+
+    def test_promote_to_multi(self):
+        """Test single-part polygons become multi-polygons."""
+        converter = geometry_converter_for(QgsWkbTypes.MultiPolygon, QgsWkbTypes.Polygon)
+        geometry = converter.convert(QgsGeometry.fromWkt('Polygon ((0 0, 1 0, 1 1, 0 0))'))
+        self.assertEqual(geometry.wkbType(), QgsWkbTypes.MultiPolygon)
+
+    def test_drop_and_add_z(self):
+        """Test Z values are dropped or added to match the template."""
+        converter = geometry_converter_for(QgsWkbTypes.Point, QgsWkbTypes.PointZ)
+        self.assertEqual(converter.convert(QgsGeometry.fromWkt('PointZ (1 2 3)')).asWkt(), 'Point (1 2)')
+        converter = geometry_converter_for(QgsWkbTypes.PointZ, QgsWkbTypes.Point)
+        self.assertEqual(converter.convert(QgsGeometry.fromWkt('Point (1 2)')).wkbType(), QgsWkbTypes.PointZ)
+
+    def test_multi_part_rejected_for_single_template(self):
+        """Test a geometry with several parts is not silently truncated."""
+        converter = geometry_converter_for(QgsWkbTypes.Point, QgsWkbTypes.MultiPoint)
+        self.assertEqual(converter.convert(QgsGeometry.fromWkt('MultiPoint ((1 2))')).asWkt(), 'Point (1 2)')
+        with self.assertRaises(ValueError):
+            converter.convert(QgsGeometry.fromWkt('MultiPoint ((1 2),(3 4))'))
+
+    def test_reprojection(self):
+        """Test geometries are reprojected to the template CRS."""
+        converter = geometry_converter_for(
+            QgsWkbTypes.Point, QgsWkbTypes.Point,
+            QgsCoordinateReferenceSystem('EPSG:3857'), QgsCoordinateReferenceSystem('EPSG:4326'))
+        point = converter.convert(QgsGeometry.fromWkt('Point (1 0)')).asPoint()
+        self.assertAlmostEqual(point.x(), 111319.49, places=1)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(GeometryConversionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Layer registry test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from qgis.core import QgsProject, QgsVectorLayer
+
+from ..layer_registry import LayerRegistry
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_layer(name):
+    """Create an empty memory point layer."""
+    return QgsVectorLayer('Point?crs=EPSG:4326&field=ID:integer', name, 'memory')
+
+
+class LayerRegistryTest(unittest.TestCase):
+    """Test the layer cache follows the project."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.project = QgsProject()
+        self.template = make_layer('Template')
+        self.project.addMapLayer(self.template)
+        self.registry = LayerRegistry(self.project)
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.registry.close()
+
+    def test_initial_layers(self):
+        """Test the layers already in the project are cached by ID."""
+        self.assertEqual(self.registry.layer_ids(), [self.template.id()])
+        self.assertEqual(self.registry.find('Template'), self.template.id())
+        self.assertIsNone(self.registry.find('Source'))
+
+    def test_added_and_removed(self):
+        """Test layers are cached and forgotten as the project changes."""
+        events = []
+        self.registry.layerAdded.connect(lambda layer_id: events.append(('added', layer_id)))
+        self.registry.layerRemoved.connect(lambda layer_id: events.append(('removed', layer_id)))
+        source = make_layer('Source')
+        self.project.addMapLayer(source)
+        source_id = source.id()
+        self.assertIs(self.registry.layer(source_id), source)
+        self.project.removeMapLayer(source_id)
+        self.assertIsNone(self.registry.layer(source_id))
+        self.assertEqual(events, [('added', source_id), ('removed', source_id)])
+
+    def test_renamed(self):
+        """Test a renamed layer is reported and found under its new name."""
+        renamed = []
+        self.registry.layerRenamed.connect(renamed.append)
+        self.template.setName('Parcels')
+        self.assertEqual(renamed, [self.template.id()])
+        self.assertEqual(self.registry.find('Parcels'), self.template.id())
+
+    def test_renamed_after_adding_together(self):
+        """Test each layer added in one call reports its own ID when renamed."""
+        first = make_layer('First')
+        second = make_layer('Second')
+        self.project.addMapLayers([first, second])
+        renamed = []
+        self.registry.layerRenamed.connect(renamed.append)
+        first.setName('Renamed')
+        self.assertEqual(renamed, [first.id()])
+
+    def test_removed_layer_not_renamed(self):
+        """Test a layer removed from the project no longer reports renames."""
+        source = make_layer('Source')
+        self.project.addMapLayer(source, False)
+        renamed = []
+        self.registry.layerRenamed.connect(renamed.append)
+        self.project.takeMapLayer(source)
+        source.setName('Renamed')
+        self.assertEqual(renamed, [])
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(LayerRegistryTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,62 @@
+# coding=utf-8
+"""Mapping file test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..mapping_file import mapping_from_matrix, read_mapping_file, write_mapping_file
+
+
+class MappingFileTest(unittest.TestCase):
+    """Test mappings can be read from matrices and files."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory)
+
+    def test_matrix(self):
+        """Test empty and <None> sources are left unmapped."""
+        mapping = mapping_from_matrix(['ID', 'ID', 'Name', 'Nme', 'Date', '', 'UID', '<None>'])
+        self.assertEqual(mapping, {'ID': 'ID', 'Name': 'Nme'})
+
+    def test_matrix_odd_length(self):
+        """Test a matrix must have two columns."""
+        with self.assertRaises(ValueError):
+            mapping_from_matrix(['ID', 'ID', 'Name'])
+
+    def test_round_trip(self):
+        """Test JSON and CSV files read back the mapping they were written with."""
+        mapping = {'ID': 'ID', 'Name': 'Nme', 'Address': 'Addr'}
+        for name in ('mapping.json', 'mapping.csv'):
+            path = os.path.join(self.directory, name)
+            write_mapping_file(path, mapping)
+            self.assertEqual(read_mapping_file(path), mapping)
+
+    def test_csv_without_header(self):
+        """Test a CSV file without a header row."""
+        path = os.path.join(self.directory, 'mapping.csv')
+        with open(path, 'w') as f:
+            f.write('ID,ID\nName,Nme\n')
+        self.assertEqual(read_mapping_file(path), {'ID': 'ID', 'Name': 'Nme'})
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MappingFileTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,63 @@
+# coding=utf-8
+"""Field mapping model test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from qgis.PyQt.QtCore import Qt
+
+from ..mapping_model import FieldMappingModel, NONE_TEXT, SOURCE_COLUMN, TEMPLATE_COLUMN
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+class FieldMappingModelTest(unittest.TestCase):
+    """Test the mapping table model."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.model = FieldMappingModel()
+        self.model.set_template_fields(['ID', 'Name', 'Address'])
+
+    def test_mapping(self):
+        """Test the mapping only holds the filled template fields."""
+        self.model.set_mapping({'ID': 'ID', 'Name': 'upper("Nme")'}, {'ID': 1.0})
+        self.assertEqual(self.model.mapping(), {'ID': 'ID', 'Name': 'upper("Nme")'})
+        self.assertEqual(self.model.data(self.model.index(2, SOURCE_COLUMN)), NONE_TEXT)
+        self.assertIn('100%', self.model.data(self.model.index(0, TEMPLATE_COLUMN), Qt.ToolTipRole))
+
+    def test_set_data(self):
+        """Test editing a cell changes the mapping and NONE_TEXT clears it."""
+        self.model.set_mapping({'ID': 'ID'})
+        self.assertTrue(self.model.setData(self.model.index(1, SOURCE_COLUMN), ' Nme '))
+        self.assertTrue(self.model.setData(self.model.index(0, SOURCE_COLUMN), NONE_TEXT))
+        self.assertEqual(self.model.mapping(), {'Name': 'Nme'})
+        self.assertFalse(self.model.setData(self.model.index(0, TEMPLATE_COLUMN), 'UUID'))
+
+    def test_same_fields_keep_rows(self):
+        """Test the rows are only rebuilt when the template fields change."""
+        resets = []
+        self.model.modelReset.connect(lambda: resets.append(True))
+        self.model.set_mapping({'ID': 'ID'})
+        self.model.set_template_fields(['ID', 'Name', 'Address'])
+        self.assertEqual(resets, [])
+        self.assertEqual(self.model.mapping(), {})
+        self.model.set_template_fields(['ID'])
+        self.assertEqual(resets, [True])
+        self.assertEqual(self.model.rowCount(), 1)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(FieldMappingModelTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,77 @@
+# coding=utf-8
+"""Mapping profiles test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..mapping_profiles import ProfileStore, schema_fingerprint
+
+
+class Field:
+    """Stand-in for QgsField with a name and a type name."""
+
+    def __init__(self, name, type_name):
+        self._name = name
+        self._type_name = type_name
+
+    def name(self):
+        return self._name
+
+    def typeName(self):
+        return self._type_name
+
+
+class MappingProfilesTest(unittest.TestCase):
+    """Test profiles are saved and found by template schema."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'profiles.json')
+        self.fingerprint = schema_fingerprint([Field('ID', 'Integer'), Field('Name', 'String')])
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory)
+
+    def test_fingerprint(self):
+        """Test the fingerprint ignores field order but not types."""
+        self.assertEqual(
+            self.fingerprint, schema_fingerprint([Field('Name', 'String'), Field('ID', 'Integer')]))
+        self.assertNotEqual(
+            self.fingerprint, schema_fingerprint([Field('ID', 'String'), Field('Name', 'String')]))
+
+    def test_round_trip(self):
+        """Test saved profiles are read back from the file."""
+        ProfileStore(self.path).save('Weekly', self.fingerprint, {'ID': 'ID', 'Name': 'Nme'})
+        store = ProfileStore(self.path)
+        self.assertEqual(store.names(), ['Weekly'])
+        self.assertEqual(store.mapping('Weekly'), {'ID': 'ID', 'Name': 'Nme'})
+        self.assertEqual(store.fingerprint('Weekly'), self.fingerprint)
+
+    def test_find_by_source_fields(self):
+        """Test the profile whose source fields exist is found."""
+        store = ProfileStore(self.path)
+        store.save('Old', self.fingerprint, {'ID': 'ID', 'Name': 'Title'})
+        store.save('New', self.fingerprint, {'ID': 'ID', 'Name': 'upper("Nme")'})
+        self.assertEqual(store.find(self.fingerprint, ['ID', 'Nme']), 'New')
+        self.assertEqual(store.find(self.fingerprint, ['ID', 'Title']), 'Old')
+        self.assertIsNone(store.find('other', ['ID']))
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MappingProfilesTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
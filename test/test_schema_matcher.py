@@ -0,0 +1,62 @@
+# coding=utf-8
+"""Schema matcher test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from ..schema_matcher import SchemaMatcher, match_fields, tokenize, type_factor
+
+
+def untyped(*names):
+    """Build (name, kind) pairs without field kinds."""
+    return [(name, None) for name in names]
+
+
+class SchemaMatcherTest(unittest.TestCase):
+    """Test source fields are suggested for template fields."""
+
+    def test_tokenize(self):
+        """Test names are split on case and separators and abbreviations expanded."""
+        self.assertEqual(tokenize('Shape_Area'), ('shape', 'area'))
+        self.assertEqual(tokenize('streetAddr'), ('street', 'address'))
+
+    def test_example_schemas(self):
+        """Test the README example schemas are matched one to one."""
+        matches = match_fields(
+            untyped('ID', 'Name', 'Address', 'UID', 'Area', 'Length', 'Date'),
+            untyped('ID', 'Nme', 'Addr', 'UUID', 'Shape_Area', 'Shape_Length', 'Remark', 'Others', 'Date'))
+        mapping = {match.template: match.source for match in matches}
+        self.assertEqual(mapping, {
+            'ID': 'ID', 'Name': 'Nme', 'Address': 'Addr', 'UID': 'UUID',
+            'Area': 'Shape_Area', 'Length': 'Shape_Length', 'Date': 'Date'})
+
+    def test_global_assignment(self):
+        """Test a source field is not taken by a weaker match first."""
+        matcher = SchemaMatcher(untyped('UUID', 'ID'))
+        self.assertEqual(matcher.suggest(untyped('UID', 'ID')), {'ID': 'ID', 'UID': 'UUID'})
+
+    def test_type_compatibility(self):
+        """Test incompatible field kinds lower the score."""
+        self.assertEqual(type_factor('integer', 'integer'), 1.0)
+        self.assertLess(type_factor('date', 'integer'), type_factor('integer', 'double'))
+        matches = match_fields([('Date', 'date')], [('Date', 'integer'), ('Date_', 'date')])
+        self.assertEqual(matches[0].source, 'Date_')
+
+    def test_no_match_below_threshold(self):
+        """Test unrelated names get no suggestion."""
+        self.assertEqual(match_fields(untyped('Owner'), untyped('Remark')), [])
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SchemaMatcherTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
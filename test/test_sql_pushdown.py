@@ -0,0 +1,141 @@
+# coding=utf-8
+"""SQL push-down test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import tempfile
+import unittest
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsCoordinateReferenceSystem, QgsFeature, QgsField, QgsFields, QgsGeometry, QgsPointXY, \
+    QgsProject, QgsVectorFileWriter, QgsVectorLayer, QgsWkbTypes
+
+from ..sql_pushdown import SqlPushdown, quoted_identifier
+from ..transfer_engine import MODE_APPEND, MODE_REPLACE, MODE_UPSERT
+from ..transfer_plan import TransferPlan
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_table(path, name, fields, rows=()):
+    """Add a point table to a GeoPackage and return it as a layer."""
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = 'GPKG'
+    options.layerName = name
+    if os.path.exists(path):
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+    writer = QgsVectorFileWriter.create(path, fields, QgsWkbTypes.Point, QgsCoordinateReferenceSystem('EPSG:4326'),
+                                        QgsProject.instance().transformContext(), options)
+    for i, row in enumerate(rows):
+        feature = QgsFeature(fields)
+        feature.setAttributes(list(row))
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(i, i)))
+        writer.addFeature(feature)
+    del writer
+    return QgsVectorLayer(f'{path}|layername={name}', name, 'ogr')
+
+
+def make_fields(*fields):
+    """Return QgsFields of (name, type) pairs."""
+    result = QgsFields()
+    for name, field_type in fields:
+        result.append(QgsField(name, field_type))
+    return result
+
+
+class RecordingConnection:
+    """Provider connection stub recording the SQL it is sent."""
+
+    def __init__(self):
+        self.sql = []
+
+    def executeSql(self, sql):
+        self.sql.append(sql)
+        return [[3]]
+
+
+class SqlPushdownTest(unittest.TestCase):
+    """Test the statements generated for same-database layer pairs."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'data.gpkg')
+        self.source = make_table(path, 'old parcels', make_fields(('Code', QVariant.String)),
+                                 [('1',), ('2',), ('3',)])
+        self.template = make_table(path, 'parcels', make_fields(('UID', QVariant.Int)))
+        self.plan = TransferPlan.from_layers({'UID': 'Code'}, self.template, self.source)
+
+    def tearDown(self):
+        """Runs after each test."""
+        del self.plan, self.source, self.template
+        self.directory.cleanup()
+
+    def test_quoted_identifier(self):
+        """Test names are quoted with embedded quotes doubled."""
+        self.assertEqual(quoted_identifier('a "b"'), '"a ""b"""')
+
+    def test_append(self):
+        """Test append mode is one INSERT ... SELECT with casts and quoted names."""
+        pushdown = SqlPushdown.for_layers(self.plan, self.template, self.source, MODE_APPEND)
+        self.assertIsNotNone(pushdown)
+        self.assertEqual(len(pushdown.statements), 1)
+        statement = pushdown.statements[0]
+        self.assertTrue(statement.startswith('INSERT INTO "parcels" ("UID", "geom")'), statement)
+        self.assertIn('SELECT CAST("Code" AS INTEGER), "geom" FROM "old parcels"', statement)
+
+    def test_append_runs(self):
+        """Test the pushed down INSERT copies the rows."""
+        pushdown = SqlPushdown.for_layers(self.plan, self.template, self.source, MODE_APPEND)
+        report = pushdown.run()
+        self.assertEqual(report.rows_written, 3)
+        self.template.dataProvider().reloadData()
+        self.assertEqual(sorted(f['UID'] for f in self.template.getFeatures()), [1, 2, 3])
+
+    def test_sqlite_replace_refused(self):
+        """Test replace and upsert modes are not pushed down to a GeoPackage."""
+        self.assertIsNone(SqlPushdown.for_layers(self.plan, self.template, self.source, MODE_REPLACE))
+        self.assertIsNone(SqlPushdown.for_layers(self.plan, self.template, self.source, MODE_UPSERT))
+
+    def test_postgres_script(self):
+        """Test replace mode on PostGIS is sent as one multi-statement query."""
+        pushdown = SqlPushdown('postgres', "dbname='gis'",
+                               ['DELETE FROM "public"."parcels"',
+                                'INSERT INTO "public"."parcels" ("UID") SELECT "Code" FROM "public"."old"'],
+                               'SELECT count(*) FROM "public"."old"')
+        connection = RecordingConnection()
+        original = SqlPushdown.connection
+        SqlPushdown.connection = staticmethod(lambda provider, connection_uri: connection)
+        try:
+            report = pushdown.run()
+        finally:
+            SqlPushdown.connection = original
+        self.assertEqual(report.rows_written, 3)
+        self.assertEqual(connection.sql[1], 'DELETE FROM "public"."parcels"; '
+                                            'INSERT INTO "public"."parcels" ("UID") SELECT "Code" FROM "public"."old"')
+        self.assertNotIn('BEGIN', connection.sql[1])
+
+    def test_casts(self):
+        """Test columns are cast to the template field types."""
+        text = QgsField('Name', QVariant.String, 'varchar', 20)
+        self.assertEqual(SqlPushdown.cast('postgres', '"Nme"', text), 'CAST("Nme" AS varchar(20))')
+        self.assertEqual(SqlPushdown.cast('postgres', '"ID"', QgsField('ID', QVariant.Int, 'int4')),
+                         'CAST("ID" AS int4)')
+        self.assertEqual(SqlPushdown.cast('ogr', '"Area"', QgsField('Area', QVariant.Double)), 'CAST("Area" AS REAL)')
+        self.assertEqual(SqlPushdown.cast('ogr', '"Day"', QgsField('Day', QVariant.Date)), '"Day"')
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SqlPushdownTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
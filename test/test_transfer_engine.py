@@ -0,0 +1,291 @@
+# coding=utf-8
+"""Transfer engine test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import random
+import unittest
+
+from qgis.core import QgsFeature, QgsGeometry, QgsPointXY, QgsVectorLayer, QgsVectorLayerFeatureSource
+
+from ..output_writer import create_preview_layer
+from ..source_filter import SourceFilter
+from ..transfer_engine import TransferEngine, TransferError, ERROR_SKIP, ERROR_QUARANTINE
+from ..transfer_metrics import TransferMetrics, add_stage_hook, remove_stage_hook
+from ..transfer_plan import TransferPlan
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_source_layer(count):
+    """Create a memory point layer with count features."""
+    layer = QgsVectorLayer(
+        'Point?crs=EPSG:4326&field=ID:integer&field=Nme:string&field=Remark:string',
+        'Source', 'memory')
+    features = []
+    for i in range(count):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([i, f'name {i}', 'ignored'])
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(i, i)))
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def make_template_layer():
+    """Create an empty memory point layer with the template schema."""
+    return QgsVectorLayer(
+        'Point?crs=EPSG:4326&field=ID:integer&field=Name:string&field=Date:date',
+        'Template', 'memory')
+
+
+class CancelAfterFirstBatch:
+    """Feedback stub that cancels once progress has been reported."""
+
+    def __init__(self):
+        self.progress = []
+
+    def setProgress(self, progress):
+        self.progress.append(progress)
+
+    def isCanceled(self):
+        return bool(self.progress)
+
+
+class RejectingSink:
+    """Sink stub that fails every batch containing a rejected ID, writing nothing."""
+
+    def __init__(self, rejected_ids):
+        self.rejected_ids = rejected_ids
+        self.features = []
+
+    def addFeatures(self, features, flags):
+        if any(f['ID'] in self.rejected_ids for f in features):
+            return False
+        self.features.extend(features)
+        return True
+
+    def lastError(self):
+        return 'bad row'
+
+    def is_atomic(self):
+        return True
+
+
+class PartialSink(RejectingSink):
+    """Sink stub that writes the features before a rejected ID, like a file writer."""
+
+    def addFeatures(self, features, flags):
+        for feature in features:
+            if feature['ID'] in self.rejected_ids:
+                return False
+            self.features.append(feature)
+        return True
+
+    def is_atomic(self):
+        return False
+
+
+class ListQuarantine:
+    """Quarantine stub collecting the rejected rows."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, source_feature, reason):
+        self.rows.append((source_feature['ID'], reason))
+
+    def flush(self):
+        pass
+
+
+class TransferEngineTest(unittest.TestCase):
+    """Test features are streamed into the sink."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.source = make_source_layer(25)
+        self.template = make_template_layer()
+        self.plan = TransferPlan.from_layers({'ID': 'ID', 'Name': 'Nme'}, self.template, self.source)
+
+    def test_batched_transfer(self):
+        """Test every feature is written in chunks of batch_size."""
+        engine = TransferEngine(self.plan, batch_size=10)
+        report = engine.run(self.source, self.template.dataProvider(), self.source.featureCount())
+        self.assertEqual(report.rows_written, 25)
+        self.assertEqual(report.batches, 3)
+        self.assertEqual(self.template.featureCount(), 25)
+        feature = next(self.template.getFeatures())
+        self.assertEqual(feature['Name'], 'name 0')
+
+    def test_batches_bounded_by_size(self):
+        """Test a batch is closed once it reaches max_batch_bytes."""
+        engine = TransferEngine(self.plan, batch_size=100, max_batch_bytes=1)
+        report = engine.run(self.source, self.template.dataProvider())
+        self.assertEqual(report.rows_written, 25)
+        self.assertEqual(report.batches, 25)
+        self.assertIn('peak_rss_mb', report.as_dict())
+
+    def test_batches_bounded_by_count_only(self):
+        """Test no byte limit leaves batches bounded by batch_size alone."""
+        engine = TransferEngine(self.plan, batch_size=10, max_batch_bytes=None)
+        report = engine.run(self.source, self.template.dataProvider())
+        self.assertEqual(report.rows_written, 25)
+        self.assertEqual(report.batches, 3)
+
+    def test_threaded_transfer(self):
+        """Test reading on a producer thread writes every feature in order."""
+        engine = TransferEngine(self.plan, batch_size=10, threaded=True)
+        source = QgsVectorLayerFeatureSource(self.source)
+        report = engine.run(source, self.template.dataProvider())
+        self.assertEqual(report.rows_written, 25)
+        self.assertEqual([f['ID'] for f in self.template.getFeatures()], list(range(25)))
+
+    def test_threaded_abort_stops_producer(self):
+        """Test a write failure stops the producer thread and is raised."""
+        engine = TransferEngine(self.plan, batch_size=5, threaded=True, max_queued_batches=1)
+        with self.assertRaises(TransferError):
+            engine.run(QgsVectorLayerFeatureSource(self.source), RejectingSink({2}))
+
+    def run_filtered(self, source_filter):
+        """Transfer the source through a filter and return the written IDs."""
+        plan = TransferPlan.from_layers({'ID': 'ID', 'Name': 'Nme'}, self.template, self.source,
+                                        source_filter=source_filter)
+        TransferEngine(plan, batch_size=10).run(self.source, self.template.dataProvider())
+        return sorted(f['ID'] for f in self.template.getFeatures())
+
+    def test_expression_filter(self):
+        """Test only features matching the expression are written."""
+        self.assertEqual(self.run_filtered(SourceFilter(expression='"ID" >= 20')), [20, 21, 22, 23, 24])
+
+    def test_selected_features_with_expression(self):
+        """Test the expression still applies when reading selected features."""
+        source_filter = SourceFilter(expression='"ID" < 3', feature_ids=[1, 2, 3, 4])
+        self.assertEqual(self.run_filtered(source_filter), [1, 2])
+
+    def test_polygon_filter(self):
+        """Test only features intersecting the polygon are written."""
+        polygon = QgsGeometry.fromWkt('Polygon ((-1 -1, 3.5 -1, -1 3.5, -1 -1))')
+        self.assertEqual(self.run_filtered(SourceFilter(polygon=polygon)), [0, 1])
+
+    def test_cancel_between_batches(self):
+        """Test the engine stops at a batch boundary when canceled."""
+        engine = TransferEngine(self.plan, batch_size=10)
+        report = engine.run(self.source, self.template.dataProvider(), 25, CancelAfterFirstBatch())
+        self.assertTrue(report.canceled)
+        self.assertEqual(report.rows_written, 10)
+
+    def test_abort_on_failed_batch(self):
+        """Test the default policy raises when a batch is rejected."""
+        engine = TransferEngine(self.plan, batch_size=10)
+        with self.assertRaises(TransferError):
+            engine.run(self.source, RejectingSink({13}))
+
+    def test_skip_isolates_bad_rows(self):
+        """Test a failed batch is split until the bad rows are found."""
+        engine = TransferEngine(self.plan, batch_size=10, error_policy=ERROR_SKIP)
+        sink = RejectingSink({3, 17})
+        report = engine.run(self.source, sink)
+        self.assertEqual(report.rows_written, 23)
+        self.assertEqual(report.rows_rejected, 2)
+        self.assertEqual(len(sink.features), 23)
+
+    def test_skip_on_partial_sink_writes_once(self):
+        """Test a sink keeping part of a failed batch gets every good row once."""
+        engine = TransferEngine(self.plan, batch_size=10, error_policy=ERROR_SKIP)
+        sink = PartialSink({3, 17})
+        report = engine.run(self.source, sink)
+        self.assertEqual(report.rows_written, 23)
+        self.assertEqual(report.rows_rejected, 2)
+        self.assertEqual(sorted(f['ID'] for f in sink.features), [i for i in range(25) if i not in (3, 17)])
+
+    def test_quarantine_receives_rejected_rows(self):
+        """Test rejected rows and their reason go to the quarantine."""
+        quarantine = ListQuarantine()
+        engine = TransferEngine(self.plan, batch_size=10, error_policy=ERROR_QUARANTINE,
+                                quarantine=quarantine)
+        engine.run(self.source, RejectingSink({20}))
+        self.assertEqual(quarantine.rows, [(20, 'bad row')])
+
+    def test_rejects_matched_by_position(self):
+        """Test rejected rows are dropped by position, not by feature ID."""
+        plan = TransferPlan.from_layers({'ID': 'Nme'}, self.template, self.source)
+        batch = []
+        for i, name in enumerate(['1', 'one', '3']):
+            feature = QgsFeature(self.source.fields())
+            feature.setAttributes([i, name, 'ignored'])
+            # Unsaved features all share the same ID
+            feature.setId(-1)
+            batch.append(feature)
+        features, converted, rejects = TransferEngine(plan).convert_batch(batch)
+        self.assertEqual([f['ID'] for f in features], [1, 3])
+        self.assertEqual([f['Nme'] for f in converted], ['1', '3'])
+        self.assertEqual([f['Nme'] for f, reason in rejects], ['one'])
+
+    def test_metrics_per_stage(self):
+        """Test every stage and batch is recorded when metrics are given."""
+        metrics = TransferMetrics()
+        engine = TransferEngine(self.plan, batch_size=10, metrics=metrics)
+        report = engine.run(self.source, self.template.dataProvider())
+        stages = metrics.as_dict(report)['stages']
+        self.assertEqual(sorted(stages), ['flush', 'geometry', 'map', 'read', 'write'])
+        self.assertEqual(stages['read']['rows'], 25)
+        self.assertEqual(stages['write']['rows'], 25)
+        self.assertEqual(metrics.as_dict()['batches']['count'], 3)
+
+    def test_uninstrumented_unless_hooked(self):
+        """Test engines only time stages with metrics or a subscribed hook."""
+        self.assertIsNone(TransferEngine(self.plan).metrics)
+        stages = []
+        hook = lambda stage, seconds, rows: stages.append(stage)
+        add_stage_hook(hook)
+        try:
+            TransferEngine(self.plan, batch_size=10).run(self.source, self.template.dataProvider())
+        finally:
+            remove_stage_hook(hook)
+        self.assertEqual(stages.count('write'), 3)
+
+    def test_preview_first_rows(self):
+        """Test a dry run converts the first rows into a memory layer only."""
+        preview = create_preview_layer(self.template)
+        engine = TransferEngine(self.plan, batch_size=4)
+        report = engine.preview(self.source, preview.dataProvider(), 25, sample_size=10)
+        self.assertEqual(report.rows_read, 10)
+        self.assertEqual(preview.featureCount(), 10)
+        self.assertEqual(self.template.featureCount(), 0)
+        self.assertGreaterEqual(report.estimated_seconds(), report.elapsed)
+
+    def test_preview_predicts_rejects(self):
+        """Test rejected rows are collected and extrapolated instead of aborting."""
+        plan = TransferPlan.from_layers({'ID': 'Nme'}, self.template, self.source)
+        preview = create_preview_layer(self.template)
+        report = TransferEngine(plan).preview(self.source, preview.dataProvider(), 25, sample_size=10)
+        self.assertEqual(report.rows_rejected, 10)
+        self.assertEqual(report.predicted_rejects(), 25)
+        self.assertEqual(dict(report.reject_fields), {'ID': 10})
+        self.assertEqual(len(report.reject_examples), 10)
+
+    def test_preview_random_sample(self):
+        """Test a random dry run converts distinct features and counts the source."""
+        preview = create_preview_layer(self.template)
+        engine = TransferEngine(self.plan)
+        report = engine.preview(self.source, preview.dataProvider(), sample_size=5, random_sample=True,
+                                rng=random.Random(1))
+        self.assertEqual(report.rows_read, 5)
+        self.assertEqual(report.feature_count, 25)
+        self.assertEqual(len({f['ID'] for f in preview.getFeatures()}), 5)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TransferEngineTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,80 @@
+# coding=utf-8
+"""Transfer metrics test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import json
+import os
+import tempfile
+import unittest
+
+from ..transfer_metrics import (STAGE_COMMIT, STAGE_READ, STAGE_WRITE, TransferMetrics, add_stage_hook,
+                                remove_stage_hook)
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+class TransferMetricsTest(unittest.TestCase):
+    """Test the stage counters and their reports."""
+
+    def test_record(self):
+        """Test stage times, rows and calls add up."""
+        metrics = TransferMetrics()
+        metrics.record(STAGE_READ, 0.5, 10)
+        metrics.record(STAGE_READ, 0.25, 5)
+        metrics.record(STAGE_COMMIT, 1.0)
+        stages = metrics.as_dict()['stages']
+        self.assertEqual(stages[STAGE_READ], {'seconds': 0.75, 'rows': 15, 'calls': 2})
+        self.assertNotIn(STAGE_WRITE, stages)
+        self.assertEqual(metrics.as_dict()['commit_seconds'], 1.0)
+        self.assertIn('read 0.75 s (43%)', metrics.summary())
+
+    def test_batch_sizes(self):
+        """Test the smallest, largest and mean batch are kept."""
+        metrics = TransferMetrics()
+        for size in (1000, 1000, 250):
+            metrics.record_batch(size)
+        self.assertEqual(metrics.as_dict()['batches'], {'count': 3, 'min': 250, 'max': 1000, 'mean': 750.0})
+
+    def test_hooks(self):
+        """Test local and global hooks see every stage and cannot break the run."""
+        seen = []
+
+        def failing_hook(stage, seconds, rows):
+            raise RuntimeError('profiler failed')
+
+        metrics = TransferMetrics([failing_hook])
+        metrics.subscribe(lambda stage, seconds, rows: seen.append(('local', stage, rows)))
+        hook = lambda stage, seconds, rows: seen.append(('global', stage, rows))
+        add_stage_hook(hook)
+        try:
+            metrics.record(STAGE_WRITE, 0.1, 7)
+        finally:
+            remove_stage_hook(hook)
+        metrics.record(STAGE_WRITE, 0.1, 3)
+        self.assertEqual(seen, [('local', STAGE_WRITE, 7), ('global', STAGE_WRITE, 7), ('local', STAGE_WRITE, 3)])
+
+    def test_write_report(self):
+        """Test the run report is written as JSON."""
+        metrics = TransferMetrics()
+        metrics.record(STAGE_READ, 0.5, 10)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.json')
+            metrics.write_report(path)
+            with open(path, encoding='utf-8') as report:
+                self.assertEqual(json.load(report)['stages'][STAGE_READ]['rows'], 10)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TransferMetricsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
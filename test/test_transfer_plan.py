@@ -0,0 +1,99 @@
+# coding=utf-8
+"""Transfer plan test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsFeature, QgsFeatureRequest, QgsField, QgsFields
+
+from ..transfer_plan import TransferPlan
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_fields(*names):
+    """Build a QgsFields of string fields with the given names."""
+    fields = QgsFields()
+    for name in names:
+        fields.append(QgsField(name, QVariant.String))
+    return fields
+
+
+class TransferPlanTest(unittest.TestCase):
+    """Test the field index mapping."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.template_fields = make_fields('ID', 'Name', 'Address')
+        self.source_fields = make_fields('Nme', 'Remark', 'ID', 'Addr')
+
+    def test_indices(self):
+        """Test names are resolved to indices on both schemas."""
+        plan = TransferPlan({'ID': 'ID', 'Name': 'Nme'}, self.template_fields, self.source_fields)
+        self.assertEqual(plan.index_pairs, [(0, 2), (1, 0)])
+
+    def test_create_feature(self):
+        """Test unmapped template fields are left empty."""
+        plan = TransferPlan({'ID': 'ID', 'Name': 'Nme'}, self.template_fields, self.source_fields)
+        source = QgsFeature(self.source_fields)
+        source.setAttributes(['Main', 'x', '7', 'High St'])
+        feature = plan.create_feature(source)
+        self.assertEqual(feature.attributes(), ['7', 'Main', None])
+
+    def test_feature_request(self):
+        """Test the request only fetches mapped source columns."""
+        plan = TransferPlan({'ID': 'ID', 'Name': 'Nme', 'Address': 'ID'},
+                            self.template_fields, self.source_fields, fetch_geometry=False)
+        request = plan.feature_request()
+        self.assertEqual(request.subsetOfAttributes(), [0, 2])
+        self.assertTrue(request.flags() & QgsFeatureRequest.NoGeometry)
+
+    def test_type_coercion(self):
+        """Test values are converted to the template type or rejected."""
+        template_fields = QgsFields()
+        template_fields.append(QgsField('ID', QVariant.Int))
+        plan = TransferPlan({'ID': 'ID'}, template_fields, self.source_fields)
+        rows = [['a', 'b', '7', 'c'], ['a', 'b', 'seven', 'c']]
+        values, rejected = plan.convert_rows(rows)
+        self.assertEqual(values[0], [7])
+        self.assertEqual(list(rejected), [1])
+
+    def test_expression_mapping(self):
+        """Test a mapping value that is not a field is evaluated as an expression."""
+        plan = TransferPlan({'ID': 'ID', 'Name': 'upper("Nme")'}, self.template_fields, self.source_fields,
+                            fetch_geometry=False)
+        source = QgsFeature(self.source_fields)
+        source.setAttributes(['Main', 'x', '7', 'High St'])
+        feature = plan.create_feature(source)
+        self.assertEqual(feature.attributes(), ['7', 'MAIN', None])
+        self.assertEqual(plan.feature_request().subsetOfAttributes(), [0, 2])
+        self.assertTrue(plan.is_mapped(1))
+        self.assertEqual(plan.mapped_indices(), [0, 1])
+
+    def test_invalid_expression(self):
+        """Test a mapping value that is neither a field nor an expression is rejected."""
+        with self.assertRaises(ValueError):
+            TransferPlan({'Name': 'upper("Nme"'}, self.template_fields, self.source_fields)
+
+    def test_unknown_field(self):
+        """Test a mapping to a missing source field is rejected."""
+        with self.assertRaises(ValueError):
+            TransferPlan({'ID': 'UUID'}, self.template_fields, self.source_fields)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TransferPlanTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
@@ -0,0 +1,96 @@
+# coding=utf-8
+"""Transfer task test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from qgis.core import QgsFeature, QgsVectorLayer
+
+from ..transfer_engine import TransferError, MODE_REPLACE
+from ..transfer_plan import TransferPlan
+from ..source_filter import SourceFilter
+from ..transfer_task import AttributeTransferTask, expected_feature_count
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_layer(uri, name, rows):
+    """Create a memory layer without geometry holding rows."""
+    layer = QgsVectorLayer(uri, name, 'memory')
+    features = []
+    for row in rows:
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes(list(row))
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class AttributeTransferTaskTest(unittest.TestCase):
+    """Test the task leaves the template as it was when it fails."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.source = make_layer('None?field=ID:string', 'Source', [('1',), ('2',), ('x',)])
+        self.template = make_layer('None?field=ID:integer', 'Template', [(7,), (8,)])
+        self.plan = TransferPlan.from_layers({'ID': 'ID'}, self.template, self.source)
+
+    def ids(self):
+        """Return the sorted IDs in the template."""
+        return sorted(f['ID'] for f in self.template.getFeatures())
+
+    def test_replace(self):
+        """Test a successful run replaces the template features."""
+        source = make_layer('None?field=ID:string', 'Source', [('1',), ('2',)])
+        plan = TransferPlan.from_layers({'ID': 'ID'}, self.template, source)
+        task = AttributeTransferTask(plan, source, self.template, mode=MODE_REPLACE)
+        self.assertEqual(self.ids(), [7, 8])
+        self.assertTrue(task.run())
+        task.finished(True)
+        self.assertEqual(self.ids(), [1, 2])
+
+    def test_failed_replace_restores_template(self):
+        """Test an aborted replace puts the old features back."""
+        task = AttributeTransferTask(self.plan, self.source, self.template, batch_size=1, mode=MODE_REPLACE)
+        self.assertFalse(task.run())
+        self.assertIn('rejected', task.error)
+        task.finished(False)
+        self.assertEqual(self.ids(), [7, 8])
+
+    def test_editable_template_refused(self):
+        """Test a template with an open edit session is refused."""
+        self.template.startEditing()
+        try:
+            with self.assertRaises(TransferError):
+                AttributeTransferTask(self.plan, self.source, self.template)
+        finally:
+            self.template.rollBack()
+    def test_expected_feature_count(self):
+        """Test only an unfiltered layer or a plain selection is counted up front."""
+        self.assertEqual(expected_feature_count(self.source, None), 3)
+        self.assertEqual(expected_feature_count(self.source, SourceFilter()), 3)
+        self.assertEqual(expected_feature_count(self.source, SourceFilter(feature_ids=[1, 2])), 2)
+        self.assertEqual(expected_feature_count(self.source, SourceFilter(expression='"ID" = \'1\'')), -1)
+        self.assertEqual(expected_feature_count(
+            self.source, SourceFilter(expression='"ID" = \'1\'', feature_ids=[1, 2])), -1)
+
+        plan = TransferPlan.from_layers({'ID': 'ID'}, self.template, self.source,
+                                        source_filter=SourceFilter(expression='"ID" = \'1\''))
+        task = AttributeTransferTask(plan, self.source, self.template)
+        self.assertEqual(task.feature_count, -1)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(AttributeTransferTaskTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,62 @@
+# coding=utf-8
+"""Type coercion test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import unittest
+
+from qgis.PyQt.QtCore import QDate, QVariant
+from qgis.core import NULL, QgsField
+
+from ..type_coercion import build_converter
+
+
+class TypeCoercionTest(unittest.TestCase):
+    """Test column converters between field types."""
+
+    def test_same_type_is_copied(self):
+        """Test no converter is built for identical types."""
+        self.assertIsNone(build_converter(QgsField('a', QVariant.Int), QgsField('b', QVariant.Int)))
+
+    def test_string_to_integer(self):
+        """Test failed values are reported per row and set to None."""
+        convert = build_converter(QgsField('a', QVariant.String), QgsField('b', QVariant.Int))
+        values, failed = convert(['12', ' 3 ', '4.0', 'x', NULL, '99999999999'])
+        self.assertEqual(values, [12, 3, 4, None, None, None])
+        self.assertEqual([row for row, reason in failed], [3, 5])
+
+    def test_string_to_date(self):
+        """Test ISO date strings become QDate values."""
+        convert = build_converter(QgsField('a', QVariant.String), QgsField('b', QVariant.Date))
+        values, failed = convert(['2025-06-22', '22/06/2025'])
+        self.assertEqual(values[0], QDate(2025, 6, 22))
+        self.assertEqual(len(failed), 1)
+
+    def test_string_truncation(self):
+        """Test strings are cut to the template field length."""
+        convert = build_converter(QgsField('a', QVariant.String, len=0),
+                                  QgsField('b', QVariant.String, len=3))
+        values, failed = convert(['abcdef', 'ab'])
+        self.assertEqual(values, ['abc', 'ab'])
+        self.assertEqual(failed, [])
+
+    def test_string_to_bool(self):
+        """Test numbers and strings become booleans."""
+        convert = build_converter(QgsField('a', QVariant.String), QgsField('b', QVariant.Bool))
+        values, failed = convert(['yes', 'F', 'maybe'])
+        self.assertEqual(values, [True, False, None])
+        self.assertEqual(len(failed), 1)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TypeCoercionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,118 @@
+# coding=utf-8
+"""Upsert sink test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'anustupjana21@gmail.com'
+__date__ = '2025-06-22'
+__copyright__ = 'Copyright 2025, Anustup Jana'
+
+import os
+import tempfile
+import unittest
+
+from qgis.core import QgsCoordinateReferenceSystem, QgsFeature, QgsFeatureSink, QgsField, QgsFields, QgsProject, \
+    QgsVectorFileWriter, QgsVectorLayer, QgsWkbTypes
+from qgis.PyQt.QtCore import QVariant
+
+from ..upsert_sink import UpsertSink
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+def make_feature(layer, uid, name):
+    """Create a feature with the schema of layer."""
+    feature = QgsFeature(layer.fields())
+    feature.setAttributes([uid, name])
+    return feature
+
+
+class UpsertSinkTest(unittest.TestCase):
+    """Test existing keys are updated and new keys inserted."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.layer = QgsVectorLayer('None?field=UID:integer&field=Name:string', 'Template', 'memory')
+        self.layer.dataProvider().addFeatures(
+            [make_feature(self.layer, 1, 'one'), make_feature(self.layer, 2, 'two')])
+
+    def test_upsert(self):
+        """Test one batch with an update and an insert."""
+        sink = UpsertSink(self.layer.dataProvider(), 0)
+        self.assertTrue(sink.addFeatures(
+            [make_feature(self.layer, 2, 'TWO'), make_feature(self.layer, 3, 'three')]))
+        self.assertEqual(sink.rows_updated, 1)
+        self.assertEqual(sink.rows_inserted, 1)
+        names = {f['UID']: f['Name'] for f in self.layer.getFeatures()}
+        self.assertEqual(names, {1: 'one', 2: 'TWO', 3: 'three'})
+
+    def test_inserted_keys_are_indexed(self):
+        """Test a key inserted by one batch is updated by the next."""
+        sink = UpsertSink(self.layer.dataProvider(), 0)
+        sink.addFeatures([make_feature(self.layer, 3, 'three')])
+        sink.addFeatures([make_feature(self.layer, 3, 'THREE')])
+        self.assertEqual(self.layer.featureCount(), 3)
+        self.assertEqual(sink.rows_updated, 1)
+
+
+class GeoPackageUpsertSinkTest(unittest.TestCase):
+    """Test upserts into a GeoPackage, whose first column is the fid."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'template.gpkg')
+        fields = QgsFields()
+        fields.append(QgsField('UID', QVariant.Int))
+        fields.append(QgsField('Name', QVariant.String))
+        fields.append(QgsField('Note', QVariant.String))
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'GPKG'
+        writer = QgsVectorFileWriter.create(path, fields, QgsWkbTypes.NoGeometry, QgsCoordinateReferenceSystem(),
+                                            QgsProject.instance().transformContext(), options)
+        del writer
+        self.layer = QgsVectorLayer(path, 'Template', 'ogr')
+        self.assertTrue(self.layer.isValid())
+
+    def tearDown(self):
+        """Runs after each test."""
+        del self.layer
+        self.directory.cleanup()
+
+    def make_feature(self, uid, name, note=None):
+        """Create a feature with a NULL fid."""
+        feature = QgsFeature(self.layer.fields())
+        feature.setAttributes([None, uid, name, note])
+        return feature
+
+    def test_key_repeated_across_batches(self):
+        """Test a key inserted by one fast batch updates that row in the next."""
+        sink = UpsertSink(self.layer.dataProvider(), 1)
+        self.assertTrue(sink.addFeatures([self.make_feature(1, 'one'), self.make_feature(2, 'two')],
+                                         QgsFeatureSink.FastInsert))
+        self.assertTrue(sink.addFeatures([self.make_feature(2, 'TWO')], QgsFeatureSink.FastInsert))
+        self.assertEqual(sink.rows_updated, 1)
+        names = {f['UID']: f['Name'] for f in self.layer.getFeatures()}
+        self.assertEqual(names, {1: 'one', 2: 'TWO'})
+
+    def test_update_keeps_unmapped_fields(self):
+        """Test an update only overwrites the mapped fields."""
+        self.layer.dataProvider().addFeatures([self.make_feature(1, 'one', 'kept')])
+        sink = UpsertSink(self.layer.dataProvider(), 1, field_indices=[1, 2])
+        self.assertTrue(sink.addFeatures([self.make_feature(1, 'ONE')]))
+        features = list(self.layer.getFeatures())
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0]['Name'], 'ONE')
+        self.assertEqual(features[0]['Note'], 'kept')
+        self.assertIsNotNone(features[0]['fid'])
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite([unittest.makeSuite(UpsertSinkTest), unittest.makeSuite(GeoPackageUpsertSinkTest)])
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,610 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TransferEngine
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ The engine has no dialog or widget dependencies so it can run from a
+ QgsTask, a Processing algorithm or a plain Python script.
+"""
+from qgis.core import QgsFeatureRequest, QgsFeatureSink, QgsVectorDataProvider, QgsWkbTypes
+from .field_statistics import reservoir_sample
+from .transfer_metrics import STAGE_HOOKS, STAGE_FLUSH, STAGE_READ, STAGE_WRITE, TransferMetrics
+from collections import Counter
+import logging
+import queue
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Number of converted features sent to the sink per addFeatures call
+DEFAULT_BATCH_SIZE = 1000
+
+# Estimated size of the features held in one batch before it is written
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024 * 1024
+
+# Only every Nth feature of a batch is measured, standing in for the N
+# features up to the next one measured
+SIZE_SAMPLE_INTERVAL = 16
+
+# Converted batches waiting for the writer when reading on a separate thread
+DEFAULT_QUEUED_BATCHES = 2
+
+# Asks a provider to remove the features it added when addFeatures fails;
+# not available before QGIS 3.18
+ROLLBACK_ON_ERRORS = getattr(QgsFeatureSink, 'RollBackOnErrors', None)
+
+# Providers whose addFeatures runs in a database transaction
+TRANSACTIONAL_PROVIDERS = ('postgres', 'spatialite')
+
+# Providers that honour ROLLBACK_ON_ERRORS
+ROLLBACK_PROVIDERS = ('ogr', 'memory')
+
+# Source rows pushed through the pipeline by a dry run
+DEFAULT_PREVIEW_ROWS = 1000
+
+# Rejected rows kept as examples in a dry run report
+PREVIEW_REJECT_EXAMPLES = 20
+
+# How features are written into an existing template layer
+MODE_REPLACE = 'replace'
+MODE_APPEND = 'append'
+MODE_UPSERT = 'upsert'
+MODE_DELTA = 'delta'
+TRANSFER_MODES = (MODE_REPLACE, MODE_APPEND, MODE_UPSERT, MODE_DELTA)
+
+# What happens to rows that cannot be converted or written
+ERROR_ABORT = 'abort'
+ERROR_SKIP = 'skip'
+ERROR_QUARANTINE = 'quarantine'
+ERROR_POLICIES = (ERROR_ABORT, ERROR_SKIP, ERROR_QUARANTINE)
+
+class TransferError(Exception):
+    """Raised when features cannot be written to the output."""
+
+
+def check_geometry_compatibility(template_wkb_type, source_wkb_type):
+    """Raise TransferError if source geometries cannot be converted to the template type.
+
+    Geometries of the same family (point, line or polygon) are compatible;
+    single/multi-part, Z and M differences are converted while transferring.
+    A template without geometry accepts any source.
+    """
+    if template_wkb_type == QgsWkbTypes.NoGeometry:
+        return
+    if QgsWkbTypes.geometryType(template_wkb_type) != QgsWkbTypes.geometryType(source_wkb_type):
+        raise TransferError("Template and Source layers have incompatible geometry types.")
+
+
+def peak_rss():
+    """Return the peak resident set size of the process in bytes, or 0 if unknown."""
+    if resource is None:
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def sink_is_atomic(sink):
+    """Return True if a failed addFeatures call on sink writes none of the features.
+
+    File writers and Processing sinks keep the features before the one that
+    failed, so they are not atomic. Sinks wrapping a provider tell with
+    their own is_atomic() method.
+    """
+    if hasattr(sink, 'is_atomic'):
+        return sink.is_atomic()
+    if not isinstance(sink, QgsVectorDataProvider):
+        return False
+    name = sink.name()
+    return name in TRANSACTIONAL_PROVIDERS or (ROLLBACK_ON_ERRORS is not None and name in ROLLBACK_PROVIDERS)
+
+
+def feature_size(feature):
+    """Return a rough estimate of the memory held by a feature, in bytes."""
+    size = 64
+    for value in feature.attributes():
+        size += len(value) + 40 if isinstance(value, str) else 16
+    geometry = feature.geometry()
+    if not geometry.isNull():
+        dimensions = 2 + geometry.constGet().is3D() + geometry.constGet().isMeasure()
+        size += 8 * dimensions * geometry.constGet().nCoordinates()
+    return size
+
+
+class TransferReport:
+    """Counters collected while a transfer runs."""
+
+    def __init__(self):
+        """Constructor."""
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        self.peak_rss = 0
+        self.canceled = False
+
+    def features_per_second(self):
+        """Return the write throughput of the run so far."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.rows_written / self.elapsed
+
+    def batches_per_second(self):
+        """Return the number of batches written per second."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.batches / self.elapsed
+
+    def as_dict(self):
+        """Return the report as a plain dictionary."""
+        return {
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+            'rows_rejected': self.rows_rejected,
+            'batches': self.batches,
+            'elapsed': round(self.elapsed, 3),
+            'features_per_second': round(self.features_per_second(), 1),
+            'batches_per_second': round(self.batches_per_second(), 2),
+            'peak_rss_mb': round(self.peak_rss / (1024 * 1024), 1),
+            'canceled': self.canceled,
+        }
+
+
+class PreviewReport(TransferReport):
+    """Counters of a dry run, extrapolated to the whole source."""
+
+    def __init__(self, feature_count=-1):
+        """Constructor.
+
+        :param feature_count: Number of source features a real run would
+            read, or -1 if unknown.
+        :type feature_count: int
+        """
+        super().__init__()
+        self.feature_count = feature_count
+        self.reject_examples = []
+        self.reject_fields = Counter()
+
+    def add(self, source_feature, reason):
+        """Record a rejected row; the report is the quarantine of the dry run."""
+        if len(self.reject_examples) < PREVIEW_REJECT_EXAMPLES:
+            self.reject_examples.append((source_feature.id(), reason))
+        self.reject_fields[reason.split(':', 1)[0]] += 1
+
+    def reject_ratio(self):
+        """Return the share of the sampled rows that were rejected."""
+        return self.rows_rejected / self.rows_read if self.rows_read else 0.0
+
+    def predicted_rejects(self):
+        """Return the number of rows a real run is expected to reject."""
+        if self.feature_count < 0:
+            return self.rows_rejected
+        return round(self.reject_ratio() * self.feature_count)
+
+    def estimated_seconds(self):
+        """Return the expected duration of a real run from the measured cost per row.
+
+        Only reading and converting are measured; writing to the real
+        output may add to it.
+        """
+        if not self.rows_read or self.feature_count < 0:
+            return 0.0
+        return self.elapsed / self.rows_read * self.feature_count
+
+    def as_dict(self):
+        """Return the report as a plain dictionary."""
+        report = super().as_dict()
+        report.update({
+            'feature_count': self.feature_count,
+            'predicted_rejects': self.predicted_rejects(),
+            'estimated_seconds': round(self.estimated_seconds(), 1),
+            'reject_fields': dict(self.reject_fields),
+            'reject_examples': self.reject_examples,
+        })
+        return report
+
+
+class TransferEngine:
+    """Stream source features through a transfer plan into a feature sink.
+
+    The run is a pipeline of three stages, read -> convert -> write, that
+    hand over one batch at a time. A batch is closed when it holds
+    batch_size features or max_batch_bytes of estimated feature data, so
+    memory use does not grow with the size of the source. When threaded,
+    reading and converting run on a producer thread that stays at most
+    max_queued_batches ahead of the writer. With a TransferMetrics object,
+    the time of each stage is recorded once per batch.
+    """
+
+    def __init__(self, plan, batch_size=DEFAULT_BATCH_SIZE, error_policy=ERROR_ABORT, quarantine=None,
+                 max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, threaded=False,
+                 max_queued_batches=DEFAULT_QUEUED_BATCHES, metrics=None):
+        """Constructor.
+
+        :param plan: Resolved field mapping between the two schemas.
+        :type plan: TransferPlan
+
+        :param batch_size: Maximum number of features written per
+            addFeatures call.
+        :type batch_size: int
+
+        :param error_policy: ERROR_ABORT stops at the first rejected row,
+            ERROR_SKIP counts and drops rejected rows, ERROR_QUARANTINE also
+            passes them to the quarantine.
+        :type error_policy: str
+
+        :param quarantine: Receives rejected rows with add(source_feature,
+            reason) under ERROR_QUARANTINE.
+        :type quarantine: Quarantine
+
+        :param max_batch_bytes: Estimated size of the source features at
+            which a batch is closed before it reaches batch_size; None or 0
+            bounds batches by count only and skips the size estimate.
+        :type max_batch_bytes: int
+
+        :param threaded: Read and convert on a separate thread while the
+            calling thread writes. The source must be safe to iterate from
+            another thread, such as a QgsVectorLayerFeatureSource.
+        :type threaded: bool
+
+        :param max_queued_batches: Converted batches the producer thread may
+            hold before it waits for the writer.
+        :type max_queued_batches: int
+
+        :param metrics: Records the time per stage and the batch sizes.
+            Without it, stages are only timed while a global stage hook is
+            subscribed.
+        :type metrics: TransferMetrics
+        """
+        if error_policy not in ERROR_POLICIES:
+            raise ValueError(f"Unknown error policy '{error_policy}'")
+        self.plan = plan
+        self.batch_size = max(1, int(batch_size))
+        self.max_batch_bytes = int(max_batch_bytes) if max_batch_bytes else None
+        self.threaded = threaded
+        self.max_queued_batches = max(1, int(max_queued_batches))
+        self.error_policy = error_policy
+        self.quarantine = quarantine
+        if metrics is None and STAGE_HOOKS:
+            metrics = TransferMetrics()
+        self.metrics = metrics
+
+    @staticmethod
+    def add_features(sink, batch):
+        """Send features to the sink; return None on success, else the error."""
+        flags = QgsFeatureSink.FastInsert
+        if ROLLBACK_ON_ERRORS is not None:
+            flags |= ROLLBACK_ON_ERRORS
+        result = sink.addFeatures(batch, flags)
+        # QgsVectorDataProvider.addFeatures returns (success, features)
+        if isinstance(result, tuple):
+            result = result[0]
+        if result:
+            return None
+        return (sink.lastError() if hasattr(sink, 'lastError') else '') or 'rejected by the output'
+
+    def write_batch(self, sink, batch, report):
+        """Write one chunk of features to the sink, raising on failure."""
+        report.batches += 1
+        error = self.add_features(sink, batch)
+        if error is not None:
+            logger.error(f"Batch {report.batches} ({len(batch)} features) failed: {error}")
+            raise TransferError(f"Failed to add feature batch {report.batches}: {error}")
+        report.rows_written += len(batch)
+
+    def write_or_bisect(self, sink, batch, source_batch, report):
+        """Write features, splitting a failed batch in halves to find the bad rows.
+
+        Only for sinks where a failed addFeatures call writes nothing, see
+        sink_is_atomic(); otherwise the halves would write rows again.
+        """
+        report.batches += 1
+        error = self.add_features(sink, batch)
+        if error is None:
+            report.rows_written += len(batch)
+        elif len(batch) == 1:
+            self.reject([(source_batch[0], error)], report)
+        else:
+            logger.debug(f"Batch of {len(batch)} features failed, splitting: {error}")
+            middle = len(batch) // 2
+            self.write_or_bisect(sink, batch[:middle], source_batch[:middle], report)
+            self.write_or_bisect(sink, batch[middle:], source_batch[middle:], report)
+
+    def write_each(self, sink, batch, source_batch, report):
+        """Write features one at a time, rejecting those the sink refuses.
+
+        For sinks that keep part of a failed batch, such as file writers.
+        """
+        report.batches += 1
+        for feature, source_feature in zip(batch, source_batch):
+            error = self.add_features(sink, [feature])
+            if error is None:
+                report.rows_written += 1
+            else:
+                self.reject([(source_feature, error)], report)
+
+    def reject(self, rejects, report):
+        """Apply the error policy to a list of (source feature, reason)."""
+        if self.error_policy == ERROR_ABORT:
+            source_feature, reason = rejects[0]
+            raise TransferError(f"Source feature {source_feature.id()} was rejected: {reason}")
+        report.rows_rejected += len(rejects)
+        for source_feature, reason in rejects:
+            logger.debug(f"Rejected source feature {source_feature.id()}: {reason}")
+            if self.quarantine is not None:
+                self.quarantine.add(source_feature, reason)
+
+    def read_batches(self, source, report, request=None, limit=None):
+        """Read stage: yield lists of source features bounded in count and size.
+
+        Reads the plan's feature request unless another request is given,
+        and stops after limit accepted features.
+        """
+        batch = []
+        batch_bytes = 0
+        max_batch_bytes = self.max_batch_bytes
+        accept = None
+        source_filter = self.plan.source_filter
+        if source_filter is not None and source_filter.has_post_filter():
+            source_filter.prepare(self.plan.source_fields)
+            accept = source_filter.accept
+        metrics = self.metrics
+        # Time spent in the source, excluding the consumer of the batches
+        resumed = time.perf_counter() if metrics is not None else 0.0
+        for feature in source.getFeatures(request or self.plan.feature_request()):
+            if accept is not None and not accept(feature):
+                continue
+            if limit is not None and report.rows_read >= limit:
+                break
+            batch.append(feature)
+            if max_batch_bytes is not None and len(batch) % SIZE_SAMPLE_INTERVAL == 1:
+                batch_bytes += feature_size(feature) * SIZE_SAMPLE_INTERVAL
+            report.rows_read += 1
+            if len(batch) >= self.batch_size or (max_batch_bytes is not None and batch_bytes >= max_batch_bytes):
+                if metrics is not None:
+                    metrics.record(STAGE_READ, time.perf_counter() - resumed, len(batch))
+                yield batch
+                if metrics is not None:
+                    resumed = time.perf_counter()
+                batch = []
+                batch_bytes = 0
+        if metrics is not None:
+            metrics.record(STAGE_READ, time.perf_counter() - resumed, len(batch))
+        if batch:
+            yield batch
+
+    def convert_batch(self, source_batch):
+        """Convert stage: return the template features, their source features and the rejects."""
+        return self.plan.create_features(source_batch, self.metrics)
+
+    def convert_batches(self, source, report):
+        """Yield the converted batches of the source on the calling thread."""
+        for source_batch in self.read_batches(source, report):
+            yield self.convert_batch(source_batch)
+
+    def produce_batches(self, source, report, batches, stop):
+        """Producer thread: put converted batches, then None, into the queue.
+
+        An exception is put in the queue instead, for the writer to raise.
+        """
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for item in self.convert_batches(source, report):
+                if not put(item):
+                    return
+            put(None)
+        except Exception as e:
+            put(e)
+
+    def threaded_batches(self, source, report):
+        """Yield converted batches read by a producer thread."""
+        batches = queue.Queue(self.max_queued_batches)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self.produce_batches, args=(source, report, batches, stop),
+            name='attribute-transfer-reader', daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+    def write_features(self, sink, features, source_batch, rejects, report):
+        """Write stage: apply the error policy and send the features to the sink.
+
+        Sinks with a keep_rejected() method are told about the rows that
+        never reach them, such as a DeltaSink that deletes unseen keys.
+        """
+        if rejects:
+            self.reject(rejects, report)
+            if hasattr(sink, 'keep_rejected'):
+                sink.keep_rejected([source_feature for source_feature, reason in rejects])
+        if not features:
+            return
+        metrics = self.metrics
+        started = time.perf_counter() if metrics is not None else 0.0
+        if self.error_policy == ERROR_ABORT:
+            self.write_batch(sink, features, report)
+        elif sink_is_atomic(sink):
+            self.write_or_bisect(sink, features, source_batch, report)
+        else:
+            self.write_each(sink, features, source_batch, report)
+        if metrics is not None:
+            metrics.record(STAGE_WRITE, time.perf_counter() - started, len(features))
+            metrics.record_batch(len(features))
+
+    def report_progress(self, report, feature_count, started, feedback):
+        """Push progress and throughput to the feedback object."""
+        report.elapsed = time.perf_counter() - started
+        if feature_count > 0:
+            feedback.setProgress(min(100.0, 100.0 * report.rows_read / feature_count))
+        if hasattr(feedback, 'setProgressText'):
+            feedback.setProgressText(f"{report.rows_written} features written "
+                                     f"({report.features_per_second():.0f} features/s)")
+
+    def run(self, source, sink, feature_count=-1, feedback=None):
+        """Transfer every feature of source into sink.
+
+        :param source: Layer or thread-safe feature source to read from.
+        :type source: QgsFeatureSource
+
+        :param sink: Provider, file writer or Processing sink to write to.
+        :type sink: QgsFeatureSink
+
+        :param feature_count: Expected number of features, for progress.
+        :type feature_count: int
+
+        :param feedback: Object with isCanceled() and setProgress(), such as
+            a QgsTask or a QgsFeedback. Checked between batches.
+
+        :returns: Counters of the run, with canceled set if it was stopped.
+        :rtype: TransferReport
+        """
+        report = TransferReport()
+        started = time.perf_counter()
+        if self.threaded:
+            batches = self.threaded_batches(source, report)
+        else:
+            batches = self.convert_batches(source, report)
+        try:
+            for features, source_batch, rejects in batches:
+                self.write_features(sink, features, source_batch, rejects, report)
+                if feedback:
+                    self.report_progress(report, feature_count, started, feedback)
+                    if feedback.isCanceled():
+                        report.canceled = True
+                        break
+        finally:
+            # Release the source iterator, or stop the producer thread, when
+            # stopping early
+            batches.close()
+        if not report.canceled:
+            flush_started = time.perf_counter()
+            if self.quarantine is not None:
+                self.quarantine.flush()
+            if hasattr(sink, 'flushBuffer') and not sink.flushBuffer():
+                error = sink.lastError() if hasattr(sink, 'lastError') else ''
+                raise TransferError(f"Failed to flush output: {error}")
+            if self.metrics is not None:
+                self.metrics.record(STAGE_FLUSH, time.perf_counter() - flush_started)
+        report.elapsed = time.perf_counter() - started
+        report.peak_rss = peak_rss()
+        logger.debug(f"Transfer finished: {report.as_dict()}")
+        return report
+
+    def sample_ids(self, source, sample_size, rng=None):
+        """Return the IDs of a random sample of the source features the plan reads, and their count.
+
+        Scans the IDs of the source once, without attributes or geometry
+        unless the source filter has to test them.
+        """
+        request = self.plan.feature_request()
+        accept = None
+        source_filter = self.plan.source_filter
+        if source_filter is not None and source_filter.has_post_filter():
+            source_filter.prepare(self.plan.source_fields)
+            accept = source_filter.accept
+        else:
+            request.setNoAttributes()
+            request.setFlags(request.flags() | QgsFeatureRequest.NoGeometry)
+        total = 0
+
+        def accepted_ids():
+            nonlocal total
+            for feature in source.getFeatures(request):
+                if accept is None or accept(feature):
+                    total += 1
+                    yield feature.id()
+
+        sample = reservoir_sample(accepted_ids(), sample_size, rng)
+        return sample, total
+
+    def preview(self, source, sink, feature_count=-1, sample_size=DEFAULT_PREVIEW_ROWS, random_sample=False,
+                rng=None):
+        """Dry run: convert a sample of the source into sink and extrapolate.
+
+        The sample goes through the same mapping, type coercion and
+        geometry conversion as a real run, but rejected rows are collected
+        instead of aborting the run, whatever the error policy.
+
+        :param sink: Usually the provider of a memory layer with the
+            template schema.
+        :type sink: QgsFeatureSink
+
+        :param feature_count: Number of source features a real run reads,
+            used to extrapolate the rejects and the duration. A random
+            sample counts them while sampling instead.
+        :type feature_count: int
+
+        :param sample_size: Number of source features to convert.
+        :type sample_size: int
+
+        :param random_sample: Convert a random sample instead of the first
+            features.
+        :type random_sample: bool
+
+        :returns: Counters of the dry run with the predictions.
+        :rtype: PreviewReport
+        """
+        report = PreviewReport(feature_count)
+        engine = TransferEngine(self.plan, self.batch_size, ERROR_QUARANTINE, quarantine=report,
+                                max_batch_bytes=self.max_batch_bytes, metrics=self.metrics)
+        request = None
+        if random_sample:
+            sample, report.feature_count = self.sample_ids(source, sample_size, rng)
+            request = self.plan.feature_request()
+            # Replaces an expression or selection filter, which the sampled
+            # IDs already satisfy
+            request.setFilterFids(sample)
+        started = time.perf_counter()
+        batches = engine.read_batches(source, report, request, sample_size)
+        try:
+            for source_batch in batches:
+                features, kept_sources, rejects = engine.convert_batch(source_batch)
+                engine.write_features(sink, features, kept_sources, rejects, report)
+        finally:
+            batches.close()
+        report.elapsed = time.perf_counter() - started
+        report.peak_rss = peak_rss()
+        logger.debug(f"Dry run finished: {report.as_dict()}")
+        return report
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TransferMetrics
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ Stages are timed once per batch, never per feature, and engines without
+ a TransferMetrics object skip the timing altogether.
+"""
+from qgis.core import Qgis, QgsMessageLog
+from collections import Counter
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Stages of a transfer, in pipeline order
+STAGE_READ = 'read'
+STAGE_MAP = 'map'
+STAGE_GEOMETRY = 'geometry'
+STAGE_WRITE = 'write'
+STAGE_FLUSH = 'flush'
+STAGE_COMMIT = 'commit'
+STAGES = (STAGE_READ, STAGE_MAP, STAGE_GEOMETRY, STAGE_WRITE, STAGE_FLUSH, STAGE_COMMIT)
+
+# Tag of the summaries in the QGIS message log
+MESSAGE_TAG = 'Attribute Transfer'
+
+# Called as hook(stage, seconds, rows) for every stage of every instrumented transfer
+STAGE_HOOKS = []
+
+def add_stage_hook(hook):
+    """Subscribe a profiler to the stages of all transfers started from now on.
+
+    Engines are instrumented automatically while a hook is subscribed.
+    Hooks of threaded transfers are also called from the reader thread.
+    """
+    if hook not in STAGE_HOOKS:
+        STAGE_HOOKS.append(hook)
+
+
+def remove_stage_hook(hook):
+    """Unsubscribe a profiler added with add_stage_hook()."""
+    if hook in STAGE_HOOKS:
+        STAGE_HOOKS.remove(hook)
+
+
+class TransferMetrics:
+    """Cumulative time, rows and calls per transfer stage.
+
+    The stages are: reading source features (read), mapping and converting
+    their attributes (map), building the template features with their
+    converted geometry (geometry), writing batches (write), flushing
+    buffered sinks (flush) and committing the output (commit).
+    """
+
+    def __init__(self, hooks=None):
+        """Constructor.
+
+        :param hooks: Called as hook(stage, seconds, rows) for every stage
+            recorded by this transfer, in addition to the global hooks.
+        :type hooks: list
+        """
+        self.hooks = list(hooks or [])
+        self.seconds = Counter()
+        self.rows = Counter()
+        self.calls = Counter()
+        self.batches = 0
+        self.min_batch = 0
+        self.max_batch = 0
+        self.batch_rows = 0
+        # Reading and writing may record from different threads
+        self.lock = threading.Lock()
+
+    def subscribe(self, hook):
+        """Call hook(stage, seconds, rows) for every stage recorded from now on."""
+        self.hooks.append(hook)
+
+    def record(self, stage, seconds, rows=0):
+        """Add the time and rows of one pass through a stage."""
+        with self.lock:
+            self.seconds[stage] += seconds
+            self.rows[stage] += rows
+            self.calls[stage] += 1
+        for hook in self.hooks + STAGE_HOOKS:
+            try:
+                hook(stage, seconds, rows)
+            except Exception as e:
+                logger.error(f"Error in transfer stage hook: {str(e)}")
+
+    def record_batch(self, size):
+        """Count a batch of features sent to the output."""
+        with self.lock:
+            self.min_batch = size if not self.batches else min(self.min_batch, size)
+            self.max_batch = max(self.max_batch, size)
+            self.batches += 1
+            self.batch_rows += size
+
+    def total_seconds(self):
+        """Return the time spent in all stages."""
+        return sum(self.seconds.values())
+
+    def as_dict(self, report=None):
+        """Return the metrics, and the counters of report, as a plain dictionary."""
+        result = {
+            'stages': {stage: {'seconds': round(self.seconds[stage], 4), 'rows': self.rows[stage],
+                               'calls': self.calls[stage]}
+                       for stage in STAGES if self.calls[stage]},
+            'batches': {'count': self.batches, 'min': self.min_batch, 'max': self.max_batch,
+                        'mean': round(self.batch_rows / self.batches, 1) if self.batches else 0},
+            'commit_seconds': round(self.seconds[STAGE_COMMIT], 4),
+        }
+        if report is not None:
+            result['report'] = report.as_dict()
+        return result
+
+    def summary(self, report=None):
+        """Return a one-line summary of the time per stage."""
+        total = self.total_seconds()
+        stages = ', '.join(
+            f"{stage} {self.seconds[stage]:.2f} s ({self.seconds[stage] / total:.0%})" if total else
+            f"{stage} {self.seconds[stage]:.2f} s"
+            for stage in STAGES if self.calls[stage])
+        text = f"Stages: {stages or 'none'}"
+        if report is not None:
+            text += (f"; {report.rows_read} read, {report.rows_written} written, "
+                     f"{report.rows_rejected} rejected")
+        if self.batches:
+            text += (f"; {self.batches} batches of {self.min_batch}-{self.max_batch} rows "
+                     f"(mean {self.batch_rows / self.batches:.0f})")
+        return text
+
+    def log_summary(self, report=None):
+        """Write the summary to the QGIS message log."""
+        QgsMessageLog.logMessage(self.summary(report), MESSAGE_TAG, Qgis.Info)
+
+    def write_report(self, path, report=None):
+        """Write the metrics and the counters of report to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(self.as_dict(report), output, indent=2)
+        logger.debug(f"Transfer run report written to {path}")
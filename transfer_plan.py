@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TransferPlan
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import (QgsDistanceArea, QgsExpression, QgsExpressionContext, QgsExpressionContextUtils, QgsFeature,
+                       QgsFeatureRequest, QgsField, QgsProject)
+from .geometry_conversion import geometry_converter_for
+from .type_coercion import build_converter
+from .transfer_metrics import STAGE_GEOMETRY, STAGE_MAP
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class TransferPlan:
+    """Field mapping resolved to integer indices on both schemas.
+
+    A mapping value that is not a source field name is a QGIS expression,
+    such as $area or upper("Nme"). Expressions are parsed and prepared once
+    and evaluated per feature with one shared expression context.
+    """
+
+    def __init__(self, field_mapping, template_fields, source_fields, fetch_geometry=True,
+                 coerce_types=True, geometry_converter=None, source_filter=None, expression_context=None,
+                 distance_area=None):
+        """Constructor.
+
+        :param field_mapping: Template field name -> source field name or
+            expression.
+        :type field_mapping: dict
+
+        :param template_fields: Fields of the template layer.
+        :type template_fields: QgsFields
+
+        :param source_fields: Fields of the source layer.
+        :type source_fields: QgsFields
+
+        :param fetch_geometry: False when the template has no geometry.
+        :type fetch_geometry: bool
+
+        :param coerce_types: Convert source values to the template field
+            types instead of copying them unchanged.
+        :type coerce_types: bool
+
+        :param geometry_converter: Converts source geometries to the template
+            geometry type and CRS; None copies them unchanged.
+        :type geometry_converter: GeometryConverter
+
+        :param source_filter: Restricts the source features that are read.
+        :type source_filter: SourceFilter
+
+        :param expression_context: Context with the global, project and
+            layer scopes for evaluating mapping expressions.
+        :type expression_context: QgsExpressionContext
+
+        :param distance_area: Ellipsoidal calculator used by $area, $length
+            and similar functions in mapping expressions.
+        :type distance_area: QgsDistanceArea
+        """
+        self.template_fields = template_fields
+        self.source_fields = source_fields
+        self.fetch_geometry = fetch_geometry
+        self.geometry_converter = geometry_converter
+        self.source_filter = source_filter if source_filter is not None and not source_filter.is_empty() else None
+        self.attribute_count = template_fields.count()
+        self.template_indices = []
+        self.source_indices = []
+        self.expression_context = expression_context or QgsExpressionContext()
+        self.expression_context.setFields(source_fields)
+        self.distance_area = distance_area
+        self.expressions = []
+        for template_field, source_field in field_mapping.items():
+            template_index = template_fields.lookupField(template_field)
+            if template_index < 0:
+                raise ValueError(f"Template field '{template_field}' does not exist.")
+            source_index = source_fields.lookupField(source_field)
+            if source_index < 0:
+                expression = self.prepare_expression(source_field)
+                converter = build_converter(QgsField('', QVariant.Invalid), template_fields.at(template_index)) \
+                    if coerce_types else None
+                self.expressions.append((template_index, expression, converter))
+                continue
+            self.template_indices.append(template_index)
+            self.source_indices.append(source_index)
+        self.index_pairs = list(zip(self.template_indices, self.source_indices))
+        self.converters = [
+            build_converter(source_fields.at(source_index), template_fields.at(template_index))
+            if coerce_types else None
+            for template_index, source_index in self.index_pairs]
+        logger.debug(f"Transfer plan index pairs: {self.index_pairs}")
+
+    def prepare_expression(self, text):
+        """Parse and prepare a mapping expression, raising ValueError if it is invalid."""
+        expression = QgsExpression(text)
+        if expression.hasParserError():
+            raise ValueError(f"'{text}' is neither a source field nor a valid expression: "
+                             f"{expression.parserErrorString()}")
+        for column in expression.referencedColumns():
+            if column != QgsFeatureRequest.ALL_ATTRIBUTES and self.source_fields.lookupField(column) < 0:
+                raise ValueError(f"Source field '{column}' does not exist.")
+        if self.distance_area is not None:
+            expression.setGeomCalculator(self.distance_area)
+        expression.prepare(self.expression_context)
+        return expression
+
+    def is_mapped(self, template_index):
+        """Return True if a template field is filled from a source field or an expression."""
+        return template_index in self.template_indices or \
+            any(index == template_index for index, expression, converter in self.expressions)
+
+    def mapped_indices(self):
+        """Return the sorted indices of the template fields filled by the mapping."""
+        return sorted(set(self.template_indices) | {index for index, expression, converter in self.expressions})
+
+    def expression_fields(self):
+        """Return the indices of the source fields read by the mapping expressions."""
+        indices = set()
+        for template_index, expression, converter in self.expressions:
+            columns = expression.referencedColumns()
+            if QgsFeatureRequest.ALL_ATTRIBUTES in columns:
+                return list(range(self.source_fields.count()))
+            indices.update(self.source_fields.lookupField(name) for name in columns)
+        return sorted(indices)
+
+    @classmethod
+    def from_layers(cls, field_mapping, template_layer, source_layer, transform_context=None, source_filter=None):
+        """Build a plan for the schemas, geometry types and CRSs of a template and a source layer."""
+        geometry_converter = None
+        if template_layer.isSpatial():
+            geometry_converter = geometry_converter_for(
+                template_layer.wkbType(), source_layer.wkbType(), template_layer.crs(), source_layer.crs(),
+                transform_context or QgsProject.instance().transformContext())
+        expression_context = QgsExpressionContext(QgsExpressionContextUtils.globalProjectLayerScopes(source_layer))
+        distance_area = QgsDistanceArea()
+        distance_area.setSourceCrs(source_layer.crs(), transform_context or QgsProject.instance().transformContext())
+        distance_area.setEllipsoid(QgsProject.instance().ellipsoid())
+        return cls(field_mapping, template_layer.fields(), source_layer.fields(),
+                   fetch_geometry=template_layer.isSpatial(), geometry_converter=geometry_converter,
+                   source_filter=source_filter, expression_context=expression_context,
+                   distance_area=distance_area)
+
+    def feature_request(self):
+        """Return a request reading only the source features and columns the plan uses."""
+        request = QgsFeatureRequest()
+        attributes = set(self.source_indices)
+        attributes.update(self.expression_fields())
+        fetch_geometry = self.fetch_geometry or any(
+            expression.needsGeometry() for template_index, expression, converter in self.expressions)
+        if self.source_filter is not None:
+            self.source_filter.apply(request)
+            attributes.update(self.source_filter.referenced_fields(self.source_fields))
+            fetch_geometry = fetch_geometry or self.source_filter.needs_geometry()
+        request.setSubsetOfAttributes(sorted(attributes))
+        if not fetch_geometry:
+            request.setFlags(request.flags() | QgsFeatureRequest.NoGeometry)
+        return request
+
+    def convert_rows(self, rows):
+        """Convert a batch of source attribute lists column by column.
+
+        :returns: The template attribute lists and a dict of row number ->
+            reason for the rows with a value that could not be converted.
+        :rtype: (list, dict)
+        """
+        values = [[None] * self.attribute_count for _ in rows]
+        rejected = {}
+        for (template_index, source_index), converter in zip(self.index_pairs, self.converters):
+            column = [row[source_index] for row in rows]
+            if converter is not None:
+                column, failed = converter(column)
+                for row, reason in failed:
+                    rejected.setdefault(row, f"{self.template_fields.at(template_index).name()}: {reason}")
+            for row_values, value in zip(values, column):
+                row_values[template_index] = value
+        return values, rejected
+
+    def template_value(self, source_feature, template_index):
+        """Return the converted value a source feature gives one template field.
+
+        Raises ValueError if the value cannot be converted, or if the field
+        is computed by an expression, which is only evaluated in batches.
+        """
+        for (index, source_index), converter in zip(self.index_pairs, self.converters):
+            if index != template_index:
+                continue
+            column = [source_feature.attribute(source_index)]
+            if converter is not None:
+                column, failed = converter(column)
+                if failed:
+                    raise ValueError(failed[0][1])
+            return column[0]
+        raise ValueError(f"Template field {template_index} is not copied from a source field.")
+
+    def evaluate_expressions(self, source_features, values, rejected):
+        """Fill the expression columns of a converted batch in place."""
+        context = self.expression_context
+        columns = [[] for _ in self.expressions]
+        for row, feature in enumerate(source_features):
+            context.setFeature(feature)
+            for column, (template_index, expression, converter) in zip(columns, self.expressions):
+                value = expression.evaluate(context)
+                if expression.hasEvalError():
+                    rejected.setdefault(
+                        row, f"{self.template_fields.at(template_index).name()}: {expression.evalErrorString()}")
+                    value = None
+                column.append(value)
+        for column, (template_index, expression, converter) in zip(columns, self.expressions):
+            if converter is not None:
+                column, failed = converter(column)
+                for row, reason in failed:
+                    rejected.setdefault(row, f"{self.template_fields.at(template_index).name()}: {reason}")
+            for row_values, value in zip(values, column):
+                row_values[template_index] = value
+
+    def make_feature(self, source_feature, attributes):
+        """Create a template feature from converted attributes.
+
+        Raises ValueError if the geometry cannot be converted.
+        """
+        new_feature = QgsFeature(self.template_fields)
+        if self.fetch_geometry:
+            geometry = source_feature.geometry()
+            if self.geometry_converter is not None:
+                geometry = self.geometry_converter.convert(geometry)
+            new_feature.setGeometry(geometry)
+        new_feature.setAttributes(attributes)
+        return new_feature
+
+    def create_features(self, source_features, metrics=None):
+        """Convert a batch of source features into template features.
+
+        :param metrics: Records the time spent on the attributes and on
+            building the features with their geometry.
+        :type metrics: TransferMetrics
+
+        :returns: The converted features, the source features they were
+            converted from, and a list of (source feature, reason) for the
+            features that were rejected. The sources are matched by their
+            position in the batch, since feature IDs need not be unique.
+        :rtype: (list, list, list)
+        """
+        started = time.perf_counter() if metrics is not None else 0.0
+        values, rejected = self.convert_rows([feature.attributes() for feature in source_features])
+        if self.expressions:
+            self.evaluate_expressions(source_features, values, rejected)
+        if metrics is not None:
+            mapped = time.perf_counter()
+            metrics.record(STAGE_MAP, mapped - started, len(source_features))
+        features = []
+        converted = []
+        rejects = []
+        for row, source_feature in enumerate(source_features):
+            reason = rejected.get(row)
+            if reason is None:
+                try:
+                    features.append(self.make_feature(source_feature, values[row]))
+                    converted.append(source_feature)
+                    continue
+                except ValueError as e:
+                    reason = f"Geometry: {str(e)}"
+            rejects.append((source_feature, reason))
+        if metrics is not None:
+            metrics.record(STAGE_GEOMETRY, time.perf_counter() - mapped, len(features))
+        return features, converted, rejects
+
+    def create_feature(self, source_feature):
+        """Convert a source feature into a feature with the template schema."""
+        features, converted, rejects = self.create_features([source_feature])
+        if rejects:
+            raise ValueError(rejects[0][1])
+        return features[0]
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ AttributeTransferTask
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.core import QgsApplication, QgsProject, QgsTask, QgsTransaction, QgsVectorLayerFeatureSource
+from .output_writer import create_output_writer, create_preview_layer, delete_output
+from .delta_sink import DeltaSink, HashCache
+from .quarantine import create_quarantine_file
+from .transfer_engine import (TransferEngine, TransferError, DEFAULT_BATCH_SIZE, MODE_REPLACE, MODE_UPSERT,
+                              MODE_DELTA, ERROR_ABORT, ERROR_QUARANTINE, DEFAULT_MAX_BATCH_BYTES,
+                              DEFAULT_PREVIEW_ROWS)
+from .transfer_metrics import STAGE_COMMIT
+from .upsert_sink import UpsertSink
+from functools import partial
+import logging
+import os.path
+import time
+
+logger = logging.getLogger(__name__)
+
+def default_hash_cache_path():
+    """Return the sidecar file holding row hashes for delta transfers."""
+    return os.path.join(QgsApplication.qgisSettingsDirPath(), 'attribute_transfer_to_schema_hashes.sqlite')
+
+
+def default_profile_path():
+    """Return the file holding the saved mapping profiles."""
+    return os.path.join(QgsApplication.qgisSettingsDirPath(), 'attribute_transfer_to_schema_profiles.json')
+
+
+def default_run_report_path():
+    """Return the JSON file holding the stage timings of the last instrumented transfer."""
+    return os.path.join(QgsApplication.qgisSettingsDirPath(), 'attribute_transfer_to_schema_last_run.json')
+
+
+def expected_feature_count(source_layer, source_filter):
+    """Return the number of features a transfer reads from a layer or feature source, or -1 if unknown.
+
+    Only a plain selection is counted without reading the layer; an extent,
+    polygon or expression filter leaves the count unknown.
+    """
+    if source_filter is None or source_filter.is_empty():
+        return source_layer.featureCount()
+    if (source_filter.feature_ids is not None and source_filter.extent is None
+            and source_filter.polygon is None and not source_filter.expression):
+        return len(source_filter.feature_ids)
+    return -1
+
+
+def begin_template_transaction(template_layer):
+    """Start a database transaction on the template layer's provider.
+
+    The task writes to the data provider directly, outside the layer's edit
+    buffer, so a layer with pending edits is refused. Returns None when the
+    provider has no transactions, e.g. for Shapefiles or memory layers.
+    Must be called on the main thread.
+    """
+    if template_layer.isEditable():
+        raise TransferError("Save or discard the edits of the Template layer before transferring features into it.")
+    if not QgsTransaction.supportsTransaction(template_layer):
+        return None
+    transaction = QgsTransaction.create({template_layer})
+    if transaction is None:
+        return None
+    started, error = transaction.begin()
+    if not started:
+        raise TransferError(f"Cannot start a transaction on Template layer: {error}")
+    return transaction
+
+
+class AttributeTransferTask(QgsTask):
+    """Run a feature transfer in the background through the task manager.
+
+    Without an output path the features are written straight to the data
+    provider of the template layer, which is cleared first in replace mode.
+    PostGIS, GeoPackage and SpatiaLite templates are written in a database
+    transaction, and memory templates are copied first, so that a failed or
+    canceled transfer leaves them as they were; other formats keep the rows
+    written so far. The transaction is committed, or the template restored,
+    on the main thread in finished(). In upsert mode, features
+    whose key_field value already exists in the template update that feature;
+    delta mode additionally skips unchanged rows and deletes missing keys,
+    using row hashes kept in hash_cache_path. A pushdown runs the whole
+    transfer as SQL inside the database instead of the feature loop.
+    With an output path the template only provides the schema and features
+    stream into a new file, which is removed again if the transfer fails or
+    is canceled. Rows that fail are handled by error_policy; in quarantine
+    mode they are written with their reason to quarantine_path. When
+    threaded, the source snapshot is read on a second thread while the task
+    thread writes. With metrics, the time per stage, including the commit
+    of an output file, is logged when the task has finished and written to run_report_path.
+    """
+
+    def __init__(self, plan, source_layer, template_layer, batch_size=DEFAULT_BATCH_SIZE,
+                 output_path=None, mode=MODE_REPLACE, key_field=None, hash_cache_path=None,
+                 pushdown=None, error_policy=ERROR_ABORT, quarantine_path=None,
+                 max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, threaded=False, metrics=None,
+                 run_report_path=None):
+        """Constructor."""
+        target = output_path or template_layer.name()
+        super().__init__(f"Attribute transfer to {target}", QgsTask.CanCancel)
+        if error_policy == ERROR_QUARANTINE and not quarantine_path:
+            raise TransferError("Choose a quarantine file for rejected rows.")
+        self.engine = TransferEngine(plan, batch_size, error_policy, max_batch_bytes=max_batch_bytes,
+                                     threaded=threaded, metrics=metrics)
+        self.run_report_path = run_report_path
+        self.template_layer = template_layer
+        self.output_path = output_path
+        self.pushdown = pushdown
+        # Snapshot of the source that is safe to iterate from another thread
+        self.source = QgsVectorLayerFeatureSource(source_layer)
+        self.feature_count = expected_feature_count(source_layer, plan.source_filter)
+        self.quarantine_path = quarantine_path if error_policy == ERROR_QUARANTINE else None
+        self.source_fields = source_layer.fields()
+        self.source_wkb_type = source_layer.wkbType()
+        self.source_crs = source_layer.crs()
+        self.transform_context = QgsProject.instance().transformContext()
+        if output_path:
+            self.output_crs = template_layer.crs()
+            self.sink = None
+        elif mode in (MODE_UPSERT, MODE_DELTA):
+            key_index = plan.template_fields.lookupField(key_field or '')
+            if key_index < 0 or not plan.is_mapped(key_index):
+                raise TransferError(f"Key field '{key_field}' must be mapped to a source field.")
+            if mode == MODE_DELTA:
+                if plan.source_filter is not None:
+                    # Keys outside the filter would be deleted as missing
+                    raise TransferError("Changed-rows transfers read the whole source; remove the source filter "
+                                        "or use update or insert mode.")
+                cache = HashCache(hash_cache_path or default_hash_cache_path())
+                layer_key = f"{template_layer.source()}|{key_field}"
+                self.sink = DeltaSink(template_layer.dataProvider(), key_index, cache, layer_key,
+                                      with_geometry=plan.fetch_geometry, field_indices=plan.mapped_indices(),
+                                      source_key=partial(plan.template_value, template_index=key_index))
+            else:
+                self.sink = UpsertSink(template_layer.dataProvider(), key_index,
+                                       field_indices=plan.mapped_indices())
+        else:
+            self.sink = template_layer.dataProvider()
+        self.clear_template = not output_path and not pushdown and mode == MODE_REPLACE
+        self.saved_features = None
+        self.transaction = None
+        if not output_path and not pushdown:
+            self.transaction = begin_template_transaction(template_layer)
+        self.report = None
+        self.error = None
+
+    def setProgressText(self, text):
+        """Log throughput updates sent by the engine."""
+        logger.debug(f"{self.description()}: {text}")
+
+    def run(self):
+        """Transfer the features. Runs on a worker thread."""
+        try:
+            if self.pushdown:
+                self.report = self.pushdown.run(self)
+                return True
+            if self.quarantine_path:
+                self.engine.quarantine = create_quarantine_file(
+                    self.quarantine_path, self.source_fields, self.source_wkb_type,
+                    self.source_crs, self.transform_context)
+            try:
+                if self.output_path:
+                    return self.run_to_file()
+                provider = self.template_layer.dataProvider()
+                if self.transaction is None and provider.name() == 'memory':
+                    # Kept to restore the template if the transfer fails
+                    self.saved_features = list(provider.getFeatures())
+                if self.clear_template and not provider.truncate():
+                    raise TransferError("Failed to clear Template layer.")
+                if isinstance(self.sink, UpsertSink):
+                    self.sink.build_index()
+                self.report = self.engine.run(self.source, self.sink, self.feature_count, self)
+                if isinstance(self.sink, UpsertSink):
+                    logger.debug(f"Upsert: {self.sink.rows_updated} updated, {self.sink.rows_inserted} inserted")
+                return not self.report.canceled
+            finally:
+                if self.engine.quarantine is not None:
+                    self.engine.quarantine.close()
+        except Exception as e:
+            logger.error(f"Error in transfer task: {str(e)}")
+            self.error = str(e)
+            return False
+
+    def run_to_file(self):
+        """Stream the features into a new output file."""
+        plan = self.engine.plan
+        writer = create_output_writer(
+            self.output_path, plan.template_fields, self.template_layer.wkbType(),
+            self.output_crs, self.transform_context)
+        try:
+            self.report = self.engine.run(self.source, writer, self.feature_count, self)
+        finally:
+            # Deleting the writer commits its transaction and closes the file
+            started = time.perf_counter()
+            del writer
+            if self.engine.metrics is not None:
+                self.engine.metrics.record(STAGE_COMMIT, time.perf_counter() - started)
+        return not self.report.canceled
+
+    def finished(self, result):
+        """Refresh or remove the output. Runs on the main thread."""
+        self.finish_output(result)
+        metrics = self.engine.metrics
+        if metrics is not None and self.report is not None and not self.pushdown:
+            metrics.log_summary(self.report)
+            if self.run_report_path:
+                try:
+                    metrics.write_report(self.run_report_path, self.report)
+                except OSError as e:
+                    logger.error(f"Cannot write run report: {str(e)}")
+
+    def finish_output(self, result):
+        """Commit or undo the changes to the template layer, or remove a failed output file."""
+        if self.output_path:
+            if not result:
+                delete_output(self.output_path)
+            return
+        if self.transaction is not None:
+            result = self.commit_transaction(result)
+        elif not result and self.saved_features is not None:
+            provider = self.template_layer.dataProvider()
+            if not provider.truncate() or not provider.addFeatures(self.saved_features)[0]:
+                logger.error("Failed to restore the features of the Template layer")
+        elif not result and not self.pushdown:
+            logger.warning("Transfer failed, the rows written so far stay in the Template layer")
+        self.saved_features = None
+        if result and isinstance(self.sink, DeltaSink):
+            self.sink.save_hashes()
+        # The provider was changed behind the layer's back
+        self.template_layer.dataProvider().reloadData()
+        self.template_layer.updateExtents()
+        self.template_layer.triggerRepaint()
+
+    def commit_transaction(self, result):
+        """Commit the template transaction after a successful run, else roll it back.
+
+        Returns True if the changes were committed.
+        """
+        transaction = self.transaction
+        self.transaction = None
+        if result:
+            started = time.perf_counter()
+            committed, error = transaction.commit()
+            if self.engine.metrics is not None:
+                self.engine.metrics.record(STAGE_COMMIT, time.perf_counter() - started)
+            if committed:
+                return True
+            self.error = f"Failed to commit changes to Template layer: {error}"
+        rolled_back, error = transaction.rollback()
+        if not rolled_back:
+            logger.error(f"Failed to roll back Template layer: {error}")
+        elif self.isCanceled() or (self.report and self.report.canceled):
+            logger.debug("Transfer canceled, template layer rolled back")
+        return False
+
+
+class TransferPreviewTask(QgsTask):
+    """Dry run a transfer in the background into a new memory layer.
+
+    The template layer is only used for its schema and is not modified.
+    The memory layer is created on the main thread and holds the converted
+    sample once the task has finished.
+    """
+
+    def __init__(self, plan, source_layer, template_layer, sample_size=DEFAULT_PREVIEW_ROWS,
+                 random_sample=False, batch_size=DEFAULT_BATCH_SIZE):
+        """Constructor."""
+        super().__init__(f"Attribute transfer preview of {source_layer.name()}", QgsTask.CanCancel)
+        self.engine = TransferEngine(plan, batch_size)
+        self.source = QgsVectorLayerFeatureSource(source_layer)
+        self.feature_count = expected_feature_count(source_layer, plan.source_filter)
+        self.sample_size = sample_size
+        self.random_sample = random_sample
+        self.layer = create_preview_layer(template_layer)
+        self.report = None
+        self.error = None
+
+    def run(self):
+        """Convert the sample. Runs on a worker thread."""
+        try:
+            self.report = self.engine.preview(
+                self.source, self.layer.dataProvider(), self.feature_count, self.sample_size, self.random_sample)
+            return not self.isCanceled()
+        except Exception as e:
+            logger.error(f"Error in transfer preview: {str(e)}")
+            self.error = str(e)
+            return False
+
+    def finished(self, result):
+        """Refresh the extent of the filled memory layer. Runs on the main thread."""
+        if result:
+            self.layer.updateExtents()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Type coercion
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ Converters turn a column of source values into values of the template
+ field type. A converter takes a list of values and returns the converted
+ list plus a list of (row, reason) for the values it could not convert;
+ those rows are set to None.
+"""
+from qgis.PyQt.QtCore import Qt, QDate, QDateTime, QTime, QVariant
+import datetime
+
+INTEGER_TYPES = (QVariant.Int, QVariant.UInt, QVariant.LongLong, QVariant.ULongLong)
+
+# Value range of integer field types
+INTEGER_RANGES = {
+    QVariant.Int: (-2 ** 31, 2 ** 31 - 1),
+    QVariant.UInt: (0, 2 ** 32 - 1),
+    QVariant.LongLong: (-2 ** 63, 2 ** 63 - 1),
+    QVariant.ULongLong: (0, 2 ** 64 - 1),
+}
+
+TRUE_STRINGS = ('true', 't', 'yes', 'y', '1')
+FALSE_STRINGS = ('false', 'f', 'no', 'n', '0')
+
+def is_null(value):
+    """Return True for None and for NULL QVariant attribute values."""
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+def to_integer(value):
+    """Convert a value to a Python int."""
+    if isinstance(value, (bool, int)):
+        return int(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value} is not a whole number")
+        return int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            return to_integer(float(text))
+    raise TypeError(f"cannot convert {type(value).__name__} to integer")
+
+
+def to_double(value):
+    """Convert a value to a Python float."""
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return float(value.strip())
+    raise TypeError(f"cannot convert {type(value).__name__} to double")
+
+
+def to_string(value):
+    """Convert a value to a string, using ISO 8601 for dates and times."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (QDate, QDateTime, QTime)):
+        return value.toString(Qt.ISODate)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def to_date(value):
+    """Convert a value to a QDate."""
+    if isinstance(value, QDate):
+        return value
+    if isinstance(value, QDateTime):
+        return value.date()
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return QDate(value.year, value.month, value.day)
+    if isinstance(value, str):
+        date = QDate.fromString(value.strip()[:10], Qt.ISODate)
+        if date.isValid():
+            return date
+        raise ValueError(f"'{value}' is not an ISO date")
+    raise TypeError(f"cannot convert {type(value).__name__} to date")
+
+
+def to_datetime(value):
+    """Convert a value to a QDateTime."""
+    if isinstance(value, QDateTime):
+        return value
+    if isinstance(value, QDate):
+        return QDateTime(value)
+    if isinstance(value, datetime.datetime):
+        return QDateTime(QDate(value.year, value.month, value.day),
+                         QTime(value.hour, value.minute, value.second, value.microsecond // 1000))
+    if isinstance(value, datetime.date):
+        return QDateTime(QDate(value.year, value.month, value.day))
+    if isinstance(value, str):
+        date_time = QDateTime.fromString(value.strip(), Qt.ISODate)
+        if date_time.isValid():
+            return date_time
+        return QDateTime(to_date(value))
+    raise TypeError(f"cannot convert {type(value).__name__} to datetime")
+
+
+def to_time(value):
+    """Convert a value to a QTime."""
+    if isinstance(value, QTime):
+        return value
+    if isinstance(value, QDateTime):
+        return value.time()
+    if isinstance(value, str):
+        time = QTime.fromString(value.strip(), Qt.ISODate)
+        if time.isValid():
+            return time
+        raise ValueError(f"'{value}' is not an ISO time")
+    raise TypeError(f"cannot convert {type(value).__name__} to time")
+
+
+def to_bool(value):
+    """Convert a value to a bool."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_STRINGS:
+            return True
+        if text in FALSE_STRINGS:
+            return False
+        raise ValueError(f"'{value}' is not a boolean")
+    raise TypeError(f"cannot convert {type(value).__name__} to bool")
+
+
+# Value converters by template field type
+VALUE_CONVERTERS = {
+    QVariant.Int: to_integer,
+    QVariant.UInt: to_integer,
+    QVariant.LongLong: to_integer,
+    QVariant.ULongLong: to_integer,
+    QVariant.Double: to_double,
+    QVariant.String: to_string,
+    QVariant.Date: to_date,
+    QVariant.DateTime: to_datetime,
+    QVariant.Time: to_time,
+    QVariant.Bool: to_bool,
+}
+
+# Kind of each field type, as used by the schema matcher
+FIELD_KINDS = {
+    QVariant.Int: 'integer',
+    QVariant.UInt: 'integer',
+    QVariant.LongLong: 'integer',
+    QVariant.ULongLong: 'integer',
+    QVariant.Double: 'double',
+    QVariant.String: 'string',
+    QVariant.Date: 'date',
+    QVariant.DateTime: 'datetime',
+    QVariant.Time: 'time',
+    QVariant.Bool: 'bool',
+}
+
+def field_kind(field):
+    """Return the kind of a QgsField for schema matching, or None if unknown."""
+    return FIELD_KINDS.get(field.type())
+
+
+def column_converter(convert_value, template_field):
+    """Wrap a value converter into a converter for a column of values."""
+    field_type = template_field.type()
+    minimum, maximum = INTEGER_RANGES.get(field_type, (None, None))
+    max_length = template_field.length() if field_type == QVariant.String else 0
+
+    def convert(values):
+        converted = []
+        failed = []
+        for row, value in enumerate(values):
+            if is_null(value):
+                converted.append(None)
+                continue
+            try:
+                value = convert_value(value)
+                if minimum is not None and not minimum <= value <= maximum:
+                    raise OverflowError(f"{value} is out of range")
+                if max_length > 0 and len(value) > max_length:
+                    value = value[:max_length]
+            except (TypeError, ValueError, OverflowError) as e:
+                converted.append(None)
+                failed.append((row, str(e)))
+                continue
+            converted.append(value)
+        return converted, failed
+
+    return convert
+
+
+def build_converter(source_field, template_field):
+    """Return the column converter from a source field to a template field.
+
+    Returns None when values can be copied unchanged.
+    """
+    template_type = template_field.type()
+    convert_value = VALUE_CONVERTERS.get(template_type)
+    if convert_value is None:
+        return None
+    if source_field.type() == template_type:
+        if template_type != QVariant.String:
+            return None
+        max_length = template_field.length()
+        if max_length <= 0 or 0 < source_field.length() <= max_length:
+            return None
+    return column_converter(convert_value, template_field)
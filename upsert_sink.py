@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ UpsertSink
+                                 A QGIS plugin
+ Attribute Transfer to Schema is a QGIS plugin that enables seamless transfer of attribute data from a source vector layer to a template layer with a predefined schema. It features a user-friendly interface with dropdown lists to manually map fields
+                             -------------------
+        begin                : 2025-06-22
+        git sha              : $Format:%H$
+        copyright            : (C) 2025 by Anustup Jana
+        email                : anustupjana21@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsFeatureRequest, QgsFeatureSink
+from .transfer_engine import ROLLBACK_ON_ERRORS, sink_is_atomic
+import logging
+
+logger = logging.getLogger(__name__)
+
+def is_null_key(key):
+    """Return True for None and NULL QVariant key values."""
+    return key is None or isinstance(key, QVariant)
+
+
+def build_key_index(provider, key_index):
+    """Return a dict of key value -> feature id for the existing features."""
+    request = QgsFeatureRequest()
+    request.setSubsetOfAttributes([key_index])
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+    index = {}
+    for feature in provider.getFeatures(request):
+        key = feature.attribute(key_index)
+        if not is_null_key(key):
+            index[key] = feature.id()
+    logger.debug(f"Indexed {len(index)} existing keys")
+    return index
+
+
+class UpsertSink:
+    """Feature sink that updates features with a known key and adds the rest.
+
+    The existing keys of the provider are indexed once; each batch is then
+    applied with one changeAttributeValues, one changeGeometryValues and
+    one addFeatures call.
+    """
+
+    def __init__(self, provider, key_index, update_geometry=True, field_indices=None):
+        """Constructor.
+
+        :param provider: Data provider of the template layer.
+        :type provider: QgsVectorDataProvider
+
+        :param key_index: Index of the key field in the template fields.
+        :type key_index: int
+
+        :param field_indices: Indices of the template fields an update
+            overwrites, usually the mapped ones; all fields when None.
+        :type field_indices: list
+        """
+        self.provider = provider
+        self.key_index = key_index
+        self.update_geometry = update_geometry
+        self.field_indices = field_indices
+        self.index = None
+        self.rows_inserted = 0
+        self.rows_updated = 0
+        self.error = ''
+
+    def build_index(self):
+        """Index the keys already present in the provider."""
+        self.index = build_key_index(self.provider, self.key_index)
+
+    def lastError(self):
+        """Return the last write error."""
+        return self.error or self.provider.lastError()
+
+    def is_atomic(self):
+        """Return True if a failed batch can be written again without duplicates.
+
+        Updates only set values again, so this depends on the inserts.
+        """
+        return sink_is_atomic(self.provider)
+
+    def addFeatures(self, features, flags=QgsFeatureSink.Flags()):
+        """Update or insert a batch of features, keyed on the key field."""
+        if self.index is None:
+            self.build_index()
+        attribute_changes = {}
+        geometry_changes = {}
+        inserts = {}
+        for feature in features:
+            key = feature.attribute(self.key_index)
+            fid = None if is_null_key(key) else self.index.get(key)
+            if fid is None:
+                # Later rows with the same key replace earlier ones
+                inserts[object() if is_null_key(key) else key] = feature
+                continue
+            attributes = feature.attributes()
+            if self.field_indices is None:
+                attribute_changes[fid] = dict(enumerate(attributes))
+            else:
+                # Unmapped columns, such as a GeoPackage fid, keep their value
+                attribute_changes[fid] = {index: attributes[index] for index in self.field_indices}
+            if self.update_geometry and feature.hasGeometry():
+                geometry_changes[fid] = feature.geometry()
+
+        if attribute_changes and not self.provider.changeAttributeValues(attribute_changes):
+            self.error = f"Failed to update {len(attribute_changes)} features"
+            return False
+        if geometry_changes and not self.provider.changeGeometryValues(geometry_changes):
+            self.error = f"Failed to update {len(geometry_changes)} geometries"
+            return False
+        self.rows_updated += len(attribute_changes)
+
+        if inserts:
+            # FastInsert lets OGR skip returning the new feature ids, which
+            # the index needs to update these rows from a later batch
+            if ROLLBACK_ON_ERRORS is not None:
+                result, added = self.provider.addFeatures(list(inserts.values()), ROLLBACK_ON_ERRORS)
+            else:
+                result, added = self.provider.addFeatures(list(inserts.values()))
+            if not result:
+                self.error = f"Failed to insert {len(inserts)} features"
+                return False
+            for feature in added:
+                key = feature.attribute(self.key_index)
+                if not is_null_key(key):
+                    self.index[key] = feature.id()
+            self.rows_inserted += len(inserts)
+        return True